@@ -7,6 +7,9 @@ Fixtures and stuff.
 pytest_plugins = [
     "tests.fixtures.autoload.wait_for_persistence",
     "tests.fixtures.unit.fake_response",
+    "tests.fixtures.synthetic_trips",
+    "tests.fixtures.unit.fake_tripit_server",
+    "tests.fixtures.benchmarks.recorder",
     "tests.fixtures.unit.token_state_table",
     "tests.fixtures.unit.access_token_state_table",
     "tests.fixtures.unit.show_as_human_readable_date",
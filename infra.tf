@@ -37,6 +37,21 @@ variable "app_name" {
   description = "The name of the app for which APIs are being built."
 }
 
+variable "dynamodb_billing_mode" {
+  description = "How token tables are billed: PROVISIONED or PAY_PER_REQUEST."
+  default = "PROVISIONED"
+}
+
+variable "request_tokens_capacity" {
+  description = "Read and write capacity units for the request tokens table, if provisioned."
+  default = 2
+}
+
+variable "access_tokens_capacity" {
+  description = "Read and write capacity units for the access tokens table, if provisioned."
+  default = 2
+}
+
 data "aws_route53_zone" "app_dns_zone" {
   name = "${var.domain_tld}."
 }
@@ -111,8 +126,9 @@ resource "aws_acm_certificate_validation" "app_cert" {
 resource "aws_dynamodb_table" "request_tokens_table" {
   name = "${var.app_name}_request_tokens_${var.environment}"
   hash_key = "token"
-  read_capacity = 2
-  write_capacity = 2
+  billing_mode = var.dynamodb_billing_mode
+  read_capacity = var.dynamodb_billing_mode == "PROVISIONED" ? var.request_tokens_capacity : null
+  write_capacity = var.dynamodb_billing_mode == "PROVISIONED" ? var.request_tokens_capacity : null
   attribute {
     name = "token"
     type = "S"
@@ -122,8 +138,9 @@ resource "aws_dynamodb_table" "request_tokens_table" {
 resource "aws_dynamodb_table" "access_tokens_table" {
   name = "${var.app_name}_access_tokens_${var.environment}"
   hash_key = "access_key"
-  read_capacity = 2
-  write_capacity = 2
+  billing_mode = var.dynamodb_billing_mode
+  read_capacity = var.dynamodb_billing_mode == "PROVISIONED" ? var.access_tokens_capacity : null
+  write_capacity = var.dynamodb_billing_mode == "PROVISIONED" ? var.access_tokens_capacity : null
   attribute {
     name = "access_key"
     type = "S"
@@ -0,0 +1,54 @@
+"""
+Micro-benchmarks for parsing TripIt dates and times against strptime.
+
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import datetime
+import time
+import timeit
+import pytest
+from tripit.dates import date_to_unix, local_time_to_unix
+
+ITERATIONS = 50000
+
+
+def _strptime_local_time_to_unix(date, time_of_day, utc_offset):
+    datetime_str = " ".join([date, time_of_day, utc_offset.replace(":", "")])
+    return int(datetime.datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S %z").timestamp())
+
+
+def _strptime_date_to_unix(date):
+    return int(time.mktime(time.strptime(date, "%Y-%m-%d")))
+
+
+def _report(name, before, after):
+    print(
+        f"{name:<20} strptime {ITERATIONS / before:>10.0f}/s, "
+        f"tripit.dates {ITERATIONS / after:>10.0f}/s ({before / after:.1f}x)"
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_parsing_flight_times():
+    """
+    Parses segment times, which is what normalize_flight_time_to_tz does.
+    """
+    args = ("2019-12-01", "17:11:00", "-06:00")
+    assert local_time_to_unix(*args) == _strptime_local_time_to_unix(*args)
+    before = timeit.timeit(lambda: _strptime_local_time_to_unix(*args), number=ITERATIONS)
+    after = timeit.timeit(lambda: local_time_to_unix(*args), number=ITERATIONS)
+    print()
+    _report("flight times", before, after)
+
+
+@pytest.mark.benchmark
+def test_benchmark_parsing_trip_dates():
+    """
+    Parses trip dates, which is what retrieve_trip_time_as_unix does.
+    """
+    assert date_to_unix("2019-12-01") == _strptime_date_to_unix("2019-12-01")
+    before = timeit.timeit(lambda: _strptime_date_to_unix("2019-12-01"), number=ITERATIONS)
+    after = timeit.timeit(lambda: date_to_unix("2019-12-01"), number=ITERATIONS)
+    print()
+    _report("trip dates", before, after)
@@ -0,0 +1,64 @@
+"""
+Benchmarks for how long it takes to import each Lambda handler.
+
+Cold starts pay for every import that a handler makes before it can run, so
+each handler has a budget that its import time shouldn't exceed. Each import is
+timed in a fresh interpreter, since anything imported already is free.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+RUNS = 7
+HANDLER_IMPORT_BUDGETS_MS = {
+    "tripit.api.aws_api_gateway.ping": 40,
+    "tripit.api.aws_api_gateway.auth": 60,
+    "tripit.api.aws_api_gateway.callback": 60,
+    "tripit.api.aws_api_gateway.trips": 60,
+    "tripit.api.aws_api_gateway.current_trip": 60,
+}
+HEAVY_MODULES = ["asyncio", "botocore", "pynamodb", "requests"]
+REPO_ROOT = Path(__file__).parents[2]
+
+_MEASURE_IMPORT = """
+import sys, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+heavy_modules = [name for name in {heavy_modules!r} if name in sys.modules]
+print(elapsed * 1000, ",".join(heavy_modules))
+"""
+
+
+def _measure_import(module):
+    output = subprocess.run(
+        [sys.executable, "-c", _MEASURE_IMPORT.format(module=module, heavy_modules=HEAVY_MODULES)],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        env=os.environ,
+    ).stdout.split()
+    return float(output[0]), output[1:]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("module", HANDLER_IMPORT_BUDGETS_MS)
+def test_benchmark_handler_import_time(module):
+    """
+    The median time to import a handler, which should be within its budget.
+    """
+    measurements = [_measure_import(module) for _ in range(RUNS)]
+    median_ms = statistics.median(elapsed_ms for elapsed_ms, _ in measurements)
+    _, heavy_modules = measurements[0]
+    budget_ms = HANDLER_IMPORT_BUDGETS_MS[module]
+    print(
+        f"\n{module:<42} {median_ms:>6.1f} ms (budget {budget_ms} ms); "
+        f"heavy imports: {', '.join(heavy_modules) or 'none'}"
+    )
+    assert median_ms <= budget_ms
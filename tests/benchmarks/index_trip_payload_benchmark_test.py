@@ -0,0 +1,57 @@
+"""
+Benchmarks for matching `AirObject`s and `NoteObject`s to their trips.
+
+Scanning every object for every trip makes resolution O(trips x objects);
+indexing the payload once makes each lookup O(1).
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import time
+import pytest
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit.trips import index_trip_payload, normalize_trip_objects
+
+TRIP_COUNT = 5000
+
+
+def _scan_objects_for_every_trip(trips_json):
+    """How resolve_trip used to find each trip's flights and notes."""
+    flights = trips_json.get("AirObject", [])
+    notes = trips_json.get("NoteObject", [])
+    matches = {}
+    for trip_object in normalize_trip_objects(trips_json["Trip"]):
+        matches[trip_object["id"]] = (
+            [o for o in flights if isinstance(o, dict) and o["trip_id"] == trip_object["id"]],
+            [o for o in notes if o["trip_id"] == trip_object["id"]],
+        )
+    return matches
+
+
+def _look_up_objects_from_index(trips_json):
+    trips, flights_by_trip_id, notes_by_trip_id = index_trip_payload(trips_json)
+    return {
+        trip["id"]: (flights_by_trip_id.get(trip["id"], []), notes_by_trip_id.get(trip["id"], []))
+        for trip in trips
+    }
+
+
+@pytest.mark.benchmark
+def test_benchmark_indexing_objects_by_trip_id():
+    """
+    Time taken to match every object to its trip in a 5k-trip payload.
+    """
+    trips_json = SyntheticTripIt(TRIP_COUNT).payload()
+
+    started = time.perf_counter()
+    scanned = _scan_objects_for_every_trip(trips_json)
+    scan_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexed = _look_up_objects_from_index(trips_json)
+    index_elapsed = time.perf_counter() - started
+
+    assert scanned == indexed
+    print(
+        f"\n{TRIP_COUNT} trips: scan {scan_elapsed:.4f}s, index {index_elapsed:.4f}s "
+        f"({scan_elapsed / index_elapsed:.0f}x)"
+    )
@@ -0,0 +1,66 @@
+"""
+Benchmarks for resolving trips through `join_trips`.
+
+These show how resolution time scales with the number of trips in an account,
+both with a fresh pool per trip (how this used to work) and with the shared pool.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import concurrent.futures
+import time
+import pytest
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit.trips import (
+    index_trip_payload,
+    join_trips,
+    resolve_trip,
+    shutdown_trip_resolver_executor,
+)
+
+TRIP_COUNTS = [10, 100, 500]
+SIMULATED_RESOLVE_SECONDS = 0.002
+
+
+def _slow_resolve_trip(*args):
+    """Makes each trip slow enough to resolve that how they're scheduled shows."""
+    time.sleep(SIMULATED_RESOLVE_SECONDS)
+    return resolve_trip(*args)
+
+
+def _join_trips_with_pool_per_trip(trips, flights, notes):
+    """How join_trips used to work: one pool per trip, waited on before the next."""
+    futures = []
+    for trip_obj in trips:
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            futures.append(executor.submit(_slow_resolve_trip, trip_obj, flights, notes))
+    return [future.result() for future in futures if future.result()]
+
+
+@pytest.mark.benchmark
+def test_benchmark_join_trips_scaling(monkeypatch):
+    """
+    Resolution time per trip count, with and without a shared pool.
+    """
+    monkeypatch.setenv("TRIPIT_TRIP_RESOLVER_WORKERS", "8")
+    shutdown_trip_resolver_executor()
+    print(f"\n{'trips':>8} {'pool per trip (s)':>18} {'shared pool (s)':>16} {'speedup':>8}")
+    for count in TRIP_COUNTS:
+        trips, flights, notes = index_trip_payload(SyntheticTripIt(count).payload())
+
+        started = time.perf_counter()
+        legacy = _join_trips_with_pool_per_trip(trips, flights, notes)
+        legacy_elapsed = time.perf_counter() - started
+
+        monkeypatch.setattr("tripit.trips.resolve_trip", _slow_resolve_trip)
+        started = time.perf_counter()
+        shared = join_trips(trips, flights, notes)
+        shared_elapsed = time.perf_counter() - started
+        monkeypatch.undo()
+        monkeypatch.setenv("TRIPIT_TRIP_RESOLVER_WORKERS", "8")
+
+        assert shared == legacy
+        print(
+            f"{count:>8} {legacy_elapsed:>18.4f} {shared_elapsed:>16.4f} "
+            f"{legacy_elapsed / shared_elapsed:>7.1f}x"
+        )
+    shutdown_trip_resolver_executor()
@@ -0,0 +1,92 @@
+"""
+Benchmarks for what logging costs on the hot path.
+
+Compares logging a TripIt response body at DEBUG, while we're at INFO, by
+passing `response.text` as an argument against `log_payload`, and writing
+records to stdout directly against handing them to the background thread.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import time
+import timeit
+import pytest
+import requests
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit.logging import log_payload, logger
+
+ITERATIONS = 200
+RECORDS = 2000
+
+
+def _make_response():
+    # requests works out the body's encoding every time that `text` is read.
+    response = requests.Response()
+    response.status_code = 200
+    # pylint: disable=protected-access
+    response._content = json.dumps(SyntheticTripIt(200).payload()).encode("utf-8")
+    return response
+
+
+@pytest.mark.benchmark
+def test_benchmark_debug_payloads_at_info():
+    """
+    Time spent not logging a response body at INFO.
+    """
+    response = _make_response()
+    level = logger.level
+    logger.setLevel(logging.INFO)
+    try:
+        before = timeit.timeit(
+            lambda: logger.debug("Response: %d, Text: %s", response.status_code, response.text),
+            number=ITERATIONS,
+        )
+        after = timeit.timeit(
+            lambda: log_payload("Response: %d, Text:", lambda: response.text, 200),
+            number=ITERATIONS,
+        )
+    finally:
+        logger.setLevel(level)
+    print(
+        f"\nDEBUG payload at INFO: eager {before / ITERATIONS * 1e6:.1f} us, "
+        f"log_payload {after / ITERATIONS * 1e6:.2f} us ({before / after:.0f}x)"
+    )
+    assert after < before
+
+
+@pytest.mark.benchmark
+def test_benchmark_writing_records_in_the_background():
+    """
+    Time that the logging thread spends writing records to a slow stream itself
+    against queueing them for the background thread.
+    """
+
+    class _SlowStream(io.StringIO):
+        def flush(self):
+            # Stands in for a pipe to the Lambda runtime that's slow to drain.
+            time.sleep(0.0002)
+
+    def _timed_logging(handler):
+        log = logging.getLogger(f"benchmark.{id(handler)}")
+        log.propagate = False
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        elapsed = timeit.timeit(lambda: log.info("Trip %s resolved", 12345), number=RECORDS)
+        log.removeHandler(handler)
+        return elapsed
+
+    direct = _timed_logging(logging.StreamHandler(_SlowStream()))
+    log_queue = queue.Queue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(_SlowStream()))
+    listener.start()
+    queued = _timed_logging(logging.handlers.QueueHandler(log_queue))
+    listener.stop()
+    print(
+        f"\n{RECORDS} records: written directly {direct * 1000:.0f} ms, "
+        f"queued {queued * 1000:.0f} ms on the logging thread"
+    )
+    assert queued < direct
@@ -0,0 +1,80 @@
+"""
+Micro-benchmarks for signing requests to TripIt.
+
+Compares `OAuthSigner` against how `generate_signature` and
+`generate_sha1_auth_header` used to sign every request from scratch.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import base64
+import hmac
+import timeit
+import urllib.parse
+from hashlib import sha1
+import pytest
+from tripit.core.v1.oauth import generate_sha1_auth_header, get_signer
+from tripit.helpers import sort_dict
+from tripit.logging import logger
+
+ITERATIONS = 20000
+URI = "https://api.tripit.com/v1/list/trip/include_objects/true/page_num/1/format/json"
+
+
+# pylint: disable=too-many-arguments
+def _previous_generate_signature(
+    method, uri, consumer_key, consumer_secret, nonce, timestamp, token=None, token_secret=None
+):
+    params = {
+        "oauth_consumer_key": consumer_key,
+        "oauth_nonce": nonce,
+        "oauth_signature_method": "HMAC-SHA1",
+        "oauth_timestamp": int(timestamp),
+        "oauth_version": "1.0",
+    }
+    if token:
+        params["oauth_token"] = token
+
+    encrypt_key = "&".join([consumer_secret, (token_secret if token_secret is not None else "")])
+    param_parts = "&".join([f"{key}={params[key]}" for key, value in sort_dict(params).items()])
+    base_string_for_signature = "&".join(
+        [method, urllib.parse.quote_plus(uri), urllib.parse.quote_plus(param_parts)]
+    )
+    signature = hmac.new(bytes(encrypt_key, "utf8"), bytes(base_string_for_signature, "utf8"), sha1)
+    for param in params.keys():
+        logger.debug("%s: %s", param, params[param])
+    logger.debug("Encryption key, if any: %s", encrypt_key)
+    logger.debug("Signature base: %s", base_string_for_signature)
+    logger.debug("Signature: %s", base64.b64encode(signature.digest()))
+    logger.debug("Method: %s, URI: %s", method, uri)
+    return base64.b64encode(signature.digest())
+
+
+def _previous_authenticated_headers(nonce, timestamp):
+    signature = _previous_generate_signature(
+        "GET", URI, "client-id", "client-secret", nonce, timestamp, "token", "token-secret"
+    )
+    return generate_sha1_auth_header(URI, signature, "client-id", nonce, timestamp, "token")
+
+
+@pytest.mark.benchmark
+def test_benchmark_oauth_signer():
+    """
+    Authorization headers per second, signed from scratch and with a cached signer.
+    """
+    signer = get_signer("client-id", "client-secret", "token", "token-secret")
+    nonce, timestamp = "0123456789abcdef0123456789abcdef", 1585000000
+    assert signer.authorization_header("GET", URI, nonce, timestamp) == (
+        _previous_authenticated_headers(nonce, timestamp)
+    )
+    before = timeit.timeit(
+        lambda: _previous_authenticated_headers(nonce, timestamp), number=ITERATIONS
+    )
+    after = timeit.timeit(
+        lambda: get_signer("client-id", "client-secret", "token", "token-secret")
+        .authorization_header("GET", URI, nonce, timestamp),
+        number=ITERATIONS,
+    )
+    print(
+        f"\nOAuth headers: from scratch {ITERATIONS / before:.0f}/s, "
+        f"OAuthSigner {ITERATIONS / after:.0f}/s ({before / after:.1f}x)"
+    )
@@ -0,0 +1,173 @@
+"""
+Benchmarks for every stage of resolving trips, and for the whole pipeline.
+
+Each stage runs over a synthetic account of increasing size, with TripIt
+stubbed out so that only our own work is measured. Results can be saved and
+compared against a baseline; see `tests.fixtures.benchmarks.recorder`.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import datetime
+import json
+import logging
+import types
+import pytest
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tests.fixtures.unit.fake_response import FakeResponse
+from tripit.logging import logger
+from tripit.trips import (
+    get_all_trips,
+    get_current_trip,
+    index_trip_payload,
+    join_trips,
+    normalize_flight_time_to_tz,
+    normalize_flights_from_air_objects,
+    normalize_segments_from_flight,
+    resolve_flights,
+    resolve_trip,
+)
+
+TRIP_COUNTS = [10, 100, 1000]
+
+
+class _StubbedTripIt:
+    """
+    Answers `get_from_tripit_v1` from a `SyntheticTripIt`. Bodies are encoded
+    the first time that they're asked for so that generating them isn't measured.
+    """
+
+    def __init__(self, account):
+        self.account = account
+        self._bodies = {}
+
+    def get_from_tripit_v1(self, endpoint, token, token_secret, params=None, stream=False):
+        """ Stands in for `tripit.core.v1.api.get_from_tripit_v1`. """
+        # pylint: disable=unused-argument
+        params = params or {}
+        key = (endpoint, tuple(sorted((name, str(value)) for name, value in params.items())))
+        if key not in self._bodies:
+            self._bodies[key] = json.dumps(self._payload_for(endpoint, params))
+        return FakeResponse(url=endpoint, status_code=200, text=self._bodies[key])
+
+    def _payload_for(self, endpoint, params):
+        include_objects = params.get("include_objects") == "true"
+        if endpoint == "/get/trip":
+            return self.account.payload_for([self.account.trip_index(params["id"])])
+        return self.account.page(int(params["page_num"]), int(params["page_size"]), include_objects)
+
+
+@pytest.fixture(name="account", params=TRIP_COUNTS, ids=lambda count: f"{count}-trips")
+def fixture_account(request):
+    """ A synthetic account for each size that we benchmark. """
+    return SyntheticTripIt(request.param)
+
+
+@pytest.fixture(name="indexed_account")
+def fixture_indexed_account(account):
+    """ The account's trips, flights and notes as `index_trip_payload` gives them. """
+    return index_trip_payload(account.payload())
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    """
+    Synthetic accounts have plenty of trips without notes or flights, and
+    logging warnings for each would drown out everything else.
+    """
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    yield
+    logger.setLevel(level)
+
+
+def _name(stage, account):
+    return f"{stage}[{account.trip_count}]"
+
+
+@pytest.mark.benchmark
+def test_benchmark_normalize_flight_time_to_tz(benchmark_recorder, account, indexed_account):
+    """
+    Converts every segment time in the account to UNIX time.
+    """
+    _, flights, _ = indexed_account
+    times = [
+        segment[key]
+        for trip_flights in flights.values()
+        for flight in normalize_flights_from_air_objects(trip_flights)
+        for segment in normalize_segments_from_flight(flight)
+        for key in ("StartDateTime", "EndDateTime")
+    ]
+    benchmark_recorder.record(
+        _name("normalize_flight_time_to_tz", account),
+        lambda: [normalize_flight_time_to_tz(time_object) for time_object in times],
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_resolve_flights(benchmark_recorder, account, indexed_account):
+    """
+    Resolves the flights of every trip in the account.
+    """
+    _, flights, _ = indexed_account
+    benchmark_recorder.record(
+        _name("resolve_flights", account),
+        lambda: [resolve_flights(trip_flights) for trip_flights in flights.values()],
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_resolve_trip(benchmark_recorder, account, indexed_account):
+    """
+    Resolves every trip in the account one after another.
+    """
+    trips, flights, notes = indexed_account
+    benchmark_recorder.record(
+        _name("resolve_trip", account),
+        lambda: [resolve_trip(trip, flights, notes) for trip in trips],
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_join_trips(benchmark_recorder, account, indexed_account):
+    """
+    Resolves every trip in the account on the shared resolver pool.
+    """
+    trips, flights, notes = indexed_account
+    benchmark_recorder.record(
+        _name("join_trips", account),
+        lambda: join_trips(trips, flights, notes),
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_get_all_trips(benchmark_recorder, monkeypatch, account):
+    """
+    The whole pipeline: fetching every page, decoding, indexing, resolving and
+    presenting every trip in the account.
+    """
+    tripit = _StubbedTripIt(account)
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", tripit.get_from_tripit_v1)
+    assert len(get_all_trips("token", "secret")) > 0
+    benchmark_recorder.record(
+        _name("get_all_trips", account), lambda: get_all_trips("token", "secret")
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_get_current_trip(benchmark_recorder, monkeypatch, account):
+    """
+    Finds the trip in the middle of the account, listing every trip without
+    its objects and fetching only those that might be current.
+    """
+    tripit = _StubbedTripIt(account)
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", tripit.get_from_tripit_v1)
+    middle_trip = account.trip(account.trip_count // 2, include_objects=False)["Trip"][0]
+    now = datetime.datetime.fromisoformat(middle_trip["start_date"]) + datetime.timedelta(hours=12)
+    frozen_datetime = types.SimpleNamespace(
+        datetime=types.SimpleNamespace(now=lambda: now), timedelta=datetime.timedelta
+    )
+    monkeypatch.setattr("tripit.trips.datetime", frozen_datetime)
+    assert get_current_trip("token", "secret") is not None
+    benchmark_recorder.record(
+        _name("get_current_trip", account), lambda: get_current_trip("token", "secret")
+    )
@@ -0,0 +1,85 @@
+"""
+Benchmarks for sharing one keep-alive session across calls to TripIt.
+
+Compares a new connection per request, which is what bare `requests.get` does,
+against `tripit.core.v1.session` over TLS to a local stand-in for TripIt. Only
+handshake costs show up here; real round trips to api.tripit.com save more.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import http.server
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+import pytest
+import requests
+from tripit.core.v1.session import create_session
+
+REQUEST_COUNT = 200
+
+
+class _TripItStandIn(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """ Answers every GET like an empty trip list. """
+        body = b'{"timestamp": "1585000000", "num_bytes": "80"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="tls_stand_in")
+def fixture_tls_stand_in(tmp_path):
+    """ Serves `_TripItStandIn` over TLS with a self-signed certificate. """
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is needed to create a certificate")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        "openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=localhost".split()
+        + ["-addext", "subjectAltName=DNS:localhost", "-keyout", str(key), "-out", str(cert)],
+        check=True,
+        capture_output=True,
+    )
+    server = http.server.ThreadingHTTPServer(("localhost", 0), _TripItStandIn)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"https://localhost:{server.server_address[1]}/v1/list/trip/format/json", str(cert)
+    server.shutdown()
+    server.server_close()
+
+
+def _time_requests(get):
+    started_at = time.perf_counter()
+    for _ in range(REQUEST_COUNT):
+        assert get().status_code == 200
+    return (time.perf_counter() - started_at) / REQUEST_COUNT
+
+
+@pytest.mark.benchmark
+def test_benchmark_pooled_session(tls_stand_in):
+    """
+    Per-request latency with a new connection every time and with a pooled session.
+    """
+    uri, cert = tls_stand_in
+    session = create_session(pool_size=1, retries=0, backoff_seconds=0)
+    unpooled_seconds = _time_requests(lambda: requests.get(uri, verify=cert, timeout=5))
+    pooled_seconds = _time_requests(lambda: session.get(uri, verify=cert, timeout=5))
+    session.close()
+    print(
+        f"\n{REQUEST_COUNT} GETs over TLS: "
+        f"new connection {unpooled_seconds * 1000:.2f} ms/request, "
+        f"pooled {pooled_seconds * 1000:.2f} ms/request "
+        f"({(unpooled_seconds - pooled_seconds) * 1000:.2f} ms saved)"
+    )
+    assert pooled_seconds < unpooled_seconds
@@ -0,0 +1,73 @@
+"""
+Benchmarks for parsing TripIt responses as they're streamed in.
+
+Compares the peak memory and time of reading a `/list/trip` page with
+`tripit.core.v1.json_stream` against reading its whole body and decoding it.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import json
+import time
+import tracemalloc
+import pytest
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit.core.v1.json_stream import iter_objects
+from tripit.trips import TRIP_OBJECT_TYPES
+
+TRIP_COUNT = 500
+LODGINGS_PER_TRIP = 4
+CHUNK_SIZE = 64 * 1024
+
+
+def _make_body():
+    # Hotels are a large part of real responses, and we don't use them.
+    account = SyntheticTripIt(
+        TRIP_COUNT,
+        segments_per_flight=(4, 4),
+        notes_per_trip=(1, 1),
+        lodgings_per_trip=(LODGINGS_PER_TRIP, LODGINGS_PER_TRIP),
+    )
+    return json.dumps(account.payload()).encode("utf-8")
+
+
+def _measure(read):
+    # Tracing allocations slows everything down, so time it separately.
+    started_at = time.perf_counter()
+    read()
+    elapsed = time.perf_counter() - started_at
+    tracemalloc.start()
+    read()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak_bytes
+
+
+@pytest.mark.benchmark
+def test_benchmark_streaming_trip_response():
+    """
+    Peak memory and time spent reading one large page of trips.
+    """
+    body = _make_body()
+
+    def _chunks():
+        for start in range(0, len(body), CHUNK_SIZE):
+            yield body[start : start + CHUNK_SIZE]
+
+    def _read_whole_body():
+        # What requests does: join every chunk, decode it, then parse it.
+        return json.loads(b"".join(_chunks()).decode("utf-8"))
+
+    def _read_streamed():
+        trip_objects = {}
+        for key, value in iter_objects(_chunks(), TRIP_OBJECT_TYPES):
+            trip_objects.setdefault(key, []).append(value)
+        return trip_objects
+
+    whole_seconds, whole_peak = _measure(_read_whole_body)
+    streamed_seconds, streamed_peak = _measure(_read_streamed)
+    print(
+        f"\n{len(body) / 1024 / 1024:.1f} MiB page: "
+        f"whole body {whole_seconds * 1000:.0f} ms, peak {whole_peak / 1024 / 1024:.1f} MiB; "
+        f"streamed {streamed_seconds * 1000:.0f} ms, peak {streamed_peak / 1024 / 1024:.1f} MiB"
+    )
+    assert streamed_peak < whole_peak
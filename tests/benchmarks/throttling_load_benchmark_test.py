@@ -0,0 +1,115 @@
+"""
+A load test for looking up access tokens while DynamoDB throttles us.
+
+DynamoDB Local never throttles, so reads beyond a token bucket's rate are
+answered with ProvisionedThroughputExceededException before they reach it,
+like a table with little read capacity would. Lookups are made by many threads
+at once, with and without retries, and each is counted as found (200),
+throttled (503) or missing (403). Nothing should be mistaken for missing.
+These need DynamoDB Local; point AWS_DYNAMODB_ENDPOINT_URL at it.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import collections
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from botocore.exceptions import ClientError
+from pynamodb.connection.base import Connection
+from tripit.auth import models
+from tripit.auth.store import TokenStoreThrottled, reset_token_store
+from tripit.auth.token import get_token_data_for_access_key
+
+READS_PER_SECOND = 100
+BURST = 10
+THREADS = 16
+LOOKUPS_PER_THREAD = 25
+
+
+class _TokenBucket:  # pylint: disable=too-few-public-methods
+    """ Allows `rate` reads per second, with bursts of up to `burst`. """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """ Takes a token, returning False if there aren't any. """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+@pytest.fixture(name="throttled_dynamodb")
+def fixture_throttled_dynamodb(monkeypatch):
+    """
+    Saves a token in DynamoDB Local and throttles reads from it to
+    `READS_PER_SECOND`. Reads take from the last bucket in the list that's
+    returned, so appending a new one starts over.
+    """
+    if not os.getenv("AWS_DYNAMODB_ENDPOINT_URL"):
+        pytest.skip("AWS_DYNAMODB_ENDPOINT_URL needs to point at DynamoDB Local")
+    monkeypatch.delenv("TRIPIT_TOKEN_STORE", raising=False)
+    monkeypatch.delenv("TRIPIT_TOKEN_CACHE_TTL_SECONDS", raising=False)
+    reset_token_store()
+    models.provision_tables()
+    models.TripitAccessToken.insert("load-test-key", "load-test-token", "load-test-secret")
+    dispatch = Connection.dispatch
+    buckets = [_TokenBucket(READS_PER_SECOND, BURST)]
+
+    def _throttled_dispatch(self, operation_name, operation_kwargs):
+        if operation_name == "GetItem" and not buckets[-1].take():
+            raise ClientError(
+                {"Error": {"Code": "ProvisionedThroughputExceededException"}}, operation_name
+            )
+        return dispatch(self, operation_name, operation_kwargs)
+
+    monkeypatch.setattr(Connection, "dispatch", _throttled_dispatch)
+    return buckets
+
+
+def _look_up_tokens():
+    def _look_up():
+        try:
+            if get_token_data_for_access_key("load-test-key") is None:
+                return 403
+            return 200
+        except TokenStoreThrottled:
+            return 503
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        outcomes = list(executor.map(lambda _: _look_up(), range(THREADS * LOOKUPS_PER_THREAD)))
+    return collections.Counter(outcomes), time.perf_counter() - started_at
+
+
+@pytest.mark.benchmark
+def test_load_while_throttled(monkeypatch, throttled_dynamodb):
+    """
+    Outcomes of concurrent token lookups against a throttled table, with and
+    without retries.
+    """
+    results = {}
+    for retries in ("0", "4"):
+        monkeypatch.setenv("TRIPIT_DYNAMODB_THROTTLE_RETRIES", retries)
+        models.reset_retry_policy()
+        throttled_dynamodb.append(_TokenBucket(READS_PER_SECOND, BURST))
+        results[retries] = _look_up_tokens()
+        outcomes, elapsed = results[retries]
+        print(
+            f"\n{retries} retries: {outcomes[200]} found, {outcomes[503]} throttled, "
+            f"{outcomes[403]} denied in {elapsed:.2f}s"
+        )
+    models.reset_retry_policy()
+    assert all(outcomes[403] == 0 for outcomes, _ in results.values())
+    assert results["4"][0][200] > results["0"][0][200]
@@ -0,0 +1,40 @@
+"""
+Benchmarks for looking up access tokens in each token store.
+
+This is what every call to /trips and /current_trip pays before it can ask
+TripIt for anything. DynamoDB is only measured when AWS_DYNAMODB_ENDPOINT_URL
+points at DynamoDB Local.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import os
+import timeit
+import pytest
+from tripit.auth.store import DynamoDBTokenStore, MemoryTokenStore, SQLiteTokenStore
+
+LOOKUPS = 1000
+
+
+def _create_store(kind, tmp_path):
+    if kind == "memory":
+        return MemoryTokenStore()
+    if kind == "sqlite":
+        return SQLiteTokenStore(str(tmp_path / "tokens.db"))
+    if not os.getenv("AWS_DYNAMODB_ENDPOINT_URL"):
+        pytest.skip("AWS_DYNAMODB_ENDPOINT_URL needs to point at DynamoDB Local")
+    return DynamoDBTokenStore()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("kind", ["memory", "sqlite", "dynamodb"])
+def test_benchmark_access_token_lookups(kind, tmp_path):
+    """
+    Time taken to look up an access key's token in each store.
+    """
+    store = _create_store(kind, tmp_path)
+    store.put_access_token("benchmark-key", "benchmark-token", "benchmark-secret")
+    lookups = LOOKUPS if kind != "dynamodb" else LOOKUPS // 10
+    elapsed = timeit.timeit(lambda: store.get_access_token("benchmark-key"), number=lookups)
+    print(f"\n{kind}: {elapsed / lookups * 1e6:.1f} us per access token lookup")
+    assert store.get_access_token("benchmark-key")["token"] == "benchmark-token"
+    store.delete_access_token("benchmark-key")
@@ -0,0 +1,121 @@
+"""
+Benchmarks for the DynamoDB round trips that `/auth` and `/callback` make to
+save tokens.
+
+Compares the writes that we used to make, which checked that the table exists
+and read the item before and after saving it, against a single conditional
+PutItem. These need DynamoDB Local; point AWS_DYNAMODB_ENDPOINT_URL at it.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import os
+import time
+import pytest
+from pynamodb.connection.base import Connection
+from tripit.auth import models
+from tripit.auth.step_1 import get_authn_url
+from tripit.auth.step_2 import handle_callback
+
+WRITES = 50
+
+
+def _legacy_insert_request_token(token, access_key, token_secret):
+    model = models.TripitRequestToken
+    if not model.exists():
+        model.create_table()
+    try:
+        model.get(token)
+    except model.DoesNotExist:
+        new_mapping = model(token, access_key=access_key, token_secret=token_secret)
+        new_mapping.save()
+        new_mapping.refresh()
+
+
+def _legacy_insert_access_token(access_key, token, token_secret):
+    model = models.TripitAccessToken
+    if not model.exists():
+        model.create_table()
+    new_mapping = model(access_key, token=token, token_secret=token_secret)
+    new_mapping.save()
+    new_mapping.refresh()
+
+
+@pytest.fixture(name="dynamodb_operations")
+def fixture_dynamodb_operations(monkeypatch):
+    """
+    Provisions our tables in DynamoDB Local and records every operation sent to it.
+    """
+    if not os.getenv("AWS_DYNAMODB_ENDPOINT_URL"):
+        pytest.skip("AWS_DYNAMODB_ENDPOINT_URL needs to point at DynamoDB Local")
+    models.provision_tables()
+    operations = []
+    dispatch = Connection.dispatch
+
+    def _recording_dispatch(self, operation_name, operation_kwargs):
+        operations.append(operation_name)
+        return dispatch(self, operation_name, operation_kwargs)
+
+    monkeypatch.setattr(Connection, "dispatch", _recording_dispatch)
+    return operations
+
+
+def _time_writes(operations, write):
+    operations.clear()
+    started_at = time.perf_counter()
+    for number in range(WRITES):
+        write(f"benchmark-{time.time_ns()}-{number}", "benchmark-token", "benchmark-secret")
+    elapsed = time.perf_counter() - started_at
+    return len(operations) / WRITES, elapsed / WRITES * 1000
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "table,legacy_write,write",
+    [
+        (
+            "request tokens",
+            _legacy_insert_request_token,
+            lambda *args: models.TripitRequestToken.insert(*args),
+        ),
+        (
+            "access tokens",
+            _legacy_insert_access_token,
+            lambda *args: models.TripitAccessToken.insert(*args),
+        ),
+    ],
+)
+def test_benchmark_token_writes(dynamodb_operations, table, legacy_write, write):
+    """
+    Round trips and latency per token written, before and after.
+    """
+    legacy_calls, legacy_ms = _time_writes(dynamodb_operations, legacy_write)
+    calls, latency_ms = _time_writes(dynamodb_operations, write)
+    print(
+        f"\nWriting {table}: {legacy_calls:.0f} calls, {legacy_ms:.2f} ms before; "
+        f"{calls:.0f} calls, {latency_ms:.2f} ms after"
+    )
+    assert calls == 1
+    assert calls < legacy_calls
+
+
+@pytest.mark.benchmark
+def test_benchmark_round_trips_per_oauth_step(monkeypatch, dynamodb_operations):
+    """
+    Every DynamoDB operation made while starting to authorize an access key and
+    while handling TripIt's callback for it.
+    """
+    access_key = f"benchmark-{time.time_ns()}"
+    monkeypatch.setattr(
+        "tripit.core.v1.oauth.fetch_token",
+        lambda *args, **kwargs: {"token": access_key, "token_secret": "benchmark-secret"},
+    )
+    dynamodb_operations.clear()
+    assert get_authn_url("/develop", "foo.com", access_key) is not None
+    auth_operations = list(dynamodb_operations)
+    dynamodb_operations.clear()
+    assert handle_callback(access_key) is True
+    callback_operations = list(dynamodb_operations)
+    print(f"\n/auth: {', '.join(auth_operations)}\n/callback: {', '.join(callback_operations)}")
+    assert auth_operations.count("PutItem") == 1
+    assert callback_operations.count("PutItem") == 1
+    assert "DescribeTable" not in auth_operations + callback_operations
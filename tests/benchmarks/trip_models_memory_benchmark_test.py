@@ -0,0 +1,56 @@
+"""
+Benchmarks for how much memory resolved trips take up.
+
+Compares the slotted `Trip` and `FlightSegment` models against the dicts that
+trips used to be resolved into.
+Run them with: python -m pytest -s -m benchmark tests/benchmarks
+"""
+
+import json
+import tracemalloc
+import pytest
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit.trips import index_trip_payload, resolve_trip
+
+TRIP_COUNT = 2000
+SEGMENTS_PER_FLIGHT = 4
+
+
+def _measure_retained_bytes(build):
+    tracemalloc.start()
+    built = build()
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, retained_bytes
+
+
+@pytest.mark.benchmark
+def test_benchmark_trip_model_memory():
+    """
+    Memory retained per resolved trip, as models and as dicts.
+    """
+    account = SyntheticTripIt(
+        TRIP_COUNT,
+        flights_per_trip=(1, 1),
+        segments_per_flight=(SEGMENTS_PER_FLIGHT, SEGMENTS_PER_FLIGHT),
+        notes_per_trip=(1, 1),
+        empty_trip_fraction=0,
+    )
+    # Decoding from JSON keeps strings from being shared the way literals would be.
+    trips_json = json.loads(json.dumps(account.payload()))
+    trips, flights, notes = index_trip_payload(trips_json)
+
+    models, model_bytes = _measure_retained_bytes(
+        lambda: [resolve_trip(trip, flights, notes) for trip in trips]
+    )
+    dicts, dict_bytes = _measure_retained_bytes(
+        lambda: [resolve_trip(trip, flights, notes).to_dict() for trip in trips]
+    )
+
+    assert [model.to_dict() for model in models] == dicts
+    print(
+        f"\n{TRIP_COUNT} trips x {SEGMENTS_PER_FLIGHT} segments: "
+        f"dicts {dict_bytes / TRIP_COUNT:.0f} B/trip, "
+        f"models {model_bytes / TRIP_COUNT:.0f} B/trip "
+        f"({dict_bytes / model_bytes:.1f}x smaller)"
+    )
@@ -9,6 +9,7 @@ import time
 import urllib.parse
 import pytest
 import timeout_decorator
+from tripit.auth import models
 from tripit.logging import logger
 
 
@@ -17,7 +18,7 @@ from tripit.logging import logger
 def wait_for_persistence():
     """
     Ensure that the endpoint that we are using for persisting tokens is available before running
-    any tests.
+    any tests, and that its tables have been provisioned.
     """
     if not os.environ.get("AWS_DYNAMODB_ENDPOINT_URL"):
         return True
@@ -35,3 +36,5 @@ def wait_for_persistence():
             logger.warning("Failed to connect to persistence at %s.", db_parts.netloc)
             time.sleep(1)
             continue
+    models.provision_tables()
+    return True
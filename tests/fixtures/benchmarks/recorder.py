@@ -0,0 +1,150 @@
+"""
+Records benchmark results and compares them against a baseline.
+
+Every result is written as JSON to BENCHMARK_RESULTS_PATH, if it's set, once
+every benchmark has run. Save a run as a baseline and point
+BENCHMARK_BASELINE_PATH at it to fail every benchmark whose throughput drops by
+more than BENCHMARK_REGRESSION_THRESHOLD, a fraction, from it:
+
+    BENCHMARK_RESULTS_PATH=baseline.json python -m pytest -s -m benchmark tests/benchmarks
+    # ...make some changes...
+    BENCHMARK_BASELINE_PATH=baseline.json python -m pytest -s -m benchmark tests/benchmarks
+
+Each benchmark runs for at least BENCHMARK_MIN_SECONDS. Baselines only mean
+something on the machine that recorded them, so we don't check any in.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+import pytest
+
+DEFAULT_MIN_SECONDS = 1.0
+DEFAULT_MIN_RUNS = 5
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+
+def measure(operation, min_seconds=DEFAULT_MIN_SECONDS, min_runs=DEFAULT_MIN_RUNS):
+    """
+    Runs `operation` for at least `min_seconds` and `min_runs` times and returns
+    its throughput, latency percentiles and peak memory.
+
+    It's run once beforehand to warm up caches. Tracing allocations slows
+    everything down, so peak memory is measured on a separate run.
+    """
+    operation()
+    latencies = []
+    started_at = time.perf_counter()
+    while len(latencies) < min_runs or time.perf_counter() - started_at < min_seconds:
+        run_started_at = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - run_started_at)
+    elapsed = time.perf_counter() - started_at
+
+    tracemalloc.start()
+    operation()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "runs": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "peak_memory_kib": peak_bytes / 1024,
+    }
+
+
+def find_regression(result, baseline_result, threshold):
+    """
+    Returns why `result` is a regression from `baseline_result`, or None if its
+    throughput is within `threshold` of it.
+    """
+    slowest_allowed = baseline_result["ops_per_sec"] * (1 - threshold)
+    if result["ops_per_sec"] >= slowest_allowed:
+        return None
+    return (
+        f"{result['ops_per_sec']:.1f} ops/sec is more than {threshold:.0%} slower than "
+        f"the baseline's {baseline_result['ops_per_sec']:.1f} ops/sec"
+    )
+
+
+class BenchmarkRecorder:
+    """
+    Measures benchmarks by name and fails those that regressed from `baseline`.
+    """
+
+    def __init__(
+        self, baseline=None, threshold=DEFAULT_REGRESSION_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS
+    ):
+        self.baseline = baseline or {}
+        self.threshold = threshold
+        self.min_seconds = min_seconds
+        self.results = {}
+
+    def record(self, name, operation, **kwargs):
+        """
+        Measures `operation` (see `measure`), prints and keeps its results and
+        fails the current test if it regressed.
+        """
+        kwargs.setdefault("min_seconds", self.min_seconds)
+        result = measure(operation, **kwargs)
+        self.results[name] = result
+        baseline_result = self.baseline.get(name)
+        if baseline_result is None:
+            change = "no baseline"
+        else:
+            change = f"{result['ops_per_sec'] / baseline_result['ops_per_sec'] - 1:+.1%}"
+        print(
+            f"\n{name:<40} {result['ops_per_sec']:>10.1f} ops/sec ({change}), "
+            f"p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, "
+            f"p99 {result['p99_ms']:.2f} ms, peak {result['peak_memory_kib']:.0f} KiB"
+        )
+        if baseline_result is not None:
+            regression = find_regression(result, baseline_result, self.threshold)
+            if regression:
+                pytest.fail(f"{name} regressed: {regression}")
+        return result
+
+    def save(self, path):
+        """
+        Writes every result so far to `path`, which can be used as a baseline later.
+        """
+        document = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "benchmarks": dict(sorted(self.results.items())),
+        }
+        Path(path).write_text(json.dumps(document, indent=2) + "\n")
+
+
+def load_baseline(path):
+    """
+    Returns the results in a file written by `BenchmarkRecorder.save`.
+    """
+    return json.loads(Path(path).read_text())["benchmarks"]
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder():
+    """
+    A `BenchmarkRecorder` shared by every benchmark in this run, configured from
+    the BENCHMARK_* environment variables described above.
+    """
+    baseline = None
+    if os.getenv("BENCHMARK_BASELINE_PATH"):
+        baseline = load_baseline(os.getenv("BENCHMARK_BASELINE_PATH"))
+    threshold = float(
+        os.getenv("BENCHMARK_REGRESSION_THRESHOLD") or DEFAULT_REGRESSION_THRESHOLD
+    )
+    min_seconds = float(os.getenv("BENCHMARK_MIN_SECONDS") or DEFAULT_MIN_SECONDS)
+    recorder = BenchmarkRecorder(baseline, threshold, min_seconds)
+    yield recorder
+    if os.getenv("BENCHMARK_RESULTS_PATH") and recorder.results:
+        recorder.save(os.getenv("BENCHMARK_RESULTS_PATH"))
@@ -0,0 +1,334 @@
+"""
+Generates realistic TripIt accounts of any size for tests and benchmarks.
+
+`tests/mocks/trips.json` is great for checking behavior, but it has seven trips.
+This makes accounts that look like a heavy traveler's: trips one after another
+with connecting flights across time zones, hotels, notes, trips without
+locations, empty trips and the single-object-instead-of-a-list shapes that
+TripIt uses when there's only one of something.
+
+Every trip is generated from the seed and its index alone, so any page of an
+account with 100,000 trips can be generated without generating the rest.
+"""
+
+import datetime
+import random
+import pytest
+
+FIRST_TRIP_ID = 100000000
+FIRST_TRIP_DATE = datetime.date(2012, 1, 2)
+DAYS_BETWEEN_TRIPS = 9
+# Large accounts squeeze their trips, overlapping them if need be, into this many days.
+ACCOUNT_SPAN_DAYS = 6000
+
+# Code, city, UTC offset. Offsets are fixed since TripIt gives us one per time.
+AIRPORTS = [
+    ("ATL", "Atlanta, GA", "-05:00"),
+    ("BOS", "Boston, MA", "-05:00"),
+    ("DEN", "Denver, CO", "-07:00"),
+    ("DFW", "Dallas, TX", "-06:00"),
+    ("JFK", "New York, NY", "-05:00"),
+    ("LAX", "Los Angeles, CA", "-08:00"),
+    ("OMA", "Omaha, NE", "-06:00"),
+    ("ORD", "Chicago, IL", "-06:00"),
+    ("PHX", "Phoenix, AZ", "-07:00"),
+    ("SEA", "Seattle, WA", "-08:00"),
+    ("SFO", "San Francisco, CA", "-08:00"),
+    ("LHR", "London, England", "+00:00"),
+    ("CDG", "Paris, France", "+01:00"),
+    ("NRT", "Tokyo, Japan", "+09:00"),
+    ("BOM", "Mumbai, India", "+05:30"),
+    ("SYD", "Sydney, Australia", "+10:00"),
+]
+AIRLINES = [
+    ("AA", "American Airlines"),
+    ("DL", "Delta Air Lines"),
+    ("UA", "United Airlines"),
+    ("WN", "Southwest Airlines"),
+    ("BA", "British Airways"),
+]
+HOTELS = ["Hilton Garden Inn", "Hampton Inn", "Marriott Courtyard", "Hyatt Place", "Westin"]
+
+
+# pylint: disable=too-many-instance-attributes,too-few-public-methods
+class SyntheticTripIt:
+    """
+    A TripIt account with `trip_count` trips. Ranges like `segments_per_flight`
+    are inclusive `(low, high)` bounds that each trip picks from; fractions are
+    the chance that a trip has that quirk.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        trip_count,
+        seed=0,
+        flights_per_trip=(1, 3),
+        segments_per_flight=(1, 3),
+        notes_per_trip=(0, 2),
+        lodgings_per_trip=(0, 2),
+        ended_note_fraction=0.05,
+        missing_location_fraction=0.02,
+        empty_trip_fraction=0.01,
+    ):
+        self.trip_count = trip_count
+        self.seed = seed
+        self.flights_per_trip = flights_per_trip
+        self.segments_per_flight = segments_per_flight
+        self.notes_per_trip = notes_per_trip
+        self.lodgings_per_trip = lodgings_per_trip
+        self.ended_note_fraction = ended_note_fraction
+        self.missing_location_fraction = missing_location_fraction
+        self.empty_trip_fraction = empty_trip_fraction
+
+    def payload(self, include_objects=True):
+        """ Returns every trip as one `/list/trip` payload. """
+        return self.payload_for(range(self.trip_count), include_objects)
+
+    def page(self, page_num, page_size, include_objects=True):
+        """ Returns a page of `/list/trip`, like TripIt does with `page_num`. """
+        start = (page_num - 1) * page_size
+        payload = self.payload_for(
+            range(start, min(start + page_size, self.trip_count)), include_objects
+        )
+        payload["page_num"] = str(page_num)
+        payload["page_size"] = str(page_size)
+        payload["max_page"] = str(max(1, -(-self.trip_count // page_size)))
+        return payload
+
+    def payload_for(self, trip_indexes, include_objects=True):
+        """
+        Returns the trips at `trip_indexes`, and their objects unless told
+        otherwise, as a `/list/trip` payload. Object types that only have one
+        object are given as that object instead of a list, just like TripIt does.
+        """
+        objects = {"Trip": [], "AirObject": [], "LodgingObject": [], "NoteObject": []}
+        for trip_index in trip_indexes:
+            for object_type, trip_objects in self.trip(trip_index, include_objects).items():
+                objects[object_type].extend(trip_objects)
+        payload = {"timestamp": "1585000000", "num_bytes": "0"}
+        for object_type, trip_objects in objects.items():
+            if trip_objects:
+                payload[object_type] = _one_or_many(trip_objects)
+        payload["Profile"] = _profile()
+        return payload
+
+    def trip_index(self, trip_id):
+        """ Returns the index of the trip with this ID. """
+        return int(trip_id) - FIRST_TRIP_ID
+
+    def trip(self, trip_index, include_objects=True):
+        """
+        Returns the trip at `trip_index` and, unless told otherwise, its
+        objects, by object type.
+        """
+        rng = random.Random(self.seed * 1000003 + trip_index)
+        trip_id = str(FIRST_TRIP_ID + trip_index)
+        days_between_trips = min(DAYS_BETWEEN_TRIPS, ACCOUNT_SPAN_DAYS / max(1, self.trip_count))
+        starts_on = FIRST_TRIP_DATE + datetime.timedelta(
+            days=int(trip_index * days_between_trips) + rng.randint(0, 2)
+        )
+        if rng.random() < self.empty_trip_fraction:
+            return {"Trip": [_empty_trip(trip_id)]}
+
+        # Everything about the trip itself is drawn before its objects so that
+        # listing trips without them is cheap.
+        home, destination = rng.sample(AIRPORTS, 2)
+        trip_days = rng.randint(1, 6)
+        ends_on = starts_on + datetime.timedelta(days=trip_days)
+        trip = _trip(trip_id, trip_index, starts_on, ends_on, destination)
+        if rng.random() < self.missing_location_fraction:
+            del trip["primary_location"]
+            del trip["PrimaryLocationAddress"]
+        has_ended_note = rng.random() < self.ended_note_fraction
+        if not include_objects:
+            return {"Trip": [trip]}
+
+        flights = []
+        flight_count = rng.randint(*self.flights_per_trip)
+        for flight_index in range(flight_count):
+            # Flights alternate between going out and coming back home.
+            origin, final_stop = (home, destination)[:: 1 if flight_index % 2 == 0 else -1]
+            flight_day = starts_on + datetime.timedelta(
+                days=round(flight_index * trip_days / max(1, flight_count - 1))
+            )
+            departs_at = _utc(flight_day, rng.randint(6, 20), rng.choice(range(0, 60, 5)), origin)
+            flights.append(
+                _flight(rng, trip_id, flight_index, origin, final_stop, departs_at, self)
+            )
+        notes = [
+            _note(trip_id, note_index, "Note")
+            for note_index in range(rng.randint(*self.notes_per_trip))
+        ]
+        if has_ended_note:
+            notes.append(_note(trip_id, len(notes), "TRIP_ENDED"))
+        lodgings = [
+            _lodging(rng, trip_id, lodging_index, destination, starts_on, ends_on)
+            for lodging_index in range(rng.randint(*self.lodgings_per_trip))
+        ]
+        return {
+            "Trip": [trip],
+            "AirObject": flights,
+            "LodgingObject": lodgings,
+            "NoteObject": notes,
+        }
+
+
+def _one_or_many(trip_objects):
+    return trip_objects[0] if len(trip_objects) == 1 else trip_objects
+
+
+def _utc(date, hour, minute, airport):
+    local_time = datetime.datetime(date.year, date.month, date.day, hour, minute)
+    return local_time - _offset(airport[2])
+
+
+def _offset(utc_offset):
+    sign = -1 if utc_offset.startswith("-") else 1
+    hours, minutes = utc_offset.lstrip("+-").split(":")
+    return sign * datetime.timedelta(hours=int(hours), minutes=int(minutes))
+
+
+def _date_time(utc_time, airport):
+    local_time = utc_time + _offset(airport[2])
+    return {
+        "date": local_time.date().isoformat(),
+        "time": local_time.time().isoformat(),
+        "timezone": "Etc/Unknown",
+        "utc_offset": airport[2],
+    }
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def _flight(rng, trip_id, flight_index, origin, final_stop, departs_at, account):
+    """
+    Returns an `AirObject` from `origin` to `final_stop`, connecting through
+    other airports.
+    """
+    segment_count = rng.randint(*account.segments_per_flight)
+    connections = [
+        airport
+        for airport in rng.sample(AIRPORTS, min(len(AIRPORTS), segment_count + 2))
+        if airport not in (origin, final_stop)
+    ][: segment_count - 1]
+    stops = [origin, *connections, final_stop]
+    airline_code, airline_name = rng.choice(AIRLINES)
+    segments = []
+    for start, end in zip(stops, stops[1:]):
+        arrives_at = departs_at + datetime.timedelta(minutes=rng.randint(55, 660))
+        segments.append(
+            {
+                "Status": {"flight_status": "200", "last_modified": "1574746169"},
+                "StartDateTime": _date_time(departs_at, start),
+                "EndDateTime": _date_time(arrives_at, end),
+                "start_airport_code": start[0],
+                "start_city_name": start[1],
+                "start_gate": f"{rng.choice('ABCDE')}{rng.randint(1, 40)}",
+                "end_airport_code": end[0],
+                "end_city_name": end[1],
+                "end_gate": f"{rng.choice('ABCDE')}{rng.randint(1, 40)}",
+                "marketing_airline": airline_name,
+                "marketing_airline_code": airline_code,
+                "marketing_flight_number": str(rng.randint(1, 9999)),
+                "aircraft": "738",
+                "aircraft_display_name": "Boeing 737-800 Passenger",
+                "duration": str(arrives_at - departs_at),
+                "stops": "nonstop",
+                "is_hidden": "false",
+                "id": f"{trip_id}{flight_index}{len(segments)}",
+                "is_international": "false",
+                "Emissions": {"co2": f"{rng.random():.5f}"},
+            }
+        )
+        departs_at = arrives_at + datetime.timedelta(minutes=rng.randint(45, 180))
+    flight = {
+        "id": f"{trip_id}{flight_index}",
+        "trip_id": trip_id,
+        "is_client_traveler": "true",
+        "relative_url": f"/reservation/show/id/{trip_id}{flight_index}",
+        "display_name": "Flight",
+        "is_display_name_auto_generated": "true",
+        "last_modified": "1574746169",
+        "booking_site_name": airline_name,
+        "is_purchased": "true",
+        "is_tripit_booking": "false",
+        "Segment": _one_or_many(segments),
+    }
+    return flight
+
+
+def _trip(trip_id, trip_index, starts_on, ends_on, destination):
+    city, _, state = destination[1].partition(", ")
+    return {
+        "id": trip_id,
+        "relative_url": f"/trip/show/id/{trip_id}",
+        "start_date": starts_on.isoformat(),
+        "end_date": ends_on.isoformat(),
+        "display_name": f"Trip {trip_index}: {destination[1]}",
+        "image_url": "https://www.tripit.com/images/places/generic.jpg",
+        "is_private": "false",
+        "primary_location": destination[1],
+        "PrimaryLocationAddress": {"address": destination[1], "city": city, "state": state},
+        "TripPurposes": {"purpose_type_code": "B", "is_auto_generated": "false"},
+        "last_modified": "1574752207",
+        "is_trip_owner_inner_circle_sharer": "false",
+    }
+
+
+def _empty_trip(trip_id):
+    return {
+        "id": trip_id,
+        "relative_url": f"/trip/show/id/{trip_id}",
+        "display_name": "Empty trip",
+        "is_private": "false",
+        "last_modified": "1574752207",
+    }
+
+
+def _note(trip_id, note_index, display_name):
+    return {
+        "id": f"{trip_id}{note_index}",
+        "trip_id": trip_id,
+        "display_name": display_name,
+        "text": "Synthetic note.",
+    }
+
+
+# pylint: disable=too-many-arguments
+def _lodging(rng, trip_id, lodging_index, destination, starts_on, ends_on):
+    hotel = rng.choice(HOTELS)
+    return {
+        "id": f"{trip_id}{lodging_index}",
+        "trip_id": trip_id,
+        "relative_url": f"/reservation/show/id/{trip_id}{lodging_index}",
+        "display_name": f"{hotel} {destination[1]}",
+        "supplier_name": f"{hotel} {destination[1]}",
+        "supplier_conf_num": str(rng.randint(10 ** 9, 10 ** 10)),
+        "restrictions": "Your reservation is guaranteed for late arrival. " * 3,
+        "total_cost": f"{rng.randint(90, 900)}.{rng.randint(0, 99):02d} USD",
+        "StartDateTime": {"date": starts_on.isoformat(), "time": "15:00:00"},
+        "EndDateTime": {"date": ends_on.isoformat(), "time": "12:00:00"},
+        "Address": {"address": destination[1]},
+    }
+
+
+def _profile():
+    return {
+        "@attributes": {"ref": "synthetic"},
+        "ProfileEmailAddresses": {
+            "ProfileEmailAddress": {"address": "traveler@example.com", "is_primary": "true"}
+        },
+        "is_client": "true",
+        "is_pro": "true",
+        "screen_name": "traveler",
+        "public_display_name": "Synthetic Traveler",
+    }
+
+
+@pytest.fixture()
+def synthetic_tripit():
+    """
+    Creates `SyntheticTripIt` accounts. Call it with the number of trips and any
+    other options.
+    """
+    return SyntheticTripIt
@@ -8,7 +8,7 @@ this relationship.
 
 import pytest
 from pynamodb.exceptions import TransactWriteError
-from tripit.auth.models import TripitAccessToken
+from tripit.auth import models
 from tripit.logging import logger
 
 
@@ -20,13 +20,13 @@ def query_access_token_table():
 
     def _run(access_key):
         try:
-            item = TripitAccessToken.get(access_key)
+            item = models.TripitAccessToken.get(access_key)
             return {
                 "access_key": item.access_key,
                 "token": item.token,
                 "token_secret": item.token_secret,
             }
-        except TripitAccessToken.DoesNotExist:
+        except models.TripitAccessToken.DoesNotExist:
             logger.error("Key not found during test: %s", access_key)
 
     return _run
@@ -40,7 +40,8 @@ def set_access_token_table():
 
     def _run(access_key, token, secret):
         try:
-            TripitAccessToken.insert(access_key, token, secret)
+            models.provision_table(models.TripitAccessToken)
+            models.TripitAccessToken.insert(access_key, token, secret)
         except TransactWriteError:
             logger.error("Failed to mock a request token mapping for %s", access_key)
 
@@ -55,6 +56,7 @@ def drop_access_token_table():
     """
 
     def _run():
-        TripitAccessToken.delete_table()
+        models.deprovision_table(models.TripitAccessToken)
+        models.provision_table(models.TripitAccessToken)
 
     return _run
@@ -22,6 +22,15 @@ class FakeResponse:
             self.json = lambda *args, **kwargs: json_object
             self.text = json.dumps(json_object)
 
+    def iter_content(self, chunk_size=1, *args, **kwargs):
+        """ Streams our body back in chunks, like requests does. """
+        body = self.text.encode("utf-8")
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+
+    def close(self):
+        """ Nothing to release. """
+
 
 # We need to assume that we will get anonymous arguments here, since
 # this is a function being monkeypatched-in.
@@ -0,0 +1,333 @@
+"""
+A fake TripIt that listens on localhost.
+
+Unlike `fake_response_from_route`, this goes over real HTTP, so it exercises our
+HTTP clients, OAuth headers and JSON decoding too. It can be slowed down, made
+to fail or made to throttle us, so it's also useful for benchmarking and load
+testing everything offline. Run it on its own with:
+
+    python -m tests.fixtures.unit.fake_tripit_server --help
+
+and point TRIPIT_API_BASE_URL at it.
+"""
+
+import argparse
+import http.server
+import json
+import math
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+import pytest
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit.core.v1.oauth import OAuthSigner
+from tripit.core.v1.session import close_session
+
+MOCK_TRIPS_PATH = Path(__file__).parents[2] / "mocks" / "trips.json"
+
+
+# pylint: disable=too-many-instance-attributes
+class FakeTripItServer:
+    """
+    Serves `/v1/list/trip`, `/v1/get/trip` and `/oauth/*` from a `/list/trip`
+    payload, like `tests/mocks/trips.json`, or from a
+    `tests.fixtures.synthetic_trips.SyntheticTripIt`, whose pages are only
+    generated as they're asked for.
+
+    Every response is delayed by a latency drawn from a log-normal distribution
+    with a median of `latency_ms`; `latency_sigma` widens its tail and zero
+    makes it fixed. `error_rate` and `throttle_rate` are the fractions of
+    requests answered with a 503 and a 429, respectively.
+
+    Signatures are only checked if a `consumer_secret` is given. Tokens from
+    `/oauth/*` are then the only ones accepted by `/v1/*`.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        payload=None,
+        host="127.0.0.1",
+        port=0,
+        latency_ms=0,
+        latency_sigma=0,
+        error_rate=0,
+        throttle_rate=0,
+        consumer_key=None,
+        consumer_secret=None,
+        seed=None,
+    ):
+        if payload is None:
+            payload = json.loads(MOCK_TRIPS_PATH.read_text())
+        self.payload = payload
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.consumer_key = consumer_key
+        self.consumer_secret = consumer_secret
+        self.requested_paths = []
+        self.status_counts = {}
+        self._token_secrets = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer((host, port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def base_url(self):
+        """ Where to point TRIPIT_API_BASE_URL. """
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """ Starts serving in the background. """
+        self._thread.start()
+
+    def stop(self):
+        """ Stops serving. """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, path, authorization=None):
+        """
+        Returns the status code, headers and body that TripIt would for a GET
+        to `path`, after waiting as long as TripIt might.
+        """
+        with self._lock:
+            self.requested_paths.append(path)
+            latency_seconds = self._sample_latency_seconds()
+            roll = self._random.random()
+        if latency_seconds:
+            time.sleep(latency_seconds)
+        if roll < self.throttle_rate:
+            status_code, headers, body = 429, {"Retry-After": "1"}, _json_body({})
+        elif roll < self.throttle_rate + self.error_rate:
+            status_code, headers, body = 503, {}, _json_body({})
+        elif self.consumer_secret is not None and not self._is_signed(path, authorization):
+            status_code, headers, body = 401, {}, _json_body({"Error": {"code": "401"}})
+        else:
+            status_code, headers, body = self.respond(path)
+        with self._lock:
+            self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+        return status_code, headers, body
+
+    def respond(self, path):
+        """
+        Returns the status code, headers and body for `path` when TripIt is
+        behaving.
+        """
+        if path.startswith("/oauth/"):
+            return self._respond_with_token()
+        status_code, body = self.respond_with_json(path)
+        return status_code, {}, _json_body(body)
+
+    def respond_with_json(self, path):
+        """
+        Returns the status code and JSON body for a GET to a `/v1` endpoint.
+        """
+        endpoint, params = _parse_path(path)
+        if isinstance(self.payload, SyntheticTripIt):
+            return self._respond_with_synthetic_json(endpoint, params)
+        trips = self.payload.get("Trip", [])
+        if isinstance(trips, dict):
+            trips = [trips]
+        if endpoint == "list/trip":
+            page_size = int(params.get("page_size", len(trips) or 1))
+            page_num = int(params.get("page_num", 1))
+            page_trips = trips[(page_num - 1) * page_size : page_num * page_size]
+            body = self._objects_for(page_trips, params.get("include_objects") == "true")
+            body["page_num"] = str(page_num)
+            body["page_size"] = str(page_size)
+            body["max_page"] = str(max(1, math.ceil(len(trips) / page_size)))
+            return 200, body
+        if endpoint == "get/trip":
+            found_trips = [trip for trip in trips if trip["id"] == params.get("id")]
+            if not found_trips:
+                return 404, {"Error": {"code": "404", "description": "Not found"}}
+            return 200, self._objects_for(found_trips, params.get("include_objects") == "true")
+        return 404, {}
+
+    def _respond_with_synthetic_json(self, endpoint, params):
+        account = self.payload
+        include_objects = params.get("include_objects") == "true"
+        if endpoint == "list/trip":
+            page_num = int(params.get("page_num", 1))
+            page_size = int(params.get("page_size", account.trip_count))
+            return 200, account.page(page_num, page_size, include_objects)
+        if endpoint == "get/trip":
+            trip_index = account.trip_index(params.get("id", "0"))
+            if not 0 <= trip_index < account.trip_count:
+                return 404, {"Error": {"code": "404", "description": "Not found"}}
+            return 200, account.payload_for([trip_index], include_objects)
+        return 404, {}
+
+    def _respond_with_token(self):
+        token, token_secret = secrets.token_hex(8), secrets.token_hex(16)
+        with self._lock:
+            self._token_secrets[token] = token_secret
+        body = f"oauth_token={token}&oauth_token_secret={token_secret}".encode("utf-8")
+        return 200, {"Content-Type": "application/x-www-form-urlencoded"}, body
+
+    def _sample_latency_seconds(self):
+        if not self.latency_ms:
+            return 0
+        return self.latency_ms * math.exp(self._random.gauss(0, self.latency_sigma)) / 1000
+
+    def _is_signed(self, path, authorization):
+        oauth_params = _parse_authorization(authorization)
+        if oauth_params.get("oauth_consumer_key") != self.consumer_key:
+            return False
+        token = oauth_params.get("oauth_token")
+        if path.startswith("/oauth/request_token"):
+            token_secret = None
+        elif token in self._token_secrets:
+            token_secret = self._token_secrets[token]
+        else:
+            return False
+        signature = OAuthSigner(self.consumer_key, self.consumer_secret, token, token_secret).sign(
+            "GET",
+            f"{self.base_url}{path}",
+            oauth_params.get("oauth_nonce", ""),
+            int(oauth_params.get("oauth_timestamp", 0)),
+        )
+        return oauth_params.get("oauth_signature") == signature.decode("utf-8")
+
+    def _objects_for(self, trips, include_objects):
+        body = {"timestamp": str(int(time.time())), "num_bytes": "0", "Trip": trips}
+        if include_objects:
+            trip_ids = {trip["id"] for trip in trips}
+            for object_type, objects in self.payload.items():
+                if not object_type.endswith("Object"):
+                    continue
+                if isinstance(objects, dict):
+                    objects = [objects]
+                body[object_type] = [obj for obj in objects if obj.get("trip_id") in trip_ids]
+            if "Profile" in self.payload:
+                body["Profile"] = self.payload["Profile"]
+        return body
+
+
+def _json_body(body):
+    return json.dumps(body).encode("utf-8")
+
+
+def _parse_path(path):
+    """
+    TripIt puts parameters in the path as `/key/value` pairs after the endpoint.
+    """
+    parts = path.split("?")[0].strip("/").split("/")[1:]
+    if parts[-2:] == ["format", "json"]:
+        parts = parts[:-2]
+    endpoint = "/".join(parts[:2])
+    return endpoint, dict(zip(parts[2::2], parts[3::2]))
+
+
+def _parse_authorization(authorization):
+    if not authorization or not authorization.startswith("OAuth "):
+        return {}
+    oauth_params = {}
+    for part in authorization[len("OAuth ") :].split(","):
+        key, _, value = part.partition("=")
+        oauth_params[key.strip()] = urllib.parse.unquote_plus(value.strip('"'))
+    return oauth_params
+
+
+def _handler_for(server):
+    class _Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """ Answers like TripIt would. """
+            status_code, headers, body = server.handle(
+                self.path, self.headers.get("Authorization")
+            )
+            self.send_response(status_code)
+            headers.setdefault("Content-Type", "application/json")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    return _Handler
+
+
+@pytest.fixture()
+def fake_tripit_server(monkeypatch):
+    """
+    Starts a fake TripIt and points our clients at it. Call it with the payload
+    to serve and any other `FakeTripItServer` options.
+
+    The shared HTTP session is started over with every server so that it picks
+    up any TRIPIT_HTTP_* settings made before then.
+    """
+    servers = []
+
+    def _start(payload=None, **kwargs):
+        server = FakeTripItServer(payload, **kwargs)
+        server.start()
+        servers.append(server)
+        monkeypatch.setenv("TRIPIT_API_BASE_URL", server.base_url)
+        close_session()
+        return server
+
+    yield _start
+    close_session()
+    for server in servers:
+        server.stop()
+
+
+def main():
+    """ Runs a fake TripIt until interrupted. """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--trips", type=int, help="Generate an account with this many trips instead of trips.json"
+    )
+    parser.add_argument("--latency-ms", type=float, default=0, help="Median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0, help="Log-normal spread")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction answered with 429")
+    parser.add_argument("--consumer-key", help="Check signatures from this consumer")
+    parser.add_argument("--consumer-secret", help="Check signatures with this secret")
+    parser.add_argument("--seed", type=int, help="Seeds generated trips and random failures")
+    args = parser.parse_args()
+
+    payload = None
+    if args.trips is not None:
+        payload = SyntheticTripIt(args.trips, seed=args.seed or 0)
+    server = FakeTripItServer(
+        payload,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        consumer_key=args.consumer_key,
+        consumer_secret=args.consumer_secret,
+        seed=args.seed,
+    )
+    server.start()
+    print(f"Fake TripIt listening; export TRIPIT_API_BASE_URL={server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
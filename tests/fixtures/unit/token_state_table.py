@@ -8,7 +8,7 @@ this relationship.
 
 import pytest
 from pynamodb.exceptions import TransactWriteError
-from tripit.auth.models import TripitRequestToken
+from tripit.auth import models
 from tripit.logging import logger
 
 
@@ -20,13 +20,13 @@ def query_request_token_table():
 
     def _run(token):
         try:
-            item = TripitRequestToken.get(token)
+            item = models.TripitRequestToken.get(token)
             return {
                 "access_key": item.access_key,
                 "token": item.token,
                 "token_secret": item.token_secret,
             }
-        except TripitRequestToken.DoesNotExist:
+        except models.TripitRequestToken.DoesNotExist:
             logger.error("Token not found during test: %s", token)
 
     return _run
@@ -40,10 +40,11 @@ def set_request_token_table():
 
     def _run(access_key, token, secret):
         try:
-            if not TripitRequestToken.exists():
-                TripitRequestToken.create_table(wait=True)
-            new_mapping = TripitRequestToken(token, access_key=access_key, token_secret=secret)
-            new_mapping.save()
+            models.provision_table(models.TripitRequestToken)
+            new_mapping = models.TripitRequestToken(
+                token, access_key=access_key, token_secret=secret
+            )
+            models.save_item(new_mapping)
             new_mapping.refresh()
         except TransactWriteError:
             logger.error("Failed to mock a request token mapping for %s", access_key)
@@ -59,6 +60,7 @@ def drop_request_token_table():
     """
 
     def _run():
-        TripitRequestToken.delete_table()
+        models.deprovision_table(models.TripitRequestToken)
+        models.provision_table(models.TripitRequestToken)
 
     return _run
@@ -20,7 +20,9 @@ def test_current_trip_endpoint_unauthenticated():
         "statusCode": 403,
         "body": json.dumps({"status": "error", "message": "Access denied; go to /auth first."}),
     }
-    assert current_trip(fake_event) == expected_response
+    response = current_trip(fake_event)
+    assert response.pop("headers")["Server-Timing"].startswith("token;dur=")
+    assert response == expected_response
 
 
 # pylint: disable=bad-continuation
@@ -75,5 +77,7 @@ def test_current_trip_endpoint_authenticated(
         "statusCode": 200,
         "body": json.dumps({"status": "ok", "trip": expected_trip}),
     }
-    assert current_trip(fake_event) == expected_response
+    response = current_trip(fake_event)
+    assert response.pop("headers")["Server-Timing"].startswith("token;dur=")
+    assert response == expected_response
     drop_access_token_table()
@@ -0,0 +1,45 @@
+"""
+Tests for keeping heavy imports out of our handlers until they're needed.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+HANDLERS = ["ping", "auth", "callback", "trips", "current_trip"]
+HEAVY_MODULES = ["asyncio", "botocore", "pynamodb", "requests"]
+
+
+def _modules_imported_by(statements):
+    report = f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    script = "\n".join([*statements, "import sys", report])
+    return subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parents[3],
+        env=os.environ,
+    ).stdout.strip()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("handler", HANDLERS)
+def test_importing_handlers_is_light(handler):
+    """
+    Importing a handler shouldn't import pynamodb, requests or asyncio.
+    """
+    assert _modules_imported_by([f"import tripit.api.aws_api_gateway.{handler}"]) == ""
+
+
+@pytest.mark.unit
+def test_table_models_are_built_on_first_use():
+    """
+    pynamodb shouldn't be imported until a table model is asked for.
+    """
+    assert _modules_imported_by(["import tripit.auth.models"]) == ""
+    assert "pynamodb" in _modules_imported_by(
+        ["from tripit.auth import models", "assert models.TripitAccessToken.Meta.table_name"]
+    )
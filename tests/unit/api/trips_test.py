@@ -20,7 +20,9 @@ def test_trips_endpoint_unauthenticated():
         "statusCode": 403,
         "body": json.dumps({"status": "error", "message": "Access denied; go to /auth first."}),
     }
-    assert get_trips(fake_event) == expected_response
+    response = get_trips(fake_event)
+    assert response.pop("headers")["Server-Timing"].startswith("token;dur=")
+    assert response == expected_response
 
 
 # pylint: disable=bad-continuation
@@ -100,7 +102,9 @@ def test_trips_endpoint_authenticated(
         "statusCode": 200,
         "body": json.dumps({"status": "ok", "trips": expected_trips}),
     }
-    assert get_trips(fake_event) == expected_response
+    response = get_trips(fake_event)
+    assert response.pop("headers")["Server-Timing"].startswith("token;dur=")
+    assert response == expected_response
     drop_access_token_table()
 
 
@@ -199,5 +203,7 @@ def test_trips_endpoint_authenticated_human_times(
         "statusCode": 200,
         "body": json.dumps({"status": "ok", "trips": expected_trips}),
     }
-    assert get_trips(fake_event) == expected_response
+    response = get_trips(fake_event)
+    assert response.pop("headers")["Server-Timing"].startswith("token;dur=")
+    assert response == expected_response
     drop_access_token_table()
@@ -0,0 +1,121 @@
+"""
+These tests cover caching access tokens between calls.
+"""
+
+import json
+import pytest
+from tripit.auth import models
+from tripit.auth.token import get_token_data_for_access_key
+from tripit.cache import invalidate_token_for_access_key, reset_token_cache
+from tripit.metrics import emits_metrics
+
+
+class _FakeAccessTokens:
+    """ Stands in for TripitAccessToken, counting how often it's read. """
+
+    calls = []
+    tokens = {}
+
+    @staticmethod
+    def as_dict(access_key):
+        _FakeAccessTokens.calls.append(access_key)
+        token = _FakeAccessTokens.tokens.get(access_key)
+        if token is None:
+            return None
+        return {"access_key": access_key, "token": token, "token_secret": "token-secret"}
+
+
+@pytest.fixture
+def token_cache_on(monkeypatch):
+    """ Turns the token cache on, and off again once the test is done. """
+    monkeypatch.setenv("TRIPIT_TOKEN_CACHE_TTL_SECONDS", "60")
+    reset_token_cache()
+    yield
+    reset_token_cache()
+
+
+@pytest.fixture
+# pylint: disable=redefined-outer-name,unused-argument
+def fake_access_tokens(monkeypatch, token_cache_on):
+    """
+    Replaces TripitAccessToken with one that has a token for "fake-key", and
+    turns the token cache on.
+    """
+    _FakeAccessTokens.calls = []
+    _FakeAccessTokens.tokens = {"fake-key": "fake-token"}
+    monkeypatch.setattr(models, "TripitAccessToken", _FakeAccessTokens, raising=False)
+    return _FakeAccessTokens
+
+
+@pytest.mark.unit
+# pylint: disable=redefined-outer-name
+def test_caching_tokens_for_access_keys(fake_access_tokens):
+    """
+    Once cached, tokens should be served without going back to DynamoDB until
+    they are invalidated.
+    """
+    token_data = get_token_data_for_access_key("fake-key")
+    assert token_data["token"] == "fake-token"
+    assert get_token_data_for_access_key("fake-key") == token_data
+    assert fake_access_tokens.calls == ["fake-key"]
+
+    fake_access_tokens.tokens["fake-key"] = "new-token"
+    invalidate_token_for_access_key("fake-key")
+    assert get_token_data_for_access_key("fake-key")["token"] == "new-token"
+    assert fake_access_tokens.calls == ["fake-key", "fake-key"]
+
+
+@pytest.mark.unit
+# pylint: disable=redefined-outer-name
+def test_missing_tokens_are_not_cached(fake_access_tokens):
+    """
+    Access keys can be authorized by another container at any time, so we
+    should keep asking DynamoDB about ones without tokens.
+    """
+    assert get_token_data_for_access_key("another-key") is None
+    fake_access_tokens.tokens["another-key"] = "another-token"
+    assert get_token_data_for_access_key("another-key")["token"] == "another-token"
+    assert fake_access_tokens.calls == ["another-key", "another-key"]
+
+
+@pytest.mark.unit
+# pylint: disable=redefined-outer-name
+def test_cached_tokens_cannot_be_changed_by_callers(fake_access_tokens):
+    """ Changing a token that we got back shouldn't change what's cached. """
+    get_token_data_for_access_key("fake-key")["token"] = "changed"
+    assert get_token_data_for_access_key("fake-key")["token"] == "fake-token"
+    assert len(fake_access_tokens.calls) == 1
+
+
+@pytest.mark.unit
+# pylint: disable=redefined-outer-name,unused-argument
+def test_token_cache_hits_and_misses_are_measured(fake_access_tokens, capsys):
+    """ Token cache hits and misses should be counted for each call. """
+
+    @emits_metrics
+    def handler(_event, _context=None):
+        get_token_data_for_access_key("fake-key")
+        get_token_data_for_access_key("fake-key")
+        get_token_data_for_access_key("fake-key")
+
+    handler({})
+    document = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert document["TokenCacheMisses"] == 1
+    assert document["TokenCacheHits"] == 2
+
+
+@pytest.mark.unit
+# pylint: disable=bad-continuation,redefined-outer-name,unused-argument
+def test_new_tokens_replace_cached_ones(
+    token_cache_on, set_access_token_table, drop_access_token_table
+):
+    # pylint: enable=bad-continuation
+    """
+    Inserting a token for an access key, like at the end of authorizing it,
+    should replace the one that we cached for it.
+    """
+    set_access_token_table(access_key="fake-key", token="fake-token", secret="token-secret")
+    assert get_token_data_for_access_key("fake-key")["token"] == "fake-token"
+    set_access_token_table(access_key="fake-key", token="new-token", secret="token-secret")
+    assert get_token_data_for_access_key("fake-key")["token"] == "new-token"
+    drop_access_token_table()
@@ -0,0 +1,112 @@
+"""
+Tests for provisioning our tables and writing to them.
+"""
+
+import os
+import runpy
+import pytest
+from botocore.exceptions import ClientError
+from pynamodb.exceptions import PutError
+from pynamodb.models import Model
+from tripit.auth import models
+
+
+def _put_error(code):
+    return PutError("Failed to put item", ClientError({"Error": {"Code": code}}, "PutItem"))
+
+
+class _FakeModel:
+    """ Stands in for a model, recording what's asked of DynamoDB. """
+
+    class Meta:
+        """ Table configuration. """
+
+        table_name = "fake_table"
+
+    calls = []
+    table_exists = False
+    put_errors = []
+
+    @classmethod
+    def exists(cls):
+        cls.calls.append("DescribeTable")
+        return cls.table_exists
+
+    @classmethod
+    def create_table(cls, wait=False):
+        assert wait
+        cls.calls.append("CreateTable")
+        cls.table_exists = True
+
+    def save(self, condition=None):
+        _FakeModel.calls.append(("PutItem", condition))
+        if _FakeModel.put_errors:
+            raise _FakeModel.put_errors.pop(0)
+        return {}
+
+
+@pytest.fixture(name="fake_model")
+def fixture_fake_model(monkeypatch):
+    """ Resets `_FakeModel` and forgets which tables have been provisioned. """
+    _FakeModel.calls = []
+    _FakeModel.table_exists = False
+    _FakeModel.put_errors = []
+    monkeypatch.setattr(models, "_PROVISIONED_TABLES", set())
+    return _FakeModel
+
+
+@pytest.mark.unit
+def test_tables_are_only_provisioned_once(fake_model):
+    """
+    Provisioning a table more than once shouldn't go back to DynamoDB.
+    """
+    models.provision_table(fake_model)
+    models.provision_table(fake_model)
+    assert fake_model.calls == ["DescribeTable", "CreateTable"]
+
+
+@pytest.mark.unit
+def test_writes_are_a_single_put(fake_model):
+    """ Writing to a table that exists should be one PutItem and nothing else. """
+    models.save_item(fake_model(), condition="condition")
+    assert fake_model.calls == [("PutItem", "condition")]
+
+
+@pytest.mark.unit
+def test_writes_to_missing_tables_do_not_provision_them(fake_model):
+    """
+    Creating tables is left to Terraform and `python -m tripit.auth.models`,
+    so writes to missing tables should fail rather than wait on CreateTable.
+    """
+    fake_model.put_errors = [_put_error("ResourceNotFoundException")]
+    with pytest.raises(PutError):
+        models.save_item(fake_model())
+    assert fake_model.calls == [("PutItem", None)]
+
+
+@pytest.mark.unit
+def test_failed_conditions_are_raised(fake_model):
+    """ Writes whose conditions fail shouldn't be retried. """
+    fake_model.put_errors = [_put_error("ConditionalCheckFailedException")]
+    with pytest.raises(PutError):
+        models.save_item(fake_model(), condition="condition")
+    assert fake_model.calls == [("PutItem", "condition")]
+
+
+@pytest.mark.unit
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_provisioning_from_the_command_line(monkeypatch):
+    """
+    Running `python -m tripit.auth.models` should provision every table, so
+    that deploys and test setups can do it ahead of time.
+    """
+    described = []
+    monkeypatch.setattr(
+        Model, "exists", classmethod(lambda cls: described.append(cls.Meta.table_name) or True)
+    )
+    runpy.run_module("tripit.auth.models", run_name="__main__")
+    environment = os.environ["ENVIRONMENT"]
+    assert described == [
+        f"tripit_request_tokens_{environment}",
+        f"tripit_access_tokens_{environment}",
+    ]
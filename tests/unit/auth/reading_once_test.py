@@ -0,0 +1,97 @@
+"""
+These tests cover reading each item from DynamoDB once per unit of work.
+"""
+
+import pytest
+from pynamodb.models import Model
+from tripit.auth import models
+from tripit.auth.models import caches_reads, unit_of_work
+from tripit.auth.step_1 import access_key_has_access_token
+from tripit.auth.step_2 import handle_callback
+
+
+@pytest.fixture(name="dynamodb_reads")
+def fixture_dynamodb_reads(monkeypatch):
+    """
+    Replaces reads from DynamoDB with ones from a dict of items, keyed by hash
+    key, and records every key that was read.
+    """
+    reads = []
+    items = {}
+
+    def _get(cls, hash_key, *_args, **_kwargs):
+        reads.append(hash_key)
+        if hash_key not in items:
+            raise cls.DoesNotExist()
+        return items[hash_key]
+
+    monkeypatch.setattr(Model, "get", classmethod(_get))
+    return reads, items
+
+
+@pytest.mark.unit
+def test_callbacks_read_request_tokens_once(monkeypatch, dynamodb_reads):
+    """
+    Handling a callback needs a request token's access key and secret, but
+    it should only read them from DynamoDB once.
+    """
+    reads, items = dynamodb_reads
+    items["fake-request-token"] = models.TripitRequestToken(
+        "fake-request-token", access_key="fake-key", token_secret="fake-secret"
+    )
+    inserted = []
+    monkeypatch.setattr(
+        "tripit.core.v1.oauth.fetch_token",
+        lambda *args, **kwargs: {"token": "access-token", "token_secret": "token-secret"},
+    )
+    monkeypatch.setattr(
+        models.TripitAccessToken, "insert", lambda **kwargs: inserted.append(kwargs)
+    )
+
+    @caches_reads
+    def handler(_event, _context=None):
+        return handle_callback("fake-request-token")
+
+    assert handler({}) is True
+    assert reads == ["fake-request-token"]
+    assert inserted == [
+        {"access_key": "fake-key", "token": "access-token", "token_secret": "token-secret"}
+    ]
+
+
+@pytest.mark.unit
+def test_missing_items_are_remembered(dynamodb_reads):
+    """ Finding out that an item doesn't exist counts as reading it. """
+    reads, _ = dynamodb_reads
+    with unit_of_work():
+        assert not access_key_has_access_token("fake-key")
+        assert not access_key_has_access_token("fake-key")
+    assert reads == ["fake-key"]
+
+
+@pytest.mark.unit
+def test_reads_are_not_shared_between_units_of_work(dynamodb_reads):
+    """ Every unit of work, and reads outside of one, should start afresh. """
+    reads, _ = dynamodb_reads
+    with unit_of_work():
+        access_key_has_access_token("fake-key")
+    with unit_of_work():
+        access_key_has_access_token("fake-key")
+    access_key_has_access_token("fake-key")
+    access_key_has_access_token("fake-key")
+    assert reads == ["fake-key"] * 4
+
+
+@pytest.mark.unit
+def test_writes_forget_what_was_read(monkeypatch, dynamodb_reads):
+    """ Items should be read again once their table has been written to. """
+    reads, items = dynamodb_reads
+    monkeypatch.setattr(Model, "save", lambda self, condition=None: {})
+    with unit_of_work():
+        assert not access_key_has_access_token("fake-key")
+        items["fake-key"] = models.TripitAccessToken(
+            "fake-key", token="fake-token", token_secret="fake-secret"
+        )
+        models.TripitAccessToken.insert("fake-key", "fake-token", "fake-secret")
+        assert access_key_has_access_token("fake-key")
+    assert reads == ["fake-key", "fake-key"]
@@ -0,0 +1,138 @@
+"""
+These tests cover what happens when DynamoDB throttles us.
+"""
+
+import json
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from pynamodb.exceptions import GetError
+from pynamodb.models import Model
+from tripit.api.aws_api_gateway.trips import get_trips
+from tripit.auth import models
+from tripit.auth.store import TokenStoreThrottled, reset_token_store
+from tripit.auth.token import get_token_data_for_access_key
+
+
+def _get_error(code):
+    return GetError("Failed to get item", ClientError({"Error": {"Code": code}}, "GetItem"))
+
+
+@pytest.fixture(name="throttled_reads")
+def fixture_throttled_reads(monkeypatch):
+    """
+    Makes DynamoDB throttle as many reads as we'd like before answering, and
+    makes retries immediate.
+    """
+    monkeypatch.setenv("TRIPIT_DYNAMODB_THROTTLE_BACKOFF_SECONDS", "0")
+    monkeypatch.setenv("TRIPIT_DYNAMODB_THROTTLE_RETRIES", "2")
+    models.reset_retry_policy()
+    reset_token_store()
+    attempts = []
+    errors = []
+
+    def _get(cls, hash_key, *_args, **_kwargs):
+        attempts.append(hash_key)
+        if errors:
+            raise errors.pop(0)
+        return cls(hash_key, token="fake-token", token_secret="fake-secret")
+
+    monkeypatch.setattr(Model, "get", classmethod(_get))
+    yield attempts, errors
+    models.reset_retry_policy()
+
+
+@pytest.mark.unit
+def test_throttled_reads_are_retried(throttled_reads):
+    """ Reads should succeed if DynamoDB stops throttling them soon enough. """
+    attempts, errors = throttled_reads
+    errors.extend([_get_error("ProvisionedThroughputExceededException")] * 2)
+    assert get_token_data_for_access_key("fake-key")["token"] == "fake-token"
+    assert len(attempts) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "error",
+    [
+        _get_error("InternalServerError"),
+        GetError("Failed to get item", EndpointConnectionError(endpoint_url="http://dynamodb")),
+    ],
+)
+def test_transient_errors_are_retried(throttled_reads, error):
+    """
+    botocore doesn't retry anything for us, so 5xxs and dropped connections
+    should be retried like throttling is.
+    """
+    attempts, errors = throttled_reads
+    errors.append(error)
+    assert get_token_data_for_access_key("fake-key")["token"] == "fake-token"
+    assert len(attempts) == 2
+
+
+@pytest.mark.unit
+def test_retry_policy_is_read_once(monkeypatch):
+    """ Retry settings come from the environment once, not on every call. """
+    monkeypatch.setenv("TRIPIT_DYNAMODB_THROTTLE_RETRIES", "7")
+    models.reset_retry_policy()
+    assert models.get_retry_policy().retries == 7
+    monkeypatch.setenv("TRIPIT_DYNAMODB_THROTTLE_RETRIES", "1")
+    assert models.get_retry_policy().retries == 7
+    models.reset_retry_policy()
+
+
+@pytest.mark.unit
+def test_throttling_is_not_mistaken_for_missing_tokens(throttled_reads):
+    """
+    Once we're out of retries, we should say that we were throttled rather
+    than that the access key doesn't have a token.
+    """
+    attempts, errors = throttled_reads
+    errors.extend([_get_error("ProvisionedThroughputExceededException")] * 3)
+    with pytest.raises(TokenStoreThrottled):
+        get_token_data_for_access_key("fake-key")
+    assert len(attempts) == 3
+
+
+@pytest.mark.unit
+def test_other_errors_are_not_retried(throttled_reads):
+    """ Errors other than throttling should be treated as a missing token, as before. """
+    attempts, errors = throttled_reads
+    errors.append(_get_error("ValidationException"))
+    assert get_token_data_for_access_key("fake-key") is None
+    assert len(attempts) == 1
+
+
+@pytest.mark.unit
+def test_throttled_trip_requests_are_retryable(throttled_reads):
+    """ Clients should be told to try again later when we're throttled, not denied. """
+    _, errors = throttled_reads
+    errors.extend([_get_error("ThrottlingException")] * 3)
+    response = get_trips({"requestContext": {"identity": {"apiKey": "fake-key"}}})
+    assert response["statusCode"] == 503
+    assert response["headers"]["Retry-After"] == "1"
+    assert json.loads(response["body"])["status"] == "error"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "environment,billing_mode,read_capacity_units",
+    [
+        ({}, "PROVISIONED", 2),
+        ({"AWS_DYNAMODB_RCU": "5"}, "PROVISIONED", 5),
+        ({"AWS_DYNAMODB_RCU": "5", "AWS_DYNAMODB_ACCESS_TOKENS_RCU": "20"}, "PROVISIONED", 20),
+        ({"AWS_DYNAMODB_BILLING_MODE": "pay_per_request"}, "PAY_PER_REQUEST", 2),
+    ],
+)
+def test_configuring_tables(monkeypatch, environment, billing_mode, read_capacity_units):
+    """
+    Tables can be billed per request, or have capacity provisioned for them
+    alone or for every table.
+    """
+    for name, value in environment.items():
+        monkeypatch.setenv(name, value)
+    # pylint: disable=protected-access
+    meta = models._build_access_token_model().Meta
+    assert meta.billing_mode == billing_mode
+    assert meta.read_capacity_units == read_capacity_units
+    assert meta.write_capacity_units == 2
+    assert meta.max_retry_attempts == 0
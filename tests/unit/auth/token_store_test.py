@@ -0,0 +1,160 @@
+"""
+Tests for the stores that we can keep tokens in.
+"""
+
+import pytest
+from botocore.exceptions import ClientError
+from pynamodb.exceptions import PutError
+from pynamodb.models import Model
+from tripit.auth import models
+from tripit.auth.step_1 import get_authn_url
+from tripit.auth.step_2 import handle_callback
+from tripit.auth.store import (
+    DynamoDBTokenStore,
+    MemoryTokenStore,
+    SQLiteTokenStore,
+    TokenStore,
+    TokenStoreError,
+    TokenStoreThrottled,
+    get_token_store,
+    reset_token_store,
+)
+from tripit.auth.token import get_token_data_for_access_key
+
+
+@pytest.fixture(name="token_store", params=["memory", "sqlite"])
+def fixture_token_store(request, tmp_path):
+    """ Each of the stores that doesn't need DynamoDB. """
+    if request.param == "sqlite":
+        store = SQLiteTokenStore(str(tmp_path / "tokens.db"))
+        yield store
+        store.close()
+    else:
+        yield MemoryTokenStore()
+
+
+@pytest.mark.unit
+def test_storing_request_tokens(token_store):
+    """
+    Request tokens should be found by their token, and saving one twice
+    shouldn't replace it.
+    """
+    assert token_store.get_request_token("fake-request-token") is None
+    token_store.put_request_token("fake-request-token", "fake-key", "fake-secret")
+    token_store.put_request_token("fake-request-token", "another-key", "another-secret")
+    assert token_store.get_request_token("fake-request-token") == {
+        "access_key": "fake-key",
+        "token": "fake-request-token",
+        "token_secret": "fake-secret",
+    }
+
+
+@pytest.mark.unit
+def test_storing_access_tokens(token_store):
+    """
+    Access tokens should be found by their access key, replaced when saved
+    again and gone once deleted.
+    """
+    assert token_store.get_access_token("fake-key") is None
+    token_store.put_access_token("fake-key", "fake-token", "fake-secret")
+    token_store.put_access_token("fake-key", "new-token", "new-secret")
+    assert token_store.get_access_token("fake-key") == {
+        "access_key": "fake-key",
+        "token": "new-token",
+        "token_secret": "new-secret",
+    }
+    token_store.delete_access_token("fake-key")
+    token_store.delete_access_token("fake-key")
+    assert token_store.get_access_token("fake-key") is None
+
+
+@pytest.mark.unit
+def test_sqlite_tokens_outlive_their_store(tmp_path):
+    """ Tokens in SQLite should still be there when it's opened again. """
+    path = str(tmp_path / "tokens.db")
+    store = SQLiteTokenStore(path)
+    store.put_access_token("fake-key", "fake-token", "fake-secret")
+    store.close()
+    store = SQLiteTokenStore(path)
+    assert store.get_access_token("fake-key")["token"] == "fake-token"
+    store.close()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "kind,store_class",
+    [(None, DynamoDBTokenStore), ("sqlite", SQLiteTokenStore), ("memory", MemoryTokenStore)],
+)
+def test_choosing_a_token_store(monkeypatch, tmp_path, kind, store_class):
+    """ TRIPIT_TOKEN_STORE should choose the store, which is DynamoDB by default. """
+    if kind is not None:
+        monkeypatch.setenv("TRIPIT_TOKEN_STORE", kind)
+    monkeypatch.setenv("TRIPIT_TOKEN_STORE_PATH", str(tmp_path / "tokens.db"))
+    reset_token_store()
+    assert isinstance(get_token_store(), store_class)
+    assert get_token_store() is get_token_store()
+    reset_token_store()
+
+
+@pytest.mark.unit
+def test_authorizing_without_dynamodb(monkeypatch):
+    """
+    We should be able to go through both steps of authorizing an access key,
+    and then use its token, with tokens kept in memory.
+    """
+    monkeypatch.setenv("TRIPIT_TOKEN_STORE", "memory")
+    reset_token_store()
+    monkeypatch.setattr(
+        "tripit.core.v1.oauth.fetch_token",
+        lambda token=None, token_secret=None: {
+            "token": "access-token" if token else "fake-request-token",
+            "token_secret": "token-secret" if token else "fake-secret",
+        },
+    )
+    assert get_authn_url("/develop", "foo.com", "fake-key").endswith("/develop/callback")
+    assert handle_callback("fake-request-token") is True
+    assert get_token_data_for_access_key("fake-key") == {
+        "access_key": "fake-key",
+        "token": "access-token",
+        "token_secret": "token-secret",
+    }
+    assert get_authn_url("/develop", "foo.com", "fake-key") == "https://foo.com/develop/token"
+    reset_token_store()
+
+
+@pytest.mark.unit
+def test_stores_have_to_implement_everything():
+    """ Stores that are missing a method shouldn't be created at all. """
+
+    # pylint: disable=too-few-public-methods,abstract-method
+    class _HalfAStore(TokenStore):
+        def get_access_token(self, access_key):
+            return None
+
+    with pytest.raises(TypeError):
+        _HalfAStore()  # pylint: disable=abstract-class-instantiated
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "code,error",
+    [
+        ("ValidationException", TokenStoreError),
+        ("ProvisionedThroughputExceededException", TokenStoreThrottled),
+    ],
+)
+def test_failed_dynamodb_writes_are_store_errors(monkeypatch, code, error):
+    """
+    Access tokens that DynamoDB won't save should raise store errors, so that
+    callbacks can fail cleanly, rather than errors from pynamodb.
+    """
+    monkeypatch.setenv("TRIPIT_DYNAMODB_THROTTLE_RETRIES", "0")
+    models.reset_retry_policy()
+
+    def _save(*_args, **_kwargs):
+        raise PutError("Failed to put item", ClientError({"Error": {"Code": code}}, "PutItem"))
+
+    monkeypatch.setattr(Model, "save", _save)
+    with pytest.raises(error):
+        DynamoDBTokenStore().put_access_token("fake-key", "fake-token", "fake-secret")
+    models.reset_retry_policy()
@@ -0,0 +1,114 @@
+"""
+Tests for our in-process caches.
+"""
+import json
+import pytest
+from freezegun import freeze_time
+from tripit.cache import TTLCache, estimate_size_bytes, get_trip_cache, reset_trip_cache
+from tripit.models import FlightSegment, Trip
+
+
+@pytest.mark.unit
+def test_cache_hits_and_misses():
+    """ We should get back what we put in and keep count of hits and misses. """
+    cache = TTLCache(ttl_seconds=60, max_entries=10, max_bytes=1024)
+    assert cache.get("key") is None
+    cache.put("key", [1, 2, 3])
+    assert cache.get("key") == [1, 2, 3]
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "entries": 1,
+        "size_bytes": len("[1, 2, 3]"),
+    }
+
+
+@pytest.mark.unit
+def test_cache_entries_expire():
+    """ Entries should go away once their TTL has passed. """
+    with freeze_time("2019-12-01 00:00:00") as frozen_time:
+        cache = TTLCache(ttl_seconds=60, max_entries=10, max_bytes=1024)
+        cache.put("key", "value")
+        frozen_time.tick(59)
+        assert cache.get("key") == "value"
+        frozen_time.tick(1)
+        assert cache.get("key") is None
+        assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.unit
+def test_cache_evicts_least_recently_used_entries():
+    """ We should evict the entries that we've used least recently once full. """
+    cache = TTLCache(ttl_seconds=60, max_entries=2, max_bytes=1024)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.unit
+def test_cache_is_bounded_by_size():
+    """ The cache shouldn't grow past its byte limit. """
+    cache = TTLCache(ttl_seconds=60, max_entries=10, max_bytes=10)
+    cache.put("a", "1234")
+    cache.put("b", "1234")
+    assert cache.get("a") is None
+    assert cache.get("b") == "1234"
+    cache.put("c", "this is too big to cache")
+    assert cache.get("c") is None
+
+
+@pytest.mark.unit
+def test_invalidating_cache_entries():
+    """ We should be able to remove entries by key. """
+    cache = TTLCache(ttl_seconds=60, max_entries=10, max_bytes=1024)
+    cache.put(("a", True), 1)
+    cache.put(("a", False), 2)
+    cache.put(("b", False), 3)
+    cache.invalidate(lambda key: key[0] == "a")
+    assert cache.stats()["entries"] == 1
+    assert cache.get(("b", False)) == 3
+
+
+@pytest.mark.unit
+def test_trip_cache_is_configured_from_environment(monkeypatch):
+    """ The trip cache is off unless a TTL is given. """
+    monkeypatch.delenv("TRIPIT_TRIP_CACHE_TTL_SECONDS", raising=False)
+    reset_trip_cache()
+    assert not get_trip_cache().enabled
+    monkeypatch.setenv("TRIPIT_TRIP_CACHE_TTL_SECONDS", "30")
+    monkeypatch.setenv("TRIPIT_TRIP_CACHE_MAX_ENTRIES", "5")
+    reset_trip_cache()
+    assert get_trip_cache().enabled
+    assert get_trip_cache().max_entries == 5
+    reset_trip_cache()
+
+
+@pytest.mark.unit
+def test_trips_are_sized_without_serializing_them(monkeypatch):
+    """
+    Resolved trips should be sized from how many trips and segments there
+    are, which should come close to how large they are once serialized.
+    """
+    segment = FlightSegment("AA1234", "JFK", "LAX", "-05:00", 1585000000, 1585010000)
+    trips = [
+        Trip(
+            123456789,
+            "Personal: Some trip to somewhere",
+            "Los Angeles, CA",
+            1585000000,
+            False,
+            "https://www.tripit.com/trip/show/id/123456789",
+            1585000000,
+            [segment] * flights,
+        )
+        for flights in range(5)
+    ]
+    size_bytes = len(json.dumps([trip.to_dict() for trip in trips]))
+    monkeypatch.setattr(Trip, "to_dict", lambda _: pytest.fail("Trips were serialized"))
+    assert size_bytes <= estimate_size_bytes(trips) <= size_bytes * 1.5
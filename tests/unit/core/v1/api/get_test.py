@@ -19,7 +19,7 @@ def test_get_from_tripit(monkeypatch):
     """ Tests getting stuff from TripIt. """
     endpoint = "/ping"
     mock_response = MockResponse(200, "https://api.tripit.com/v1/ping")
-    monkeypatch.setattr("requests.get", lambda *args, **kwargs: mock_response)
+    monkeypatch.setattr("tripit.core.v1.session.get", lambda *args, **kwargs: mock_response)
     token = "fake-token"
     token_secret = "fake-token-secret"
     assert get_from_tripit_v1(endpoint, token, token_secret) == mock_response
@@ -0,0 +1,103 @@
+"""
+Tests for parsing TripIt responses as they're streamed in.
+"""
+import json
+import pytest
+from tests.fixtures.unit.fake_response import FakeResponse
+from tripit.core.v1.json_stream import iter_objects, read_objects
+
+TRIP_OBJECT_TYPES = ("Trip", "AirObject", "NoteObject")
+
+PAYLOAD = {
+    "timestamp": "1585000000",
+    "num_bytes": "12345",
+    "page_num": "1",
+    "max_page": "2",
+    "Trip": [{"id": "1", "display_name": 'A "quoted" trip \\ to Österreich'}, {"id": "2"}],
+    "LodgingObject": [{"trip_id": "1", "notes": "}]{[ \\\" not the end"}],
+    "AirObject": {"trip_id": "1", "Segment": [{"marketing_flight_number": "123"}]},
+    "Profile": {"@attributes": {"ref": "abc"}, "ProfileEmailAddresses": [[], {}]},
+    "NoteObject": [],
+    "warnings": None,
+}
+
+
+def _chunked(payload, chunk_size):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return [body[start : start + chunk_size] for start in range(0, len(body), chunk_size)]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1024 * 1024])
+def test_objects_are_parsed_no_matter_how_the_body_is_chunked(chunk_size):
+    """
+    Objects, strings and numbers can be split anywhere across chunks, even in
+    the middle of a multi-byte character.
+    """
+    items = list(iter_objects(_chunked(PAYLOAD, chunk_size), TRIP_OBJECT_TYPES))
+    assert items == [
+        ("timestamp", "1585000000"),
+        ("num_bytes", "12345"),
+        ("page_num", "1"),
+        ("max_page", "2"),
+        ("Trip", PAYLOAD["Trip"][0]),
+        ("Trip", PAYLOAD["Trip"][1]),
+        ("AirObject", PAYLOAD["AirObject"]),
+        ("warnings", None),
+    ]
+
+
+@pytest.mark.unit
+def test_numbers_split_across_chunks_are_read_whole():
+    """ A number at the end of a chunk might not be finished yet. """
+    assert list(iter_objects([b'{"max_page": 12', b"34}"], TRIP_OBJECT_TYPES)) == [
+        ("max_page", 1234)
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+@pytest.mark.parametrize("number", [1.25, -1.5e10, 2e-3, -7, 10])
+def test_fractions_and_exponents_split_across_chunks_are_read_whole(chunk_size, number):
+    """
+    Fractions and exponents can be cut off right after their ".", "e" or sign,
+    which still decodes as a shorter number.
+    """
+    payload = {"a": number, "z": [number, number]}
+    assert list(iter_objects(_chunked(payload, chunk_size), ("z",))) == [
+        ("a", number),
+        ("z", number),
+        ("z", number),
+    ]
+
+
+@pytest.mark.unit
+def test_reading_objects_from_a_response():
+    """
+    Objects that we use always come back in arrays, and ones that we don't
+    never come back at all.
+    """
+    response = FakeResponse(url="", status_code=200, json_object=PAYLOAD)
+    assert read_objects(response, TRIP_OBJECT_TYPES, chunk_size=5) == {
+        "timestamp": "1585000000",
+        "num_bytes": "12345",
+        "page_num": "1",
+        "max_page": "2",
+        "Trip": PAYLOAD["Trip"],
+        "AirObject": [PAYLOAD["AirObject"]],
+        "warnings": None,
+    }
+
+
+@pytest.mark.unit
+def test_empty_responses():
+    """ TripIt sometimes has nothing for us. """
+    assert not list(iter_objects([b" { } "], TRIP_OBJECT_TYPES))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("body", [b'{"Trip": [{"id": "1"}', b'{"Profile": {"a": [1, 2}', b"[]"])
+def test_malformed_responses_are_errors(body):
+    """ Truncated or unexpected bodies shouldn't be silently accepted. """
+    with pytest.raises(ValueError):
+        list(iter_objects([body], TRIP_OBJECT_TYPES))
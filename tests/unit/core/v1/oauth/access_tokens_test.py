@@ -5,7 +5,6 @@ import os
 import datetime
 import secrets
 import pytest
-import requests
 from freezegun import freeze_time
 from tripit.core.v1.oauth import request_access_token, generate_sha1_auth_header, generate_signature
 
@@ -36,9 +35,14 @@ def test_getting_access_tokens_from_oauth(monkeypatch):
     fake_request_token_secret = "fake-request-token-secret"
     fake_response = f"oauth_token={fake_token}&oauth_token_secret={fake_token_secret}"
     monkeypatch.setattr(secrets, "token_hex", lambda *args, **kwargs: fake_nonce)
-    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: FakeResponse(fake_response))
+    sent = []
+    monkeypatch.setattr(
+        "tripit.core.v1.session.get",
+        lambda *args, **kwargs: sent.append(kwargs) or FakeResponse(fake_response),
+    )
     token_data = request_access_token(fake_request_token, fake_request_token_secret)
     assert token_data == {"token": fake_token, "token_secret": fake_token_secret}
+    assert sent[0]["retried"] is False
 
 
 @pytest.mark.unit
@@ -5,7 +5,6 @@ import os
 import datetime
 import secrets
 import pytest
-import requests
 from freezegun import freeze_time
 from tripit.core.v1.oauth import (
     request_request_token,
@@ -37,7 +36,9 @@ def test_getting_oauth_request_tokens(monkeypatch):
     fake_nonce = "fake-nonce"
     fake_response = "oauth_token=fake-token&oauth_token_secret=fake-secret"
     monkeypatch.setattr(secrets, "token_hex", lambda *args, **kwargs: fake_nonce)
-    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: FakeResponse(fake_response))
+    monkeypatch.setattr(
+        "tripit.core.v1.session.get", lambda *args, **kwargs: FakeResponse(fake_response)
+    )
     assert request_request_token() == {"token": fake_token, "token_secret": fake_token_secret}
 
 
@@ -0,0 +1,63 @@
+"""
+Tests for signing many requests with one set of OAuth v1 credentials.
+"""
+import base64
+import hmac
+import urllib.parse
+from hashlib import sha1
+import pytest
+from tripit.core.v1.oauth import OAuthSigner, generate_sha1_auth_header, get_signer
+
+
+# pylint: disable=too-many-arguments
+def _sign_by_the_book(
+    method, uri, consumer_key, consumer_secret, nonce, timestamp, token=None, token_secret=None
+):
+    params = {
+        "oauth_consumer_key": consumer_key,
+        "oauth_nonce": nonce,
+        "oauth_signature_method": "HMAC-SHA1",
+        "oauth_timestamp": str(timestamp),
+        "oauth_version": "1.0",
+    }
+    if token:
+        params["oauth_token"] = token
+    param_string = "&".join(f"{key}={value}" for key, value in sorted(params.items()))
+    base_string = "&".join(
+        [method, urllib.parse.quote_plus(uri), urllib.parse.quote_plus(param_string)]
+    )
+    key = f"{consumer_secret}&{token_secret or ''}".encode("utf8")
+    return base64.b64encode(hmac.new(key, base_string.encode("utf8"), sha1).digest())
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("token,token_secret", [(None, None), ("fake-token", "fake-token-secret")])
+def test_signing_requests(token, token_secret):
+    """ Signatures and headers shouldn't change from one request to the next. """
+    signer = OAuthSigner("fake-client-id", "fake-client-secret", token, token_secret)
+    for uri, nonce, timestamp in [
+        ("https://api.tripit.com/v1/list/trip/page_num/1/format/json", "abc123", 123),
+        ("https://api.tripit.com/v1/get/trip/id/42/format/json", "f00d/+= ", 1585000000.9),
+    ]:
+        signature = signer.sign("GET", uri, nonce, timestamp)
+        assert signature == _sign_by_the_book(
+            "GET",
+            uri,
+            "fake-client-id",
+            "fake-client-secret",
+            nonce,
+            int(timestamp),
+            token,
+            token_secret,
+        )
+        assert signer.authorization_header("GET", uri, nonce, timestamp) == (
+            generate_sha1_auth_header(uri, signature, "fake-client-id", nonce, timestamp, token)
+        )
+
+
+@pytest.mark.unit
+def test_signers_are_reused():
+    """ Warm containers shouldn't set up signers for the same credentials again. """
+    signer = get_signer("fake-client-id", "fake-client-secret", "fake-token", "fake-secret")
+    assert get_signer("fake-client-id", "fake-client-secret", "fake-token", "fake-secret") is signer
+    assert get_signer("fake-client-id", "fake-client-secret") is not signer
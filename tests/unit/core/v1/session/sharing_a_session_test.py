@@ -0,0 +1,73 @@
+"""
+Tests for the HTTP session shared by every call to TripIt.
+"""
+import pytest
+from tripit.core.v1 import session
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    """ Every test gets its own session. """
+    session.close_session()
+    yield
+    session.close_session()
+
+
+@pytest.mark.unit
+def test_the_session_is_shared_until_closed():
+    """ Warm containers should keep reusing the same connections. """
+    first_session = session.get_session()
+    assert session.get_session() is first_session
+    session.close_session()
+    assert session.get_session() is not first_session
+
+
+@pytest.mark.unit
+def test_configuring_the_session_from_the_environment(monkeypatch):
+    """ Pool sizes and retries can be tuned per function. """
+    monkeypatch.setenv("TRIPIT_HTTP_POOL_SIZE", "4")
+    monkeypatch.setenv("TRIPIT_HTTP_RETRIES", "5")
+    monkeypatch.setenv("TRIPIT_HTTP_RETRY_BACKOFF_SECONDS", "0.5")
+    adapter = session.get_session().get_adapter("https://api.tripit.com")
+    assert adapter._pool_maxsize == 4  # pylint: disable=protected-access
+    assert adapter.max_retries.total == 5
+    assert adapter.max_retries.backoff_factor == 0.5
+    assert adapter.max_retries.is_retry("GET", 503)
+    assert not adapter.max_retries.is_retry("POST", 503)
+    assert not adapter.max_retries.is_retry("GET", 404)
+
+
+@pytest.mark.unit
+def test_requests_time_out(monkeypatch):
+    """ Calls to TripIt shouldn't hang until the function times out. """
+    monkeypatch.setenv("TRIPIT_HTTP_CONNECT_TIMEOUT_SECONDS", "1.5")
+    monkeypatch.setenv("TRIPIT_HTTP_READ_TIMEOUT_SECONDS", "7")
+    sent = []
+    monkeypatch.setattr(
+        session.get_session(), "get", lambda uri, **kwargs: sent.append((uri, kwargs))
+    )
+    session.get("https://api.tripit.com/v1/ping")
+    session.get("https://api.tripit.com/v1/ping", timeout=30)
+    assert sent == [
+        ("https://api.tripit.com/v1/ping", {"timeout": (1.5, 7.0)}),
+        ("https://api.tripit.com/v1/ping", {"timeout": 30}),
+    ]
+
+
+@pytest.mark.unit
+def test_unretried_gets_have_their_own_session(monkeypatch):
+    """ GETs that can't be sent twice, like asking for tokens, shouldn't be retried. """
+    monkeypatch.setenv("TRIPIT_HTTP_RETRIES", "5")
+    unretried = session.get_session(retried=False)
+    assert unretried is not session.get_session()
+    assert unretried is session.get_session(retried=False)
+    assert unretried.get_adapter("https://api.tripit.com").max_retries.total == 0
+
+
+@pytest.mark.unit
+def test_retries_fit_inside_api_gateway_timeouts():
+    """ Every retry of a slow GET should be over before API Gateway gives up on us. """
+    connect_timeout, read_timeout = session.get_timeouts()
+    retries = session.get_retries()
+    backoff = sum(session.get_retry_backoff_seconds() * 2 ** attempt for attempt in range(retries))
+    assert (1 + retries) * (connect_timeout + read_timeout) + backoff < 29
@@ -0,0 +1,62 @@
+"""
+Tests for parsing TripIt dates and times.
+
+These should match what strptime gives us, just faster.
+"""
+import datetime
+import random
+import time
+import pytest
+from tripit.dates import date_to_unix, local_time_to_unix, parse_utc_offset
+
+
+def _strptime_local_time_to_unix(date, time_of_day, utc_offset):
+    datetime_str = " ".join([date, time_of_day, utc_offset.replace(":", "")])
+    return int(datetime.datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S %z").timestamp())
+
+
+def _strptime_date_to_unix(date):
+    return int(time.mktime(time.strptime(date, "%Y-%m-%d")))
+
+
+@pytest.mark.unit
+def test_parsing_utc_offsets():
+    """ Offsets can be ahead of or behind UTC and can include minutes. """
+    assert parse_utc_offset("-06:00") == -6 * 3600
+    assert parse_utc_offset("+05:30") == 5 * 3600 + 30 * 60
+    assert parse_utc_offset("+00:00") == 0
+    assert parse_utc_offset("-8:00") == -8 * 3600
+
+
+@pytest.mark.unit
+def test_local_times_match_strptime():
+    """ We should get the same UNIX times that strptime gives us. """
+    rng = random.Random(1234)
+    offsets = ["-10:00", "-06:00", "-03:30", "+00:00", "+05:30", "+09:00", "+14:00"]
+    for _ in range(1000):
+        days = rng.randrange(20000)
+        date = (datetime.date(1990, 1, 1) + datetime.timedelta(days=days)).isoformat()
+        time_of_day = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        utc_offset = rng.choice(offsets)
+        assert local_time_to_unix(date, time_of_day, utc_offset) == _strptime_local_time_to_unix(
+            date, time_of_day, utc_offset
+        )
+
+
+@pytest.mark.unit
+def test_dates_match_strptime():
+    """ Dates should resolve to local midnight, just like mktime does. """
+    for days in range(0, 20000, 37):
+        date = (datetime.date(1990, 1, 1) + datetime.timedelta(days=days)).isoformat()
+        assert date_to_unix(date) == _strptime_date_to_unix(date)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "date, time_of_day",
+    [("2019-13-01", "00:00:00"), ("2019-02-30", "00:00:00"), ("2019-12-01", "25:00:00")],
+)
+def test_rejecting_invalid_dates_and_times(date, time_of_day):
+    """ Invalid dates and times should fail loudly, like they did with strptime. """
+    with pytest.raises(ValueError):
+        local_time_to_unix(date, time_of_day, "+00:00")
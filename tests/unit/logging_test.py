@@ -0,0 +1,106 @@
+"""
+Tests for keeping logging cheap.
+"""
+import io
+import logging
+import logging.handlers
+import queue
+import threading
+import pytest
+from tripit.logging import DeferredQueueHandler, Lazy, flush_logs, log_payload, logger
+
+
+class _Payload:
+    """ Counts how many times it's been rendered. """
+
+    def __init__(self, text):
+        self.text = text
+        self.renders = 0
+
+    def render(self):
+        """ Returns our text. """
+        self.renders += 1
+        return self.text
+
+
+@pytest.mark.unit
+def test_lazy_values_are_not_rendered_below_our_level(caplog):
+    """ Lazy values shouldn't be rendered unless their message is written. """
+    payload = _Payload("hello")
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        logger.debug("Payload: %s", Lazy(payload.render))
+        assert payload.renders == 0
+        logger.info("Payload: %s", Lazy(payload.render))
+    assert payload.renders >= 1
+    assert "Payload: hello" in caplog.text
+
+
+@pytest.mark.unit
+def test_payloads_are_logged_in_full_at_debug(caplog):
+    """ We should see entire payloads when LOG_LEVEL is DEBUG. """
+    with caplog.at_level(logging.DEBUG, logger=logger.name):
+        log_payload("Response: %d, Text:", lambda: "x" * 5000, 200)
+    assert f"Response: 200, Text: {'x' * 5000}" in caplog.text
+
+
+@pytest.mark.unit
+def test_payloads_are_not_rendered_at_info_by_default(caplog):
+    """ Payloads shouldn't be rendered, let alone logged, at INFO unless sampled. """
+    payload = _Payload("hello")
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        log_payload("Response:", payload.render)
+    assert payload.renders == 0
+    assert "Response:" not in caplog.text
+
+
+@pytest.mark.unit
+def test_sampled_payloads_are_truncated(monkeypatch, caplog):
+    """ Sampled payloads should be cut short at TRIPIT_LOG_PAYLOAD_MAX_CHARS. """
+    monkeypatch.setenv("TRIPIT_LOG_PAYLOAD_SAMPLE_RATE", "1")
+    monkeypatch.setenv("TRIPIT_LOG_PAYLOAD_MAX_CHARS", "5")
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        log_payload("Response:", lambda: "abcdefghij")
+    assert "Response: abcde... (5 more characters)" in caplog.text
+
+
+@pytest.mark.unit
+def test_logs_are_written_in_the_background():
+    """
+    Records should be queued for a background thread, and flushing should wait
+    for all of them to be written.
+    """
+    queue_handlers = [
+        handler
+        for handler in logger.handlers
+        if isinstance(handler, logging.handlers.QueueHandler)
+    ]
+    assert len(queue_handlers) == 1
+    logger.info("Flush me")
+    flush_logs()
+    assert queue_handlers[0].queue.unfinished_tasks == 0
+
+
+@pytest.mark.unit
+def test_logging_threads_start_with_the_first_record():
+    """
+    Handlers that never log shouldn't pay for a thread, and records should be
+    formatted on that thread rather than ours.
+    """
+    stream = io.StringIO()
+    log_queue = queue.Queue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(stream))
+    handler = DeferredQueueHandler(log_queue, listener)
+    log = logging.getLogger("tests.deferred")
+    log.propagate = False
+    log.addHandler(handler)
+    rendered_on = []
+    try:
+        assert not listener._thread  # pylint: disable=protected-access
+        log.warning("Rendered on %s", Lazy(lambda: rendered_on.append(threading.get_ident())))
+        log_queue.join()
+        assert listener._thread  # pylint: disable=protected-access
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+    assert rendered_on and threading.get_ident() not in rendered_on
+    assert "Rendered on None" in stream.getvalue()
@@ -0,0 +1,114 @@
+"""
+Tests for writing metrics in CloudWatch's embedded metric format.
+"""
+import json
+import pytest
+from tripit.cloud_helpers.aws.api_gateway import return_ok
+from tripit.metrics import (
+    MAX_VALUES_PER_METRIC,
+    emits_metrics,
+    increment,
+    measure_latency,
+    observe,
+    recording_metrics,
+)
+from tripit.trips import get_all_trips
+
+
+def _emitted_documents(output):
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{"_aws"')]
+
+
+@pytest.mark.unit
+def test_metrics_are_written_as_emf_once_per_invocation(capsys):
+    """
+    Everything recorded during a call should be written as one EMF document
+    when it returns.
+    """
+
+    @emits_metrics
+    def handler(_event, _context=None):
+        increment("TripCacheHits")
+        increment("TripCacheHits")
+        observe("TripItLatency", 12.5)
+        observe("TripItLatency", 20)
+        return return_ok()
+
+    handler({})
+    documents = _emitted_documents(capsys.readouterr().out)
+    assert len(documents) == 1
+    document = documents[0]
+    directive = document["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == "TripItAPIs"
+    assert directive["Dimensions"] == [["Handler"]]
+    assert directive["Metrics"] == [
+        {"Name": "TripCacheHits", "Unit": "Count"},
+        {"Name": "TripItLatency", "Unit": "Milliseconds"},
+    ]
+    assert document["Handler"] == "handler"
+    assert document["TripCacheHits"] == 2
+    assert document["TripItLatency"] == [12.5, 20]
+
+
+@pytest.mark.unit
+def test_nothing_is_recorded_outside_of_handlers(capsys):
+    """ Recording metrics outside of a handler shouldn't do anything. """
+    increment("TripCacheHits")
+    with measure_latency("TripItLatency"):
+        pass
+    assert not recording_metrics()
+    assert _emitted_documents(capsys.readouterr().out) == []
+
+
+@pytest.mark.unit
+def test_metrics_with_many_values_are_split_across_documents(capsys):
+    """ CloudWatch only takes so many values per metric in a document. """
+
+    @emits_metrics
+    def handler(_event, _context=None):
+        increment("TripsResolved", 3)
+        for value in range(MAX_VALUES_PER_METRIC + 1):
+            observe("TripItLatency", value)
+
+    handler({})
+    documents = _emitted_documents(capsys.readouterr().out)
+    assert len(documents) == 2
+    assert documents[0]["TripsResolved"] == 3
+    assert len(documents[0]["TripItLatency"]) == MAX_VALUES_PER_METRIC
+    assert "TripsResolved" not in documents[1]
+    assert documents[1]["TripItLatency"] == [MAX_VALUES_PER_METRIC]
+
+
+@pytest.mark.unit
+def test_metrics_can_be_turned_off(monkeypatch, capsys):
+    """ We shouldn't record anything if TRIPIT_METRICS is false. """
+    monkeypatch.setenv("TRIPIT_METRICS", "false")
+
+    @emits_metrics
+    def handler(_event, _context=None):
+        increment("TripCacheHits")
+        return return_ok()
+
+    handler({})
+    assert _emitted_documents(capsys.readouterr().out) == []
+
+
+@pytest.mark.unit
+def test_fetching_trips_is_measured(fake_tripit_server, capsys):
+    """
+    Fetching trips should record TripIt's latency and status codes, and how
+    many trips and segments were resolved.
+    """
+    fake_tripit_server()
+
+    @emits_metrics
+    def handler(_event, _context=None):
+        return return_ok(additional_json={"trips": get_all_trips("token", "token-secret")})
+
+    response = handler({})
+    trips = json.loads(response["body"])["trips"]
+    document = _emitted_documents(capsys.readouterr().out)[0]
+    assert document["TripItStatus2xx"] == 1
+    assert len(document["TripItLatency"]) == 1
+    assert document["TripsResolved"] == len(trips)
+    assert document["SegmentsParsed"] == sum(len(trip["flights"]) for trip in trips)
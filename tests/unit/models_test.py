@@ -0,0 +1,26 @@
+"""
+Tests for the models that resolved trips are kept in.
+"""
+import pytest
+from tripit.models import FlightSegment, Trip
+
+
+@pytest.mark.unit
+def test_models_do_not_have_dicts():
+    """ Trips and segments should be slotted to keep them small. """
+    segment = FlightSegment("AA356", "DFW", "OMA", "-06:00", 0, 1)
+    trip = Trip(1, "Trip", "Omaha, NE", 1, False, "link", 0, [segment])
+    assert not hasattr(segment, "__dict__")
+    assert not hasattr(trip, "__dict__")
+    with pytest.raises(AttributeError):
+        trip.something_else = True  # pylint: disable=assigning-non-slot
+
+
+@pytest.mark.unit
+def test_codes_are_interned():
+    """ Codes that repeat across segments should share the same string. """
+    origin = "".join(["D", "F", "W"])
+    first = FlightSegment("AA356", "DFW", "OMA", "-06:00", 0, 1)
+    second = FlightSegment("AA356", origin, "OMA", "-06:00", 0, 1)
+    assert first.origin is second.origin
+    assert first == second
@@ -0,0 +1,67 @@
+"""
+Tests for rendering trips in API responses.
+"""
+import pytest
+from tripit.models import FlightSegment, Trip
+from tripit.presentation import present_trips
+
+
+def _trip():
+    return Trip(
+        id=1,
+        name="Trip",
+        city="Omaha, NE",
+        ends_on=1575590280,
+        ended=False,
+        link="https://www.tripit.com/trip/show/id/1",
+        starts_on=1575241860,
+        flights=[
+            FlightSegment(
+                flight_number="AA356",
+                origin="DFW",
+                destination="OMA",
+                offset="-06:00",
+                depart_time=1575241860,
+                arrive_time=1575248160,
+            )
+        ],
+    )
+
+
+@pytest.mark.unit
+def test_presenting_trips_with_human_times(show_as_human_readable_date):
+    """
+    Times should only be made human-readable in what we send back, not in the
+    trips that we resolved.
+    """
+    trip = _trip()
+    presented_trips = present_trips([trip], human_times=True)
+    assert presented_trips == [
+        {
+            "id": 1,
+            "name": "Trip",
+            "city": "Omaha, NE",
+            "ends_on": show_as_human_readable_date(1575590280),
+            "ended": False,
+            "link": "https://www.tripit.com/trip/show/id/1",
+            "starts_on": show_as_human_readable_date(1575241860),
+            "flights": [
+                {
+                    "flight_number": "AA356",
+                    "origin": "DFW",
+                    "destination": "OMA",
+                    "offset": "-06:00",
+                    "depart_time": show_as_human_readable_date(1575241860),
+                    "arrive_time": show_as_human_readable_date(1575248160),
+                }
+            ],
+        }
+    ]
+    assert trip == _trip()
+
+
+@pytest.mark.unit
+def test_presenting_trips_without_human_times():
+    """ Trips should be turned into dicts as they are if human times weren't asked for. """
+    assert present_trips([_trip()]) == [_trip().to_dict()]
+    assert present_trips(None, human_times=True) is None
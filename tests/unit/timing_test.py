@@ -0,0 +1,86 @@
+"""
+Tests for timing the phases of our handlers.
+"""
+import json
+import pytest
+from tripit.cloud_helpers.aws.api_gateway import return_ok
+from tripit.timing import PhaseTimer, current_timer, time_phases, timed
+from tripit.trips import get_all_trips
+
+
+@pytest.mark.unit
+def test_phases_are_added_up():
+    """ Phases that happen more than once should be summed and counted. """
+    timer = PhaseTimer("handler")
+    timer.add("tripit", 0.25)
+    timer.add("tripit", 0.5)
+    timer.add("join", 0.125)
+    assert timer.server_timing().startswith("tripit;dur=750.0, join;dur=125.0, total;dur=")
+    assert timer.to_dict()["phases"] == {
+        "tripit": {"ms": 750.0, "count": 2},
+        "join": {"ms": 125.0, "count": 1},
+    }
+
+
+@pytest.mark.unit
+def test_nothing_is_timed_outside_of_handlers():
+    """ Responses made outside of a timed handler shouldn't have a Server-Timing header. """
+    with timed("tripit"):
+        pass
+    assert current_timer() is None
+    assert "headers" not in return_ok()
+
+
+@pytest.mark.unit
+def test_timed_handlers_report_their_phases(caplog):
+    """
+    Responses from timed handlers should say where their time went, and so
+    should our logs.
+    """
+
+    @time_phases
+    def handler(_event, _context=None):
+        with timed("token"):
+            pass
+        with timed("tripit"):
+            pass
+        return return_ok()
+
+    with caplog.at_level("INFO"):
+        response = handler({})
+    assert current_timer() is None
+    metrics = [metric.split(";")[0] for metric in response["headers"]["Server-Timing"].split(", ")]
+    assert metrics == ["token", "tripit", "total"]
+    logged_timings = json.loads(caplog.messages[-1].split("Phase timings: ", 1)[1])
+    assert logged_timings["handler"] == "handler"
+    assert set(logged_timings["phases"]) == {"token", "tripit"}
+
+
+@pytest.mark.unit
+def test_phase_timing_can_be_turned_off(monkeypatch):
+    """ We shouldn't time anything if TRIPIT_PHASE_TIMING is false. """
+    monkeypatch.setenv("TRIPIT_PHASE_TIMING", "false")
+
+    @time_phases
+    def handler(_event, _context=None):
+        assert current_timer() is None
+        return return_ok()
+
+    assert "headers" not in handler({})
+
+
+@pytest.mark.unit
+def test_fetching_trips_is_timed_by_phase(fake_tripit_server):
+    """
+    Fetching trips from TripIt should be broken down into signing, waiting on
+    TripIt, decoding and resolving trips.
+    """
+    fake_tripit_server()
+
+    @time_phases
+    def handler(_event, _context=None):
+        return return_ok(additional_json={"trips": get_all_trips("token", "token-secret")})
+
+    response = handler({})
+    metrics = [metric.split(";")[0] for metric in response["headers"]["Server-Timing"].split(", ")]
+    assert metrics == ["sign", "tripit", "decode", "join", "total"]
@@ -0,0 +1,42 @@
+"""
+These tests cover caching resolved trips between calls.
+"""
+
+import pytest
+from freezegun import freeze_time
+from tripit.cache import reset_trip_cache
+from tripit.sync import forget_trips_for_access_key, get_trips_for_access_key
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_caching_trips_for_access_keys(monkeypatch, fake_response_from_route):
+    """
+    Once cached, trips should be served without going back to TripIt until
+    they are invalidated.
+    """
+    calls = []
+
+    def _fake_tripit(*args, **kwargs):
+        calls.append(kwargs)
+        return fake_response_from_route(
+            fake_trip_name="Personal: Some Trip",
+            fake_flights_scenario="personal_trip_without_flights",
+            *args,
+            **kwargs,
+        )
+
+    monkeypatch.setenv("TRIPIT_TRIP_CACHE_TTL_SECONDS", "30")
+    reset_trip_cache()
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", _fake_tripit)
+    trips = get_trips_for_access_key("fake-key", "token", "token_secret")
+    assert get_trips_for_access_key("fake-key", "token", "token_secret") == trips
+    assert len(calls) == 1
+
+    get_trips_for_access_key("another-key", "token", "token_secret")
+    assert len(calls) == 2
+
+    forget_trips_for_access_key("fake-key")
+    get_trips_for_access_key("fake-key", "token", "token_secret")
+    assert len(calls) == 3
+    reset_trip_cache()
@@ -0,0 +1,91 @@
+"""
+These tests cover fetching trips from TripIt one page at a time.
+"""
+
+import pytest
+from freezegun import freeze_time
+from tests.fixtures.unit.fake_response import FakeResponse
+from tripit.trips import get_all_trips, iter_trips, TripFetchError
+
+
+def _trip(trip_id):
+    return {
+        "id": str(trip_id),
+        "relative_url": f"/trip/show/id/{trip_id}",
+        "start_date": "2019-12-15",
+        "end_date": "2019-12-19",
+        "display_name": f"Trip {trip_id}",
+        "primary_location": "Dayton, OH",
+    }
+
+
+def _paginated_tripit(pages, requested_params):
+    """
+    Serves `pages` from a fake `/list/trip`, recording the params of each request.
+    """
+
+    def _run(*args, **kwargs):
+        params = kwargs["params"]
+        requested_params.append(params)
+        page_num = params["page_num"]
+        return FakeResponse(
+            url="https://api.tripit.com/v1/list/trip",
+            status_code=200,
+            json_object={"page_num": page_num, "max_page": len(pages), **pages[page_num - 1]},
+        )
+
+    return _run
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_fetching_every_page_of_trips(monkeypatch):
+    """
+    We should keep asking for pages until TripIt tells us we've reached the last one.
+    """
+    requested_params = []
+    pages = [{"Trip": [_trip(1), _trip(2)]}, {"Trip": _trip(3)}]
+    monkeypatch.setenv("TRIPIT_TRIP_PAGE_SIZE", "2")
+    monkeypatch.setattr(
+        "tripit.trips.get_from_tripit_v1", _paginated_tripit(pages, requested_params)
+    )
+    trips = get_all_trips(token="token", token_secret="token_secret")
+    assert [trip["id"] for trip in trips] == [1, 2, 3]
+    assert requested_params == [
+        {"include_objects": "true", "page_num": 1, "page_size": 2},
+        {"include_objects": "true", "page_num": 2, "page_size": 2},
+    ]
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_that_pages_are_fetched_lazily(monkeypatch):
+    """
+    The next page shouldn't be requested until we've gone through the current one.
+    """
+    requested_params = []
+    pages = [{"Trip": _trip(1)}, {"Trip": _trip(2)}]
+    monkeypatch.setattr(
+        "tripit.trips.get_from_tripit_v1", _paginated_tripit(pages, requested_params)
+    )
+    trips = iter_trips(token="token", token_secret="token_secret", past=True, page_size=1)
+    assert next(trips).id == 1
+    assert len(requested_params) == 1
+    assert requested_params[0]["past"] == "true"
+    assert next(trips).id == 2
+    assert len(requested_params) == 2
+
+
+@pytest.mark.unit
+def test_failing_to_fetch_a_page(monkeypatch):
+    """
+    get_all_trips should give us nothing if TripIt fails, but iterating over
+    trips directly should tell us that something went wrong.
+    """
+    monkeypatch.setattr(
+        "tripit.trips.get_from_tripit_v1",
+        lambda *args, **kwargs: FakeResponse(url="", status_code=500, text="{}"),
+    )
+    assert get_all_trips(token="token", token_secret="token_secret") is None
+    with pytest.raises(TripFetchError):
+        list(iter_trips(token="token", token_secret="token_secret"))
@@ -0,0 +1,64 @@
+"""
+Tests for talking to TripIt over real HTTP, from getting tokens to resolving trips.
+
+These use the fake TripIt from `tests.fixtures.unit.fake_tripit_server`.
+"""
+import time
+import pytest
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit.core.v1.oauth import request_access_token, request_request_token
+from tripit.trips import get_all_trips
+
+
+@pytest.mark.unit
+def test_signing_in_and_fetching_trips(fake_tripit_server):
+    """
+    Signatures are checked at every step, so this exercises our OAuth headers
+    against the URIs that we actually request.
+    """
+    account = SyntheticTripIt(5, empty_trip_fraction=0)
+    server = fake_tripit_server(
+        account, consumer_key="fake-client-id", consumer_secret="fake-client-secret"
+    )
+    request_token = request_request_token()
+    access_token = request_access_token(request_token["token"], request_token["token_secret"])
+    trips = get_all_trips(access_token["token"], access_token["token_secret"])
+    assert [trip["name"] for trip in trips] == [
+        trip["display_name"] for trip in account.payload()["Trip"]
+    ]
+    assert server.status_counts == {200: 3}
+
+
+@pytest.mark.unit
+def test_unsigned_requests_are_rejected(fake_tripit_server):
+    """ Tokens that TripIt didn't give us shouldn't work. """
+    server = fake_tripit_server(
+        SyntheticTripIt(5), consumer_key="fake-client-id", consumer_secret="fake-client-secret"
+    )
+    assert get_all_trips("made-up-token", "made-up-secret") is None
+    assert server.status_counts == {401: 1}
+
+
+@pytest.mark.unit
+def test_tripit_failing_and_throttling_us(fake_tripit_server, monkeypatch):
+    """ We should give up gracefully once retries run out. """
+    monkeypatch.setenv("TRIPIT_HTTP_RETRIES", "2")
+    monkeypatch.setenv("TRIPIT_HTTP_RETRY_BACKOFF_SECONDS", "0")
+    server = fake_tripit_server(SyntheticTripIt(5), error_rate=1)
+    assert get_all_trips("token", "secret") is None
+    assert server.status_counts == {503: 3}
+
+    # 429s are retried too, after waiting for as long as TripIt asks us to.
+    monkeypatch.setenv("TRIPIT_HTTP_RETRIES", "0")
+    server = fake_tripit_server(SyntheticTripIt(5), throttle_rate=1)
+    assert get_all_trips("token", "secret") is None
+    assert server.status_counts == {429: 1}
+
+
+@pytest.mark.unit
+def test_tripit_being_slow(fake_tripit_server):
+    """ Latency is applied to every request. """
+    fake_tripit_server(SyntheticTripIt(1, empty_trip_fraction=0), latency_ms=50)
+    started_at = time.monotonic()
+    assert len(get_all_trips("token", "secret")) == 1
+    assert time.monotonic() - started_at >= 0.05
@@ -0,0 +1,46 @@
+"""
+These tests cover indexing the objects in a `/list/trip` payload by trip ID.
+"""
+
+import pytest
+from tripit.trips import index_objects_by_trip_id, index_trip_payload
+
+
+@pytest.mark.unit
+def test_indexing_objects_by_trip_id():
+    """
+    Objects should be grouped by trip, in the order that TripIt gave them to us.
+    """
+    objects = [
+        {"id": "1", "trip_id": "a"},
+        {"id": "2", "trip_id": "b"},
+        {"id": "3", "trip_id": "a"},
+    ]
+    assert index_objects_by_trip_id(objects) == {
+        "a": [{"id": "1", "trip_id": "a"}, {"id": "3", "trip_id": "a"}],
+        "b": [{"id": "2", "trip_id": "b"}],
+    }
+
+
+@pytest.mark.unit
+def test_indexing_a_single_object():
+    """
+    TripIt doesn't wrap lone objects in arrays. We should handle that.
+    """
+    assert index_objects_by_trip_id({"id": "1", "trip_id": "a"}) == {
+        "a": [{"id": "1", "trip_id": "a"}]
+    }
+
+
+@pytest.mark.unit
+def test_indexing_a_payload():
+    """
+    Trips should be normalized into a list and objects should be indexed.
+    Payloads without notes or flights should produce empty indexes.
+    """
+    trips, flights, notes = index_trip_payload(
+        {"Trip": {"id": "a"}, "AirObject": {"id": "1", "trip_id": "a"}}
+    )
+    assert trips == [{"id": "a"}]
+    assert flights == {"a": [{"id": "1", "trip_id": "a"}]}
+    assert notes == {}
@@ -0,0 +1,142 @@
+"""
+These tests make sure that finding the current trip only resolves trips that
+might be happening right now.
+"""
+
+import json
+import pytest
+from freezegun import freeze_time
+from tests.fixtures.unit.fake_response import FakeResponse
+from tripit.api.aws_api_gateway.current_trip import current_trip
+from tripit.auth.store import get_token_store, reset_token_store
+from tripit.cache import reset_current_trip_cache, reset_trip_cache
+from tripit.trips import get_current_trip, trip_might_be_current
+
+
+def _trip(trip_id, start_date, end_date):
+    return {
+        "id": str(trip_id),
+        "relative_url": f"/trip/show/id/{trip_id}",
+        "start_date": start_date,
+        "end_date": end_date,
+        "display_name": f"Trip {trip_id}",
+        "primary_location": "Dayton, OH",
+    }
+
+
+@pytest.mark.unit
+@freeze_time("2019-12-16 12:00:00")
+def test_only_candidate_trips_are_fetched(monkeypatch):
+    """
+    We should list trips without their objects and only fetch the ones whose
+    dates contain today.
+    """
+    trips = [
+        _trip(1, "2019-11-01", "2019-11-05"),
+        _trip(2, "2019-12-15", "2019-12-19"),
+        _trip(3, "2020-01-10", "2020-01-12"),
+    ]
+    requests = []
+
+    def _fake_tripit(*_args, **kwargs):
+        requests.append((kwargs["endpoint"], kwargs["params"]))
+        if kwargs["endpoint"] == "/get/trip":
+            trip = [trip for trip in trips if trip["id"] == kwargs["params"]["id"]][0]
+            return FakeResponse(url="", status_code=200, json_object={"Trip": trip})
+        return FakeResponse(url="", status_code=200, json_object={"Trip": trips})
+
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", _fake_tripit)
+    assert get_current_trip(token="token", token_secret="token_secret") == {
+        "trip_name": "Trip 2",
+        "current_city": "Dayton, OH",
+        "todays_flight": {},
+    }
+    assert requests[0][1]["include_objects"] == "false"
+    assert requests[0][1]["past"] == "false"
+    assert requests[1:] == [("/get/trip", {"id": "2", "include_objects": "true"})]
+
+
+@pytest.mark.unit
+def test_trips_might_be_current_shortly_after_they_end():
+    """
+    Redeyes can land after a trip's end date, so we should give trips some slack.
+    """
+    trip = _trip(1, "2019-12-15", "2019-12-19")
+    now = 1576807200  # 2019-12-20 02:00:00 UTC
+    assert trip_might_be_current(trip, now, slack_seconds=24 * 3600)
+    assert not trip_might_be_current(trip, now + 2 * 24 * 3600, slack_seconds=24 * 3600)
+
+
+@pytest.fixture(name="authorized_key")
+def fixture_authorized_key(monkeypatch):
+    """ Gives "fake-key" a token in memory, with the trip cache on. """
+    monkeypatch.setenv("TRIPIT_TOKEN_STORE", "memory")
+    monkeypatch.setenv("TRIPIT_TRIP_CACHE_TTL_SECONDS", "60")
+    reset_token_store()
+    reset_trip_cache()
+    reset_current_trip_cache()
+    get_token_store().put_access_token("fake-key", "token", "token_secret")
+    yield {"requestContext": {"identity": {"apiKey": "fake-key"}}}
+    reset_token_store()
+    reset_trip_cache()
+    reset_current_trip_cache()
+
+
+@pytest.mark.unit
+@freeze_time("2019-12-16 12:00:00")
+def test_trip_cache_misses_stay_lazy(monkeypatch, authorized_key):
+    """
+    Having a trip cache shouldn't make /current_trip fetch every trip in the
+    account when the cache doesn't have them.
+    """
+    requests = []
+
+    def _fake_tripit(*_args, **kwargs):
+        requests.append(kwargs["params"])
+        return FakeResponse(url="", status_code=200, json_object={"Trip": []})
+
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", _fake_tripit)
+    response = current_trip(authorized_key)
+    assert response["statusCode"] == 200
+    assert [params["include_objects"] for params in requests] == ["false"]
+
+
+@pytest.mark.unit
+@freeze_time("2019-12-16 12:00:00")
+def test_current_trips_are_cached(monkeypatch, authorized_key):
+    """
+    Warm containers shouldn't go back to TripIt for the current trip until
+    the one that they found has expired.
+    """
+    trips = [_trip(2, "2019-12-15", "2019-12-19")]
+    requests = []
+
+    def _fake_tripit(*_args, **kwargs):
+        requests.append(kwargs["endpoint"])
+        if kwargs["endpoint"] == "/get/trip":
+            return FakeResponse(url="", status_code=200, json_object={"Trip": trips[0]})
+        return FakeResponse(url="", status_code=200, json_object={"Trip": trips})
+
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", _fake_tripit)
+    first_response = current_trip(authorized_key)
+    fetched = len(requests)
+    assert json.loads(first_response["body"])["trip"]["trip_name"] == "Trip 2"
+    assert current_trip(authorized_key)["body"] == first_response["body"]
+    assert len(requests) == fetched
+
+
+@pytest.mark.unit
+def test_failed_syncs_are_not_tried_again_lazily(monkeypatch, authorized_key):
+    """
+    If TripIt fails us while syncing, we shouldn't ask it again for the
+    current trip on the same call.
+    """
+    monkeypatch.setenv("TRIPIT_INCREMENTAL_SYNC", "true")
+    monkeypatch.setattr("tripit.sync.sync_trips", lambda *_args: None)
+
+    def _fake_tripit(*_args, **kwargs):
+        raise AssertionError("TripIt shouldn't have been asked again")
+
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", _fake_tripit)
+    response = current_trip(authorized_key)
+    assert json.loads(response["body"])["trip"] is None
@@ -0,0 +1,73 @@
+"""
+Tests for resolving accounts that look like a heavy traveler's.
+
+See `tests.fixtures.synthetic_trips`.
+"""
+import datetime
+import pytest
+from freezegun import freeze_time
+from tripit.trips import get_all_trips, get_current_trip, index_trip_payload, resolve_trip
+
+
+@pytest.mark.unit
+def test_synthetic_accounts_are_reproducible(synthetic_tripit):
+    """ The same seed should always give us the same account, page by page. """
+    account = synthetic_tripit(60, seed=7)
+    assert account.payload() == synthetic_tripit(60, seed=7).payload()
+    assert account.payload() != synthetic_tripit(60, seed=8).payload()
+    paged_trips = [trip for page_num in (1, 2, 3) for trip in account.page(page_num, 25)["Trip"]]
+    assert paged_trips == account.payload()["Trip"]
+    assert account.page(3, 25)["max_page"] == "3"
+
+
+@pytest.mark.unit
+def test_synthetic_accounts_have_tripit_quirks(synthetic_tripit):
+    """ Single objects should show up where TripIt would use them instead of lists. """
+    payload = synthetic_tripit(200, seed=1).payload()
+    segments = [flight["Segment"] for flight in payload["AirObject"]]
+    assert any(isinstance(segment, dict) for segment in segments)
+    assert any(isinstance(segment, list) for segment in segments)
+    assert any("primary_location" not in trip for trip in payload["Trip"])
+    assert any(note["display_name"] == "TRIP_ENDED" for note in payload["NoteObject"])
+    assert "LodgingObject" in payload and "Profile" in payload
+
+    lonely_payload = synthetic_tripit(1, seed=1, flights_per_trip=(1, 1), empty_trip_fraction=0)
+    assert isinstance(lonely_payload.payload()["Trip"], dict)
+    assert isinstance(lonely_payload.payload()["AirObject"], dict)
+
+
+@pytest.mark.unit
+def test_resolving_synthetic_accounts(synthetic_tripit):
+    """ Every trip should resolve with its flights in order, or be skipped if empty. """
+    payload = synthetic_tripit(500, seed=2).payload()
+    trips, flights, notes = index_trip_payload(payload)
+    resolved_trips = [resolve_trip(trip, flights, notes) for trip in trips]
+    empty_trips = [trip for trip in trips if "start_date" not in trip]
+    assert len([trip for trip in resolved_trips if trip is None]) == len(empty_trips)
+    for trip in filter(None, resolved_trips):
+        depart_times = [flight.depart_time for flight in trip.flights]
+        assert depart_times == sorted(depart_times)
+        assert all(flight.arrive_time > flight.depart_time for flight in trip.flights)
+        assert trip.starts_on <= trip.ends_on
+
+
+@pytest.mark.unit
+def test_fetching_large_synthetic_accounts(synthetic_tripit, fake_tripit_server, monkeypatch):
+    """
+    Pages of very large accounts are only generated as they're fetched, so we
+    can look for the current trip in an account with 20,000 trips.
+    """
+    monkeypatch.setenv("TRIPIT_TRIP_PAGE_SIZE", "1000")
+    account = synthetic_tripit(20000, seed=3)
+    server = fake_tripit_server(account)
+    trip = account.trip(19990)["Trip"][0]
+    during_trip = datetime.datetime.fromisoformat(trip["start_date"]) + datetime.timedelta(hours=12)
+    with freeze_time(during_trip):
+        current_trip = get_current_trip("token", "secret")
+    assert current_trip["trip_name"]
+    assert len([path for path in server.requested_paths if "/list/trip/" in path]) == 20
+
+    server = fake_tripit_server(synthetic_tripit(300, seed=3))
+    assert len(get_all_trips("token", "secret")) == len(
+        [trip for trip in server.payload.payload()["Trip"] if "start_date" in trip]
+    )
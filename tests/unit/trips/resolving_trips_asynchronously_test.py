@@ -0,0 +1,119 @@
+"""
+Tests for fetching and resolving trips on an event loop.
+
+These go over HTTP to a fake TripIt running on localhost, with the same
+shared session as every other call to TripIt.
+"""
+import asyncio
+import datetime
+import threading
+import pytest
+from freezegun import freeze_time
+from tests.fixtures.synthetic_trips import SyntheticTripIt
+from tripit import trips as trips_module
+from tripit.trips import (
+    get_all_trips,
+    get_all_trips_async,
+    get_current_trip,
+    get_current_trip_async,
+    normalize_segments_from_flight,
+)
+
+
+def _first_flight(account):
+    """
+    Returns the first trip in `account`, its first segment and a time at
+    which we're on it.
+    """
+    objects = account.trip(0)
+    segment = normalize_segments_from_flight(objects["AirObject"][0])[0]
+    departs_at = datetime.datetime.fromisoformat(
+        f"{segment['StartDateTime']['date']}T{segment['StartDateTime']['time']}"
+        f"{segment['StartDateTime']['utc_offset']}"
+    )
+    return objects["Trip"][0], segment, departs_at + datetime.timedelta(minutes=10)
+
+
+@pytest.mark.unit
+def test_async_trips_match_sync_trips(fake_tripit_server, monkeypatch):
+    """
+    Both clients should resolve the same trips, with every page after the
+    first fetched at once.
+    """
+    monkeypatch.setenv("TRIPIT_TRIP_PAGE_SIZE", "4")
+    server = fake_tripit_server(
+        SyntheticTripIt(
+            10, segments_per_flight=(2, 2), notes_per_trip=(1, 1), empty_trip_fraction=0
+        )
+    )
+    sync_trips = get_all_trips("token", "secret")
+    async_trips = asyncio.run(get_all_trips_async("token", "secret"))
+    assert len(async_trips) == 10
+    assert async_trips == sync_trips
+    assert len([path for path in server.requested_paths if "/list/trip/" in path]) == 6
+
+
+@pytest.mark.unit
+def test_async_trips_when_tripit_fails(fake_tripit_server, monkeypatch):
+    """ We should get nothing back rather than an exception. """
+    monkeypatch.setenv("TRIPIT_HTTP_RETRIES", "0")
+    fake_tripit_server(SyntheticTripIt(3), error_rate=1)
+    assert asyncio.run(get_all_trips_async("token", "secret")) is None
+    assert asyncio.run(get_current_trip_async("token", "secret")) is None
+
+
+@pytest.mark.unit
+def test_async_current_trip_matches_sync_current_trip(fake_tripit_server, monkeypatch):
+    """ Only candidates for the current trip are fetched in full. """
+    # Synthetic trips are days apart, so widen the slack to make every one a candidate.
+    monkeypatch.setenv("TRIPIT_CURRENT_TRIP_SLACK_HOURS", "720")
+    account = SyntheticTripIt(3, empty_trip_fraction=0)
+    server = fake_tripit_server(account)
+    trip, segment, in_flight = _first_flight(account)
+    with freeze_time(in_flight):
+        sync_trip = get_current_trip("token", "secret")
+        async_trip = asyncio.run(get_current_trip_async("token", "secret"))
+    assert async_trip == sync_trip
+    assert async_trip["trip_name"] == trip["display_name"]
+    assert async_trip["todays_flight"]["flight_number"] == "".join(
+        [segment["marketing_airline_code"], segment["marketing_flight_number"]]
+    )
+    # The sync client stops at the first current trip; the async one fetches them all at once.
+    fetched_trips = [path for path in server.requested_paths if "/get/trip/" in path]
+    assert len(fetched_trips) == 1 + 3
+
+
+@pytest.mark.unit
+def test_async_trips_are_retried(fake_tripit_server, monkeypatch):
+    """ TripIt hiccups now and then; we should try again before giving up. """
+    monkeypatch.setenv("TRIPIT_HTTP_RETRY_BACKOFF_SECONDS", "0")
+    server = fake_tripit_server(SyntheticTripIt(2, empty_trip_fraction=0))
+    respond = server.respond
+    failures = iter([(503, {}, b"{}")])
+    server.respond = lambda path: next(failures, None) or respond(path)
+    assert len(asyncio.run(get_all_trips_async("token", "secret"))) == 2
+
+
+@pytest.mark.unit
+def test_trips_are_not_resolved_on_the_event_loop(fake_tripit_server, monkeypatch):
+    """
+    Resolving trips waits on threads, which shouldn't hold up other
+    coroutines on the loop.
+    """
+    account = SyntheticTripIt(3, empty_trip_fraction=0)
+    fake_tripit_server(account)
+    join_trips = trips_module.join_trips
+    joined_on = []
+
+    def _join_trips(*args, **kwargs):
+        joined_on.append(threading.get_ident())
+        return join_trips(*args, **kwargs)
+
+    monkeypatch.setattr(trips_module, "join_trips", _join_trips)
+    trip, _, in_flight = _first_flight(account)
+    with freeze_time(in_flight):
+        assert len(asyncio.run(get_all_trips_async("token", "secret"))) == 3
+        current_trip = asyncio.run(get_current_trip_async("token", "secret"))
+    assert current_trip["trip_name"] == trip["display_name"]
+    assert joined_on
+    assert threading.get_ident() not in joined_on
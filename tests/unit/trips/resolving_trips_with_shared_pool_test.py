@@ -0,0 +1,83 @@
+"""
+These tests cover the thread pool that we use to resolve trips.
+
+Trips used to be resolved one at a time because each of them got their own pool.
+They should now share a single, bounded pool for as long as the container is warm.
+"""
+
+import concurrent.futures
+import pytest
+from freezegun import freeze_time
+from tripit.trips import (
+    get_all_trips,
+    get_trip_resolver_executor,
+    get_trip_resolver_worker_count,
+    join_trips,
+    shutdown_trip_resolver_executor,
+    DEFAULT_TRIP_RESOLVER_WORKERS,
+)
+
+
+@pytest.mark.unit
+def test_that_worker_count_is_configurable(monkeypatch):
+    """
+    We should be able to size the pool from the environment.
+    """
+    monkeypatch.delenv("TRIPIT_TRIP_RESOLVER_WORKERS", raising=False)
+    assert get_trip_resolver_worker_count() == DEFAULT_TRIP_RESOLVER_WORKERS
+    monkeypatch.setenv("TRIPIT_TRIP_RESOLVER_WORKERS", "3")
+    assert get_trip_resolver_worker_count() == 3
+    monkeypatch.setenv("TRIPIT_TRIP_RESOLVER_WORKERS", "0")
+    assert get_trip_resolver_worker_count() == 1
+
+
+@pytest.mark.unit
+def test_that_the_pool_is_shared_across_calls(monkeypatch):
+    """
+    Warm containers should reuse the same pool instead of creating a new one per trip.
+    """
+    monkeypatch.setenv("TRIPIT_TRIP_RESOLVER_WORKERS", "2")
+    shutdown_trip_resolver_executor()
+    executor = get_trip_resolver_executor()
+    assert executor is get_trip_resolver_executor()
+    assert executor._max_workers == 2  # pylint: disable=protected-access
+    shutdown_trip_resolver_executor()
+    assert get_trip_resolver_executor() is not executor
+    shutdown_trip_resolver_executor()
+
+
+@pytest.mark.unit
+def test_that_trips_are_returned_in_order(monkeypatch):
+    """
+    Trips should come back in the order that TripIt gave them to us, even if
+    later trips finish resolving first.
+    """
+    trips = [{"id": str(trip_id)} for trip_id in range(20)]
+    monkeypatch.setattr(
+        "tripit.trips.resolve_trip",
+        lambda trip, *args: {"id": int(trip["id"])} if trip["id"] != "5" else {},
+    )
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        resolved = join_trips(trips, {}, {}, executor=executor)
+    assert [trip["id"] for trip in resolved] == [i for i in range(20) if i != 5]
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_that_a_single_worker_still_resolves_everything(monkeypatch, fake_response_from_route):
+    """
+    Capping the pool at one worker shouldn't drop trips.
+    """
+    monkeypatch.setenv("TRIPIT_TRIP_RESOLVER_WORKERS", "1")
+    shutdown_trip_resolver_executor()
+    monkeypatch.setattr(
+        "tripit.trips.get_from_tripit_v1",
+        lambda *args, **kwargs: fake_response_from_route(
+            fake_trip_name="Personal: Multiple Trip",
+            fake_flights_scenario="personal_multi_trip_without_flights",
+            *args,
+            **kwargs,
+        ),
+    )
+    assert len(get_all_trips(token="token", token_secret="token_secret")) == 2
+    shutdown_trip_resolver_executor()
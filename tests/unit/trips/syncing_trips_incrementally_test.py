@@ -0,0 +1,139 @@
+"""
+These tests cover syncing trips incrementally.
+
+After the first sync, we should only fetch trips that TripIt says were modified
+and drop the trips that TripIt no longer has.
+"""
+
+import pytest
+from freezegun import freeze_time
+from tests.fixtures.unit.fake_response import FakeResponse
+from tripit.cache import reset_snapshot_cache
+from tripit.sync import forget_snapshot, sync_trips
+
+
+def _trip(trip_id, name=None):
+    return {
+        "id": str(trip_id),
+        "relative_url": f"/trip/show/id/{trip_id}",
+        "start_date": "2019-12-15",
+        "end_date": "2019-12-19",
+        "display_name": name or f"Trip {trip_id}",
+        "primary_location": "Dayton, OH",
+    }
+
+
+class FakeTripIt:
+    """
+    Serves trips the way TripIt would, keeping track of what was asked for.
+    """
+
+    def __init__(self, trips):
+        self.trips = trips
+        self.modified_trip_ids = []
+        self.requests = []
+
+    def get(self, *args, **kwargs):
+        """ Stands in for get_from_tripit_v1. """
+        endpoint = kwargs["endpoint"]
+        params = kwargs["params"]
+        self.requests.append((endpoint, params))
+        if endpoint == "/get/trip":
+            trip = [trip for trip in self.trips if trip["id"] == params["id"]]
+            return FakeResponse(url="", status_code=200, json_object={"Trip": trip[0]})
+        if "modified_since" in params:
+            trips = [trip for trip in self.trips if trip["id"] in self.modified_trip_ids]
+        else:
+            trips = self.trips
+        return FakeResponse(
+            url="", status_code=200, json_object={"timestamp": "1000", "Trip": trips}
+        )
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_syncing_trips_incrementally(monkeypatch):
+    """
+    The first sync fetches everything. Later ones only fetch what changed.
+    """
+    monkeypatch.setenv("TRIPIT_SYNC_LISTING_INTERVAL", "1")
+    forget_snapshot("fake-key")
+    tripit = FakeTripIt([_trip(1), _trip(2), _trip(3)])
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", tripit.get)
+    trips = sync_trips("fake-key", "token", "token_secret")
+    assert [trip.id for trip in trips] == [1, 2, 3]
+
+    tripit.requests = []
+    tripit.trips = [_trip(1), _trip(2, name="Renamed")]
+    tripit.modified_trip_ids = ["2"]
+    trips = sync_trips("fake-key", "token", "token_secret")
+    assert [(trip.id, trip.name) for trip in trips] == [(1, "Trip 1"), (2, "Renamed")]
+    assert tripit.requests[0][1]["modified_since"] == 1000
+    assert tripit.requests[0][1]["include_objects"] == "true"
+    assert tripit.requests[1][1]["include_objects"] == "false"
+    assert tripit.requests[2] == ("/get/trip", {"id": "2", "include_objects": "true"})
+    assert len(tripit.requests) == 3
+    forget_snapshot("fake-key")
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_listing_every_trip_every_few_syncs(monkeypatch):
+    """
+    Every trip is only listed every few syncs, so deleted trips stick around
+    until then. New trips show up right away.
+    """
+    monkeypatch.setenv("TRIPIT_SYNC_LISTING_INTERVAL", "3")
+    forget_snapshot("fake-key")
+    tripit = FakeTripIt([_trip(1), _trip(2)])
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", tripit.get)
+    sync_trips("fake-key", "token", "token_secret")
+
+    tripit.trips = [_trip(2), _trip(3)]
+    tripit.modified_trip_ids = ["3"]
+    for _ in range(2):
+        tripit.requests = []
+        trips = sync_trips("fake-key", "token", "token_secret")
+        assert [trip.id for trip in trips] == [1, 2, 3]
+        assert all(params.get("include_objects") != "false" for _, params in tripit.requests)
+
+    tripit.requests = []
+    trips = sync_trips("fake-key", "token", "token_secret")
+    assert [trip.id for trip in trips] == [2, 3]
+    assert tripit.requests[1][1]["include_objects"] == "false"
+    forget_snapshot("fake-key")
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_forgetting_snapshots(monkeypatch):
+    """
+    Forgetting a snapshot should cause the next sync to fetch everything again.
+    """
+    tripit = FakeTripIt([_trip(1)])
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", tripit.get)
+    sync_trips("fake-key", "token", "token_secret")
+    forget_snapshot("fake-key")
+    tripit.requests = []
+    sync_trips("fake-key", "token", "token_secret")
+    assert "modified_since" not in tripit.requests[0][1]
+    forget_snapshot("fake-key")
+
+
+@pytest.mark.unit
+@freeze_time("Jan 1 1970 00:01:02")
+def test_snapshots_are_bounded(monkeypatch):
+    """
+    Once there are too many snapshots, the least recently synced one should
+    be dropped and synced in full next time.
+    """
+    monkeypatch.setenv("TRIPIT_SNAPSHOT_MAX_ENTRIES", "1")
+    reset_snapshot_cache()
+    tripit = FakeTripIt([_trip(1)])
+    monkeypatch.setattr("tripit.trips.get_from_tripit_v1", tripit.get)
+    sync_trips("fake-key", "token", "token_secret")
+    sync_trips("another-key", "token", "token_secret")
+    tripit.requests = []
+    sync_trips("fake-key", "token", "token_secret")
+    assert "modified_since" not in tripit.requests[0][1]
+    reset_snapshot_cache()
@@ -0,0 +1,9 @@
+"""
+Lambda handlers for API Gateway.
+
+Cold starts on our 128 MB functions are mostly spent importing things. Handler
+modules only import the response helpers up front; anything that reaches
+DynamoDB or TripIt, and pynamodb, botocore and requests with it, is imported
+within the handler the first time that it's called. `ping` never needs any of
+it. `tests/benchmarks/handler_import_benchmark_test.py` keeps us honest.
+"""
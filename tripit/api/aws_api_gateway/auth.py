@@ -1,7 +1,9 @@
 """
 API endpoint for authentication functions
 """
-from tripit.auth.step_1 import get_authn_url
+from tripit.auth.models import caches_reads
+from tripit.logging import flushes_logs
+from tripit.metrics import emits_metrics
 from tripit.cloud_helpers.aws.api_gateway import (
     get_endpoint,
     get_access_key,
@@ -12,11 +14,18 @@ from tripit.cloud_helpers.aws.api_gateway import (
 )
 
 
+@emits_metrics
+@flushes_logs
+@caches_reads
 def begin_authentication(event, _context=None):
     """
     Begin authenticating into TripIt by authorizing your account (and AWS access key)
     with Tripit.
     """
+    # pylint: disable=import-outside-toplevel
+    from tripit.auth.step_1 import get_authn_url
+    from tripit.auth.store import TokenStoreThrottled
+
     access_key = get_access_key(event)
     if not access_key:
         return return_error(message="Failed to get access key from event.")
@@ -27,9 +36,15 @@ def begin_authentication(event, _context=None):
     if not host:
         return return_error(message="Failed to get endpoint from event.")
     reauthorize = get_query_parameter(event, "reauthorize") or False
-    auth_url = get_authn_url(
-        access_key=access_key, host=host, reauthorize=reauthorize, api_gateway_endpoint=endpoint
-    )
+    try:
+        auth_url = get_authn_url(
+            access_key=access_key,
+            host=host,
+            reauthorize=reauthorize,
+            api_gateway_endpoint=endpoint,
+        )
+    except TokenStoreThrottled:
+        return return_error(code=503, message="Too busy to authorize you; try again.")
     if not auth_url:
         return return_error(message="No authorization URL received.")
     if auth_url.split("/")[-1] == "token":
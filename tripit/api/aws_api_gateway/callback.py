@@ -1,7 +1,9 @@
 """
 API endpoint for handling callbacks.
 """
-from tripit.auth.step_2 import handle_callback
+from tripit.auth.models import caches_reads
+from tripit.logging import flushes_logs
+from tripit.metrics import emits_metrics
 from tripit.cloud_helpers.aws.api_gateway import (
     get_endpoint,
     get_query_parameter,
@@ -11,10 +13,17 @@ from tripit.cloud_helpers.aws.api_gateway import (
 )
 
 # TODO: Handle token reauthorizations. Do this after we get passing integration tests.
+@emits_metrics
+@flushes_logs
+@caches_reads
 def callback(event, _context=None):
     """
     Handle the callback from TripIt.
     """
+    # pylint: disable=import-outside-toplevel
+    from tripit.auth.step_2 import handle_callback
+    from tripit.auth.store import TokenStoreThrottled
+
     endpoint = get_endpoint(event)
     if not endpoint:
         return return_error(message="Failed to get endpoint from event.")
@@ -24,6 +33,10 @@ def callback(event, _context=None):
     request_token = get_query_parameter(event, "oauth_token")
     if not request_token:
         return return_error(message="No request token in response.")
-    if handle_callback(request_token):
+    try:
+        authenticated = handle_callback(request_token)
+    except TokenStoreThrottled:
+        return return_error(code=503, message="Too busy to save your token; try again.")
+    if authenticated:
         return return_ok()
     return return_error(message="Authentication failed.")
@@ -1,8 +1,8 @@
 """
 Functions for working with trips.
 """
-from tripit.auth.token import get_token_data_for_access_key
-from tripit.trips import get_current_trip
+from tripit.metrics import emits_metrics
+from tripit.timing import time_phases, timed
 from tripit.cloud_helpers.aws.api_gateway import (
     get_access_key,
     return_ok,
@@ -10,20 +10,53 @@ from tripit.cloud_helpers.aws.api_gateway import (
 )
 
 
+@emits_metrics
+@time_phases
 def current_trip(event, _context=None):
     """
     Gets all trips associated with a TripIt account.
     """
+    # pylint: disable=import-outside-toplevel
+    from tripit.auth.store import TokenStoreThrottled
+    from tripit.auth.token import get_token_data_for_access_key
+    from tripit.sync import (
+        get_current_trip_for_access_key,
+        get_trips_for_access_key,
+        incremental_sync_enabled,
+    )
+    from tripit.trips import get_current_trip
+
     access_key = get_access_key(event)
     if not access_key:
         return return_error(message="Failed to get access key from event.")
-    token_data = get_token_data_for_access_key(access_key)
+    with timed("token"):
+        try:
+            token_data = get_token_data_for_access_key(access_key)
+        except TokenStoreThrottled:
+            return return_error(code=503, message="Too busy to check your token; try again.")
     if not token_data:
         return return_error(code=403, message="Access denied; go to /auth first.")
+    # Only use every trip in the account if we can sync them cheaply.
+    # Otherwise, only the trips that might be current are fetched.
+    if not incremental_sync_enabled():
+        return return_ok(
+            additional_json={
+                "trip": get_current_trip_for_access_key(
+                    access_key=access_key,
+                    token=token_data["token"],
+                    token_secret=token_data["token_secret"],
+                )
+            }
+        )
+    trips = get_trips_for_access_key(
+        access_key=access_key, token=token_data["token"], token_secret=token_data["token_secret"],
+    )
+    if trips is None:
+        return return_ok(additional_json={"trip": None})
     return return_ok(
         additional_json={
             "trip": get_current_trip(
-                token=token_data["token"], token_secret=token_data["token_secret"],
+                token=token_data["token"], token_secret=token_data["token_secret"], trips=trips,
             )
         }
     )
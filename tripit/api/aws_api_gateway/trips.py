@@ -1,8 +1,8 @@
 """
 Functions for working with trips.
 """
-from tripit.auth.token import get_token_data_for_access_key
-from tripit.trips import get_all_trips
+from tripit.metrics import emits_metrics
+from tripit.timing import time_phases, timed
 from tripit.cloud_helpers.aws.api_gateway import (
     get_access_key,
     get_query_parameter,
@@ -11,23 +11,34 @@ from tripit.cloud_helpers.aws.api_gateway import (
 )
 
 
+@emits_metrics
+@time_phases
 def get_trips(event, _context=None):
     """
     Gets all trips associated with a TripIt account.
     """
+    # pylint: disable=import-outside-toplevel
+    from tripit.auth.store import TokenStoreThrottled
+    from tripit.auth.token import get_token_data_for_access_key
+    from tripit.presentation import present_trips
+    from tripit.sync import get_trips_for_access_key
+
     access_key = get_access_key(event)
     show_human_times = get_query_parameter(event, "human_times") or False
     if not access_key:
         return return_error(message="Failed to get access key from event.")
-    token_data = get_token_data_for_access_key(access_key)
+    with timed("token"):
+        try:
+            token_data = get_token_data_for_access_key(access_key)
+        except TokenStoreThrottled:
+            return return_error(code=503, message="Too busy to check your token; try again.")
     if not token_data:
         return return_error(code=403, message="Access denied; go to /auth first.")
+    trips = get_trips_for_access_key(
+        access_key=access_key,
+        token=token_data["token"],
+        token_secret=token_data["token_secret"],
+    )
     return return_ok(
-        additional_json={
-            "trips": get_all_trips(
-                token=token_data["token"],
-                token_secret=token_data["token_secret"],
-                human_times=show_human_times,
-            )
-        }
+        additional_json={"trips": present_trips(trips, human_times=show_human_times)}
     )
@@ -1,143 +1,493 @@
 """
 These are tables used to represent relationships between access keys and various
 different kinds of tokens.
+
+pynamodb, and botocore with it, take a good while to import, which cold starts
+on small Lambda functions feel. So that handlers that never touch these tables
+don't pay for them, the models, and their `Meta`, are only built the first time
+that they're used, like `from tripit.auth.models import TripitAccessToken` or
+`models.TripitAccessToken`.
+
+Tables are created ahead of time with `provision_tables`, or by running
+`python -m tripit.auth.models`, so writes don't have to check whether they
+exist first. Each write is a single PutItem; see `save_item`.
+
+Within a unit of work, like a call to a handler wrapped with `caches_reads`,
+each item is only read from DynamoDB once, however many times it's asked for.
+
+Tables are billed per request if AWS_DYNAMODB_BILLING_MODE is
+"PAY_PER_REQUEST". Otherwise, each table's capacity comes from, say,
+AWS_DYNAMODB_ACCESS_TOKENS_RCU, then AWS_DYNAMODB_RCU, then 2 units. Reads and
+writes that DynamoDB throttles, or that fail with a 5xx or a dropped connection,
+are retried; see `retry_throttled`. botocore's own retries are turned off, so
+they don't pile on top of ours.
 """
 
+import collections
+import contextlib
+import contextvars
+import functools
 import os
-from pynamodb.models import Model
-from pynamodb.attributes import UnicodeAttribute
-from pynamodb.exceptions import TableDoesNotExist, TransactWriteError, GetError
+import random
+import threading
+import time
+from tripit.cache import invalidate_token_for_access_key
 from tripit.logging import logger
+from tripit.metrics import increment
+
+DEFAULT_BILLING_MODE = "PROVISIONED"
+DEFAULT_CAPACITY_UNITS = 2
+DEFAULT_THROTTLE_RETRIES = 4
+DEFAULT_THROTTLE_BACKOFF_SECONDS = 0.05
+DEFAULT_THROTTLE_MAX_BACKOFF_SECONDS = 1.0
+THROTTLING_ERROR_CODES = (
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ThrottlingException",
+)
+TRANSIENT_ERROR_CODES = (
+    "InternalServerError",
+    "InternalFailure",
+    "ServiceUnavailable",
+)
+
+RetryPolicy = collections.namedtuple(
+    "RetryPolicy", ["retries", "backoff_seconds", "max_backoff_seconds"]
+)
+
+_MODEL_LOCK = threading.Lock()
+_PROVISIONED_TABLES = set()
+_PROVISIONING_LOCK = threading.Lock()
+_CURRENT_READS = contextvars.ContextVar("tripit_model_reads", default=None)
+_RETRY_POLICY = None
+_RETRY_POLICY_LOCK = threading.Lock()
 
 
-# pylint: disable=too-few-public-methods
-class TripitRequestToken(Model):
+def __getattr__(name):
     """
-    This table is used to map access keys to request tokens/token secrets.
+    Builds a model the first time that it's asked for. It's kept as a module
+    attribute from then on, so this isn't called for it again.
     """
+    builder = _MODEL_BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _MODEL_LOCK:
+        if name not in globals():
+            globals()[name] = builder()
+        return globals()[name]
 
-    class Meta:
-        """Table configuration."""
 
-        aws_access_key_id = os.getenv("APP_AWS_ACCESS_KEY_ID", "").strip("\n")
-        aws_secret_access_key = os.getenv("APP_AWS_SECRET_ACCESS_KEY", "").strip("\n")
-        table_name = "tripit_request_tokens_" + os.environ.get("ENVIRONMENT")
-        read_capacity_units = os.environ.get("AWS_DYNAMODB_RCU") or 2
-        write_capacity_units = os.environ.get("AWS_DYNAMODB_WCU") or 2
-        if os.environ.get("AWS_REGION"):
-            region = os.environ.get("AWS_REGION")
-        if os.environ.get("AWS_DYNAMODB_ENDPOINT_URL"):
-            host = os.environ.get("AWS_DYNAMODB_ENDPOINT_URL")
+def get_billing_mode():
+    """
+    Returns how our tables are billed: "PROVISIONED" or "PAY_PER_REQUEST".
+    """
+    return os.getenv("AWS_DYNAMODB_BILLING_MODE", DEFAULT_BILLING_MODE).upper()
+
+
+def get_capacity_units(table, unit):
+    """
+    Returns the capacity `unit`, "RCU" or "WCU", provisioned for `table`, like
+    "ACCESS_TOKENS". These are ignored by tables billed per request.
+    """
+    return int(
+        os.getenv(f"AWS_DYNAMODB_{table}_{unit}")
+        or os.getenv(f"AWS_DYNAMODB_{unit}")
+        or DEFAULT_CAPACITY_UNITS
+    )
+
 
-    token = UnicodeAttribute(hash_key=True)
-    access_key = UnicodeAttribute()
-    token_secret = UnicodeAttribute()
+# pylint: disable=import-outside-toplevel
+def _build_request_token_model():
+    from pynamodb.models import Model
+    from pynamodb.attributes import UnicodeAttribute
+    from pynamodb.exceptions import TableDoesNotExist, TransactWriteError, GetError, PutError
 
-    @staticmethod
-    def as_dict(token, **attributes):
+    # pylint: disable=too-few-public-methods
+    class TripitRequestToken(Model):
         """
-        Returns the token data mapped to this access key as a hash.
+        This table is used to map access keys to request tokens/token secrets.
         """
-        try:
-            data = TripitRequestToken.get(token, **attributes)
-            return {
-                "access_key": data.access_key,
-                "token": data.token,
-                "token_secret": data.token_secret,
-            }
-        except (TableDoesNotExist, GetError):
-            logger.warning("Access key not created yet for token %s", token)
-            return None
-
-    @staticmethod
-    def insert(token, access_key, token_secret):
+
+        class Meta:
+            """Table configuration."""
+
+            aws_access_key_id = os.getenv("APP_AWS_ACCESS_KEY_ID", "").strip("\n")
+            aws_secret_access_key = os.getenv("APP_AWS_SECRET_ACCESS_KEY", "").strip("\n")
+            table_name = "tripit_request_tokens_" + os.environ.get("ENVIRONMENT")
+            billing_mode = get_billing_mode()
+            read_capacity_units = get_capacity_units("REQUEST_TOKENS", "RCU")
+            write_capacity_units = get_capacity_units("REQUEST_TOKENS", "WCU")
+            # retry_throttled is our only layer of retries, for throttling and
+            # for 5xxs and dropped connections alike.
+            max_retry_attempts = 0
+            if os.environ.get("AWS_REGION"):
+                region = os.environ.get("AWS_REGION")
+            if os.environ.get("AWS_DYNAMODB_ENDPOINT_URL"):
+                host = os.environ.get("AWS_DYNAMODB_ENDPOINT_URL")
+
+        token = UnicodeAttribute(hash_key=True)
+        access_key = UnicodeAttribute()
+        token_secret = UnicodeAttribute()
+
+        @classmethod
+        def get(cls, hash_key, *args, **kwargs):  # pylint: disable=arguments-differ
+            """
+            Gets an item, reading it from DynamoDB at most once per unit of work.
+            """
+            return read_once(
+                cls, hash_key, functools.partial(retry_throttled, super().get), *args, **kwargs
+            )
+
+        @staticmethod
+        def as_dict(token, **attributes):
+            """
+            Returns the token data mapped to this access key as a hash.
+            """
+            try:
+                data = TripitRequestToken.get(token, **attributes)
+                return {
+                    "access_key": data.access_key,
+                    "token": data.token,
+                    "token_secret": data.token_secret,
+                }
+            except (TableDoesNotExist, GetError) as get_error:
+                if is_throttled(get_error):
+                    raise
+                logger.warning("Access key not created yet for token %s", token)
+                return None
+
+        @staticmethod
+        def insert(token, access_key, token_secret):
+            """
+            Inserts a new request token, unless it's been inserted already.
+            """
+            try:
+                save_item(
+                    TripitRequestToken(token, access_key=access_key, token_secret=token_secret),
+                    condition=TripitRequestToken.token.does_not_exist(),
+                )
+            except PutError as put_error:
+                if put_error.cause_response_code != "ConditionalCheckFailedException":
+                    raise
+                logger.info("Access key already has token: %s", access_key)
+                return None
+            except TransactWriteError as failed_write_error:
+                logger.error(
+                    "Failed to write new data for token %s: %s", token, failed_write_error
+                )
+
+    return TripitRequestToken
+
+
+def _build_access_token_model():
+    from pynamodb.models import Model
+    from pynamodb.attributes import UnicodeAttribute
+    from pynamodb.exceptions import TableDoesNotExist, TransactWriteError, GetError, DeleteError
+
+    # pylint: disable=too-few-public-methods
+    class TripitAccessToken(Model):
         """
-        Inserts a new access token.
+        This table is used to map access keys to access tokens.
         """
-        try:
-            if not TripitRequestToken.exists():
-                TripitRequestToken.create_table()
+
+        class Meta:
+            """Table configuration."""
+
+            aws_access_key_id = os.environ.get("APP_AWS_ACCESS_KEY_ID")
+            aws_secret_access_key = os.environ.get("APP_AWS_SECRET_ACCESS_KEY")
+            table_name = "tripit_access_tokens_" + os.environ.get("ENVIRONMENT")
+            billing_mode = get_billing_mode()
+            read_capacity_units = get_capacity_units("ACCESS_TOKENS", "RCU")
+            write_capacity_units = get_capacity_units("ACCESS_TOKENS", "WCU")
+            # retry_throttled is our only layer of retries, for throttling and
+            # for 5xxs and dropped connections alike.
+            max_retry_attempts = 0
+            if os.environ.get("AWS_REGION"):
+                region = os.environ.get("AWS_REGION")
+            if os.environ.get("AWS_DYNAMODB_ENDPOINT_URL"):
+                host = os.environ.get("AWS_DYNAMODB_ENDPOINT_URL")
+
+        access_key = UnicodeAttribute(hash_key=True)
+        token = UnicodeAttribute()
+        token_secret = UnicodeAttribute()
+
+        @classmethod
+        def get(cls, hash_key, *args, **kwargs):  # pylint: disable=arguments-differ
+            """
+            Gets an item, reading it from DynamoDB at most once per unit of work.
+            """
+            return read_once(
+                cls, hash_key, functools.partial(retry_throttled, super().get), *args, **kwargs
+            )
+
+        @staticmethod
+        def as_dict(access_key, **attributes):
+            """
+            Returns the token data mapped to this access key as a hash.
+            """
             try:
-                TripitRequestToken.get(token)
-                logger.info("Access key already has token: %s", access_key)
+                data = TripitAccessToken.get(access_key, **attributes)
+                return {
+                    "access_key": access_key,
+                    "token": data.token,
+                    "token_secret": data.token_secret,
+                }
+            except (TableDoesNotExist, GetError) as get_error:
+                if is_throttled(get_error):
+                    raise
+                logger.warning("Access token not created yet for key %s", access_key)
+                return None
+
+        @staticmethod
+        def insert(access_key, token, token_secret):
+            """
+            Inserts a new access token, replacing the one that this access key
+            had, if any. Whatever we had cached for this access key is dropped.
+            """
+            try:
+                save_item(TripitAccessToken(access_key, token=token, token_secret=token_secret))
+            except TransactWriteError as failed_write_error:
+                logger.error(
+                    "Failed to write new data for ak %s: %s", access_key, failed_write_error
+                )
+            finally:
+                invalidate_token_for_access_key(access_key)
+
+        @staticmethod
+        def delete_tokens_by_access_key(access_key):
+            """
+            Deletes a token associated with an access key, and its cached copy.
+            """
+            try:
+                retry_throttled(TripitAccessToken(access_key).delete)
                 return None
-            except TripitRequestToken.DoesNotExist:
-                new_mapping = TripitRequestToken(
-                    token, access_key=access_key, token_secret=token_secret
+            except TransactWriteError as failed_write_error:
+                logger.error(
+                    "Failed to write new data for ak %s: %s", access_key, failed_write_error
                 )
-                new_mapping.save()
-                new_mapping.refresh()
-        except TransactWriteError as failed_write_error:
-            logger.error("Failed to write new data for token %s: %s", token, failed_write_error)
+                return None
+            except DeleteError as delete_error:
+                if delete_error.cause_response_code != "ResourceNotFoundException":
+                    raise
+                logger.warning("Access token not created yet for key %s", access_key)
+                return None
+            finally:
+                _forget_reads(TripitAccessToken)
+                invalidate_token_for_access_key(access_key)
+
+    return TripitAccessToken
+
 
+_MODEL_BUILDERS = {
+    "TripitRequestToken": _build_request_token_model,
+    "TripitAccessToken": _build_access_token_model,
+}
 
-# pylint: disable=too-few-public-methods
-class TripitAccessToken(Model):
+
+def provision_tables():
     """
-    This table is used to map access keys to access tokens.
+    Creates every table that doesn't exist yet. This is safe to run as often as
+    you'd like, like before tests or once a stack has been deployed.
     """
+    for name in _MODEL_BUILDERS:
+        provision_table(__getattr__(name))
 
-    class Meta:
-        """Table configuration."""
 
-        aws_access_key_id = os.environ.get("APP_AWS_ACCESS_KEY_ID")
-        aws_secret_access_key = os.environ.get("APP_AWS_SECRET_ACCESS_KEY")
-        table_name = "tripit_access_tokens_" + os.environ.get("ENVIRONMENT")
-        read_capacity_units = os.environ.get("AWS_DYNAMODB_RCU") or 2
-        write_capacity_units = os.environ.get("AWS_DYNAMODB_WCU") or 2
-        if os.environ.get("AWS_REGION"):
-            region = os.environ.get("AWS_REGION")
-        if os.environ.get("AWS_DYNAMODB_ENDPOINT_URL"):
-            host = os.environ.get("AWS_DYNAMODB_ENDPOINT_URL")
+def provision_table(model):
+    """
+    Creates the table for `model` if it doesn't exist yet. Tables that we've
+    seen are remembered for as long as this container lives, so DynamoDB is
+    only asked about each of them once.
+    """
+    from pynamodb.exceptions import TableError
 
-    access_key = UnicodeAttribute(hash_key=True)
-    token = UnicodeAttribute()
-    token_secret = UnicodeAttribute()
+    table_name = model.Meta.table_name
+    with _PROVISIONING_LOCK:
+        if table_name in _PROVISIONED_TABLES:
+            return
+        if not model.exists():
+            logger.info("Creating table %s", table_name)
+            try:
+                model.create_table(wait=True)
+            except TableError as create_error:
+                # Someone else created it in the meantime.
+                if create_error.cause_response_code != "ResourceInUseException":
+                    raise
+        _PROVISIONED_TABLES.add(table_name)
 
-    @staticmethod
-    def as_dict(access_key, **attributes):
-        """
-        Returns the token data mapped to this access key as a hash.
-        """
-        try:
-            data = TripitAccessToken.get(access_key, **attributes)
-            return {
-                "access_key": access_key,
-                "token": data.token,
-                "token_secret": data.token_secret,
-            }
-        except (TableDoesNotExist, GetError):
-            logger.warning("Access token not created yet for key %s", access_key)
-            return None
-
-    @staticmethod
-    def insert(access_key, token, token_secret):
-        """
-        Inserts a new access token.
-        """
+
+def deprovision_table(model):
+    """
+    Deletes the table for `model` and forgets that we'd provisioned it. This is
+    for tests that want to start over from an empty table.
+    """
+    with _PROVISIONING_LOCK:
+        _PROVISIONED_TABLES.discard(model.Meta.table_name)
+        model.delete_table()
+
+
+def save_item(item, condition=None):
+    """
+    Writes `item` with a single PutItem, only if `condition` holds.
+
+    Tables aren't created here; if one is missing, the PutError is raised.
+    They're provisioned by Terraform, or by `python -m tripit.auth.models`.
+    """
+    _forget_reads(type(item))
+    return retry_throttled(item.save, condition)
+
+
+@contextlib.contextmanager
+def unit_of_work():
+    """
+    Reads each item from DynamoDB at most once within this block.
+    """
+    reset_token = _CURRENT_READS.set({})
+    try:
+        yield
+    finally:
+        _CURRENT_READS.reset(reset_token)
+
+
+def caches_reads(handler):
+    """
+    Runs each call to a Lambda handler as its own unit of work; see `unit_of_work`.
+    """
+
+    @functools.wraps(handler)
+    def _handler(event, context=None):
+        with unit_of_work():
+            return handler(event, context)
+
+    return _handler
+
+
+def read_once(model, hash_key, get, *args, **kwargs):
+    """
+    Returns what `get` returns for `hash_key`, reusing what it returned, or
+    whether the item didn't exist, earlier in this unit of work. Reads with
+    options, like consistent reads, always go to DynamoDB.
+    """
+    reads = _CURRENT_READS.get()
+    if reads is None or args or kwargs:
+        return get(hash_key, *args, **kwargs)
+    read_key = (model.Meta.table_name, hash_key)
+    if read_key not in reads:
         try:
-            if not TripitAccessToken.exists():
-                TripitAccessToken.create_table()
-            new_mapping = TripitAccessToken(access_key, token=token, token_secret=token_secret)
-            new_mapping.save()
-            new_mapping.refresh()
-        except TransactWriteError as failed_write_error:
-            logger.error("Failed to write new data for ak %s: %s", access_key, failed_write_error)
-
-    @staticmethod
-    def delete_tokens_by_access_key(access_key):
-        """
-        Deletes a token associated with an access key.
-        """
+            reads[read_key] = get(hash_key)
+        except model.DoesNotExist:
+            reads[read_key] = None
+    item = reads[read_key]
+    if item is None:
+        raise model.DoesNotExist()
+    return item
+
+
+def _forget_reads(model):
+    reads = _CURRENT_READS.get()
+    if reads:
+        for read_key in [read_key for read_key in reads if read_key[0] == model.Meta.table_name]:
+            del reads[read_key]
+
+
+def retry_throttled(operation, *args, **kwargs):
+    """
+    Calls `operation`, retrying it while DynamoDB throttles it or fails in a
+    way that's likely to go away, like a 5xx or a dropped connection. Retries
+    are spread out with exponential backoff and full jitter, so that calls that
+    were throttled together don't all come back at once; see `get_retry_policy`.
+
+    The error is raised once we're out of retries; check it with `is_throttled`.
+    """
+    from pynamodb.exceptions import PynamoDBException
+
+    policy = get_retry_policy()
+    attempt = 0
+    while True:
         try:
-            existing_request_token_mapping = TripitAccessToken.get(access_key)
-            existing_request_token_mapping.delete()
-            existing_request_token_mapping.save()
-            existing_request_token_mapping.refresh()
-            return None
-        except TransactWriteError as failed_write_error:
-            logger.error("Failed to write new data for ak %s: %s", access_key, failed_write_error)
-            return None
-        except TableDoesNotExist:
-            logger.warning("Access token not created yet for key %s", access_key)
-            return None
+            return operation(*args, **kwargs)
+        except PynamoDBException as dynamodb_error:
+            if not is_transient(dynamodb_error) or attempt >= policy.retries:
+                raise
+            if is_throttled(dynamodb_error):
+                increment("DynamoDBThrottles")
+            else:
+                increment("DynamoDBTransientErrors")
+            delay = random.uniform(
+                0, min(policy.max_backoff_seconds, policy.backoff_seconds * 2 ** attempt)
+            )
+            logger.warning(
+                "DynamoDB failed us (%s); retrying in %.3f seconds", dynamodb_error, delay
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+def get_retry_policy():
+    """
+    Returns how DynamoDB calls are retried, reading it from the environment on
+    first use: up to TRIPIT_DYNAMODB_THROTTLE_RETRIES retries, waiting up to
+    TRIPIT_DYNAMODB_THROTTLE_BACKOFF_SECONDS, doubled after every one, but
+    never more than TRIPIT_DYNAMODB_THROTTLE_MAX_BACKOFF_SECONDS.
+    """
+    global _RETRY_POLICY  # pylint: disable=global-statement
+    with _RETRY_POLICY_LOCK:
+        if _RETRY_POLICY is None:
+            _RETRY_POLICY = RetryPolicy(
+                retries=_get_from_env(
+                    "TRIPIT_DYNAMODB_THROTTLE_RETRIES", DEFAULT_THROTTLE_RETRIES, int
+                ),
+                backoff_seconds=_get_from_env(
+                    "TRIPIT_DYNAMODB_THROTTLE_BACKOFF_SECONDS",
+                    DEFAULT_THROTTLE_BACKOFF_SECONDS,
+                    float,
+                ),
+                max_backoff_seconds=_get_from_env(
+                    "TRIPIT_DYNAMODB_THROTTLE_MAX_BACKOFF_SECONDS",
+                    DEFAULT_THROTTLE_MAX_BACKOFF_SECONDS,
+                    float,
+                ),
+            )
+        return _RETRY_POLICY
+
+
+def reset_retry_policy():
+    """
+    Forgets the retry policy, so that the next call to `get_retry_policy`
+    reads it from the environment again.
+    """
+    global _RETRY_POLICY  # pylint: disable=global-statement
+    with _RETRY_POLICY_LOCK:
+        _RETRY_POLICY = None
+
+
+def _get_from_env(name, default, cast):
+    if os.getenv(name):
+        return cast(os.getenv(name))
+    return default
+
+
+def is_throttled(dynamodb_error):
+    """
+    Whether an error from pynamodb happened because DynamoDB throttled us.
+    """
+    return getattr(dynamodb_error, "cause_response_code", None) in THROTTLING_ERROR_CODES
+
+
+def is_transient(dynamodb_error):
+    """
+    Whether an error from pynamodb is worth retrying: DynamoDB throttled us,
+    failed on its end or we couldn't reach it.
+    """
+    from botocore.exceptions import ConnectionError as BotoConnectionError, HTTPClientError
+
+    if is_throttled(dynamodb_error):
+        return True
+    if getattr(dynamodb_error, "cause_response_code", None) in TRANSIENT_ERROR_CODES:
+        return True
+    cause = getattr(dynamodb_error, "cause", None)
+    return isinstance(cause, (BotoConnectionError, HTTPClientError))
+
+
+if __name__ == "__main__":
+    provision_tables()
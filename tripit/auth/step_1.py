@@ -4,10 +4,10 @@ Functions for handling OAuth auth flow.
 Core functions can be found in tripit/core/v1.
 """
 import urllib
-from pynamodb.exceptions import TableDoesNotExist, GetError
 from tripit.core.v1.oauth import request_request_token
-from tripit.auth.models import TripitRequestToken, TripitAccessToken
+from tripit.auth.store import get_token_store
 from tripit.logging import logger
+from tripit.sync import forget_trips_for_access_key
 
 
 def get_authn_url(api_gateway_endpoint, host, access_key, reauthorize=False):
@@ -49,16 +49,10 @@ def access_key_has_access_token(access_key):
     """
     Checks if an access key has an access token associated with it.
     """
-    try:
-        TripitAccessToken.get(access_key)
-        logger.info("Access key has token: %s", access_key)
-        return True
-    except GetError:
-        return False
-    except TableDoesNotExist:
-        return False
-    except TripitAccessToken.DoesNotExist:
+    if get_token_store().get_access_token(access_key) is None:
         return False
+    logger.info("Access key has token: %s", access_key)
+    return True
 
 
 def associate_request_token_with_access_key(token, access_key, token_secret):
@@ -72,7 +66,7 @@ def associate_request_token_with_access_key(token, access_key, token_secret):
     resolve it from the token that Tripit gives us.)
     """
     logger.debug("Inserting a new token for our access key %s", access_key)
-    TripitRequestToken.insert(token, access_key=access_key, token_secret=token_secret)
+    get_token_store().put_request_token(token, access_key=access_key, token_secret=token_secret)
 
 
 def delete_existing_access_tokens(access_key):
@@ -80,7 +74,5 @@ def delete_existing_access_tokens(access_key):
     Delete access tokens associated with an access key, if any found.
     """
     logger.debug("Deleting existing access tokens for key %s", access_key)
-    try:
-        TripitAccessToken.delete_tokens_by_access_key(access_key)
-    except (GetError, TripitAccessToken.DoesNotExist):
-        logger.warning("No request tokens found for key: %s", access_key)
+    forget_trips_for_access_key(access_key)
+    get_token_store().delete_access_token(access_key)
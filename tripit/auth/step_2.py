@@ -3,8 +3,7 @@ This is code that handles step 2 of the authentication process.
 
 See the test for this file in tests/unit for more info.
 """
-from pynamodb.exceptions import TransactWriteError
-from tripit.auth.models import TripitRequestToken, TripitAccessToken
+from tripit.auth.store import TokenStoreError, get_token_store
 from tripit.core.v1.oauth import request_access_token
 from tripit.logging import logger
 
@@ -27,13 +26,13 @@ def handle_callback(request_token):
         logger.error("Failed to obtain an access token from request token %s", request_token)
         return False
     try:
-        TripitAccessToken.insert(
+        get_token_store().put_access_token(
             access_key=access_key,
             token=access_token_data["token"],
             token_secret=access_token_data["token_secret"],
         )
         return True
-    except TransactWriteError:
+    except TokenStoreError:
         logger.error("Failed to write new token; see logs above")
         return False
 
@@ -42,17 +41,17 @@ def get_token_secret_from_request_token(token):
     """
     Retrieves request token secrets from request_tokens
     """
-    try:
-        return TripitRequestToken.as_dict(token)["token_secret"]
-    except TripitRequestToken.DoesNotExist:
+    request_token = get_token_store().get_request_token(token)
+    if request_token is None:
         return None
+    return request_token["token_secret"]
 
 
 def get_access_key_from_request_token(token):
     """
     Retrieves access key from request_tokens
     """
-    try:
-        return TripitRequestToken.as_dict(token)["access_key"]
-    except TripitRequestToken.DoesNotExist:
+    request_token = get_token_store().get_request_token(token)
+    if request_token is None:
         return None
+    return request_token["access_key"]
@@ -0,0 +1,301 @@
+"""
+Where request and access tokens are kept.
+
+Set TRIPIT_TOKEN_STORE to pick a store:
+
+- "dynamodb" (the default) keeps tokens in the tables in `tripit.auth.models`.
+- "sqlite" keeps them in a SQLite database at TRIPIT_TOKEN_STORE_PATH, which
+  suits self-hosted and container deployments with a disk of their own.
+- "memory" keeps them in this process until it exits, for tests and benchmarks.
+
+Tokens are passed around as dicts with `access_key`, `token` and `token_secret`.
+"""
+
+import abc
+import functools
+import os
+import sqlite3
+import threading
+from tripit.cache import invalidate_token_for_access_key
+from tripit.logging import logger
+
+DEFAULT_TOKEN_STORE = "dynamodb"
+DEFAULT_TOKEN_STORE_PATH = "tripit_tokens.db"
+
+_TOKEN_STORE = None
+_TOKEN_STORE_LOCK = threading.Lock()
+
+
+class TokenStoreError(Exception):
+    """
+    Raised when a store can't save the tokens that it was given.
+    """
+
+
+class TokenStoreThrottled(TokenStoreError):
+    """
+    Raised when a store is too busy to answer us, even after retrying. Asking
+    again a little later should work.
+    """
+
+
+class TokenStore(abc.ABC):
+    """
+    Maps request tokens to the access keys that asked for them, and access
+    keys to their access tokens.
+    """
+
+    @abc.abstractmethod
+    def get_request_token(self, token):
+        """ Returns the request token `token`, or None if we don't have it. """
+
+    @abc.abstractmethod
+    def put_request_token(self, token, access_key, token_secret):
+        """ Saves a request token for an access key, unless it's been saved already. """
+
+    @abc.abstractmethod
+    def get_access_token(self, access_key):
+        """ Returns the access token for an access key, or None if it doesn't have one. """
+
+    @abc.abstractmethod
+    def put_access_token(self, access_key, token, token_secret):
+        """
+        Saves an access token for an access key, replacing its old one, if any.
+        Raises `TokenStoreError` if it couldn't be saved.
+        """
+
+    @abc.abstractmethod
+    def delete_access_token(self, access_key):
+        """ Deletes the access token for an access key, if it has one. """
+
+
+def _surfaces_throttling(method):
+    """
+    Raises `TokenStoreThrottled` in place of errors from DynamoDB throttling us.
+    """
+
+    @functools.wraps(method)
+    def _method(*args, **kwargs):
+        # pylint: disable=import-outside-toplevel
+        from pynamodb.exceptions import PynamoDBException
+        from tripit.auth.models import is_throttled
+
+        try:
+            return method(*args, **kwargs)
+        except PynamoDBException as dynamodb_error:
+            if is_throttled(dynamodb_error):
+                raise TokenStoreThrottled(str(dynamodb_error)) from dynamodb_error
+            raise
+
+    return _method
+
+
+class DynamoDBTokenStore(TokenStore):
+    """
+    Keeps tokens in DynamoDB; see `tripit.auth.models`. Requests that DynamoDB
+    still throttles after they've been retried raise `TokenStoreThrottled`.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    @_surfaces_throttling
+    def get_request_token(self, token):
+        from tripit.auth import models
+
+        try:
+            return models.TripitRequestToken.as_dict(token)
+        except models.TripitRequestToken.DoesNotExist:
+            return None
+
+    @_surfaces_throttling
+    def put_request_token(self, token, access_key, token_secret):
+        from tripit.auth import models
+
+        models.TripitRequestToken.insert(token, access_key=access_key, token_secret=token_secret)
+
+    @_surfaces_throttling
+    def get_access_token(self, access_key):
+        from tripit.auth import models
+
+        try:
+            return models.TripitAccessToken.as_dict(access_key)
+        except models.TripitAccessToken.DoesNotExist:
+            return None
+
+    @_surfaces_throttling
+    def put_access_token(self, access_key, token, token_secret):
+        from pynamodb.exceptions import PutError
+        from tripit.auth import models
+
+        try:
+            models.TripitAccessToken.insert(
+                access_key=access_key, token=token, token_secret=token_secret
+            )
+        except PutError as failed_write_error:
+            if models.is_throttled(failed_write_error):
+                raise
+            raise TokenStoreError(str(failed_write_error)) from failed_write_error
+
+    @_surfaces_throttling
+    def delete_access_token(self, access_key):
+        from pynamodb.exceptions import GetError
+        from tripit.auth import models
+
+        try:
+            models.TripitAccessToken.delete_tokens_by_access_key(access_key)
+        except (GetError, models.TripitAccessToken.DoesNotExist):
+            logger.warning("No access tokens found for key: %s", access_key)
+
+
+class SQLiteTokenStore(TokenStore):
+    """
+    Keeps tokens in a SQLite database at `path`, creating its tables if needed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS request_tokens "
+                "(token TEXT PRIMARY KEY, access_key TEXT NOT NULL, token_secret TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS access_tokens "
+                "(access_key TEXT PRIMARY KEY, token TEXT NOT NULL, token_secret TEXT NOT NULL)"
+            )
+
+    def get_request_token(self, token):
+        return self._fetch_one(
+            "SELECT access_key, token, token_secret FROM request_tokens WHERE token = ?", token
+        )
+
+    def put_request_token(self, token, access_key, token_secret):
+        with self._lock:
+            inserted = self._connection.execute(
+                "INSERT OR IGNORE INTO request_tokens VALUES (?, ?, ?)",
+                (token, access_key, token_secret),
+            ).rowcount
+        if not inserted:
+            logger.info("Access key already has token: %s", access_key)
+
+    def get_access_token(self, access_key):
+        return self._fetch_one(
+            "SELECT access_key, token, token_secret FROM access_tokens WHERE access_key = ?",
+            access_key,
+        )
+
+    def put_access_token(self, access_key, token, token_secret):
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO access_tokens VALUES (?, ?, ?)",
+                    (access_key, token, token_secret),
+                )
+        except sqlite3.Error as failed_write_error:
+            raise TokenStoreError(str(failed_write_error)) from failed_write_error
+        finally:
+            invalidate_token_for_access_key(access_key)
+
+    def delete_access_token(self, access_key):
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "DELETE FROM access_tokens WHERE access_key = ?", (access_key,)
+                )
+        finally:
+            invalidate_token_for_access_key(access_key)
+
+    def close(self):
+        """ Closes our connection to the database. """
+        with self._lock:
+            self._connection.close()
+
+    def _fetch_one(self, query, key):
+        with self._lock:
+            row = self._connection.execute(query, (key,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("access_key", "token", "token_secret"), row))
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    Keeps tokens in dicts for as long as this process lives.
+    """
+
+    def __init__(self):
+        self._request_tokens = {}
+        self._access_tokens = {}
+        self._lock = threading.Lock()
+
+    def get_request_token(self, token):
+        with self._lock:
+            return _copy(self._request_tokens.get(token))
+
+    def put_request_token(self, token, access_key, token_secret):
+        with self._lock:
+            if token in self._request_tokens:
+                logger.info("Access key already has token: %s", access_key)
+                return
+            self._request_tokens[token] = _token_data(access_key, token, token_secret)
+
+    def get_access_token(self, access_key):
+        with self._lock:
+            return _copy(self._access_tokens.get(access_key))
+
+    def put_access_token(self, access_key, token, token_secret):
+        with self._lock:
+            self._access_tokens[access_key] = _token_data(access_key, token, token_secret)
+        invalidate_token_for_access_key(access_key)
+
+    def delete_access_token(self, access_key):
+        with self._lock:
+            self._access_tokens.pop(access_key, None)
+        invalidate_token_for_access_key(access_key)
+
+
+def get_token_store():
+    """
+    Returns the store chosen with TRIPIT_TOKEN_STORE, creating it on first use.
+    """
+    global _TOKEN_STORE  # pylint: disable=global-statement
+    with _TOKEN_STORE_LOCK:
+        if _TOKEN_STORE is None:
+            _TOKEN_STORE = create_token_store(
+                os.getenv("TRIPIT_TOKEN_STORE", DEFAULT_TOKEN_STORE).lower()
+            )
+        return _TOKEN_STORE
+
+
+def reset_token_store():
+    """
+    Throws away the token store. The next call to `get_token_store` will create
+    a new one from the environment, which, for the in-memory store, starts empty.
+    """
+    global _TOKEN_STORE  # pylint: disable=global-statement
+    with _TOKEN_STORE_LOCK:
+        if isinstance(_TOKEN_STORE, SQLiteTokenStore):
+            _TOKEN_STORE.close()
+        _TOKEN_STORE = None
+
+
+def create_token_store(kind):
+    """
+    Creates a store of the given kind: "dynamodb", "sqlite" or "memory".
+    """
+    if kind == "dynamodb":
+        return DynamoDBTokenStore()
+    if kind == "sqlite":
+        return SQLiteTokenStore(os.getenv("TRIPIT_TOKEN_STORE_PATH", DEFAULT_TOKEN_STORE_PATH))
+    if kind == "memory":
+        return MemoryTokenStore()
+    raise ValueError(f"Unknown token store: {kind}")
+
+
+def _token_data(access_key, token, token_secret):
+    return {"access_key": access_key, "token": token, "token_secret": token_secret}
+
+
+def _copy(token_data):
+    return dict(token_data) if token_data is not None else None
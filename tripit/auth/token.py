@@ -1,16 +1,36 @@
 """
 Handles retrieving tokens from access keys.
 """
-from tripit.auth.models import TripitAccessToken
-from tripit.logging import logger
+from tripit.auth.store import TokenStoreThrottled, get_token_store
+from tripit.cache import get_token_cache
+from tripit.logging import Lazy, logger
+from tripit.metrics import increment, measure_latency
 
 
 def get_token_data_for_access_key(access_key):
     """
-    Fetches a token for an access key, if it has one.
+    Fetches a token for an access key, if it has one. Tokens are read from the
+    token cache when they're there; see `tripit.cache.get_token_cache`.
+
+    Raises `TokenStoreThrottled` if the store is too busy to tell us, since
+    that doesn't mean that the access key has no token.
     """
+    token_cache = get_token_cache()
+    token_data = token_cache.get(access_key)
+    if token_data is not None:
+        increment("TokenCacheHits")
+        logger.debug("Token cache hit for %s: %s", access_key, Lazy(token_cache.stats))
+        return dict(token_data)
+    increment("TokenCacheMisses")
+    logger.debug("Token cache miss for %s: %s", access_key, Lazy(token_cache.stats))
     try:
-        return TripitAccessToken.as_dict(access_key)
+        with measure_latency("TokenStoreLatency"):
+            token_data = get_token_store().get_access_token(access_key)
+    except TokenStoreThrottled:
+        raise
     except Exception as access_token_error:
         logger.warning("Failed to get an access token: %s", access_token_error)
         return None
+    if token_data is not None:
+        token_cache.put(access_key, dict(token_data))
+    return token_data
@@ -0,0 +1,321 @@
+"""
+In-process caches that live for as long as a warm container does.
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+from tripit.logging import logger
+
+DEFAULT_TRIP_CACHE_TTL_SECONDS = 0
+DEFAULT_TRIP_CACHE_MAX_ENTRIES = 128
+DEFAULT_TRIP_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_TOKEN_CACHE_TTL_SECONDS = 0
+DEFAULT_TOKEN_CACHE_MAX_ENTRIES = 1024
+DEFAULT_TOKEN_CACHE_MAX_BYTES = 1024 * 1024
+DEFAULT_SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_SNAPSHOT_MAX_ENTRIES = 32
+DEFAULT_SNAPSHOT_MAX_BYTES = 32 * 1024 * 1024
+# Roughly how large a trip, and each of its flight segments, are once they're
+# serialized. Trips are sized with these so that caching them doesn't mean
+# serializing them all over again.
+ESTIMATED_TRIP_BYTES = 256
+ESTIMATED_FLIGHT_SEGMENT_BYTES = 160
+
+_TRIP_CACHE = None
+_TRIP_CACHE_LOCK = threading.Lock()
+_CURRENT_TRIP_CACHE = None
+_CURRENT_TRIP_CACHE_LOCK = threading.Lock()
+_TOKEN_CACHE = None
+_TOKEN_CACHE_LOCK = threading.Lock()
+_SNAPSHOT_CACHE = None
+_SNAPSHOT_CACHE_LOCK = threading.Lock()
+
+
+class TTLCache:
+    """
+    A thread-safe least-recently-used cache whose entries expire after `ttl_seconds`.
+
+    The cache is bounded by both its number of entries and the approximate size
+    of its values; see `estimate_size_bytes`. A TTL of zero disables it.
+    """
+
+    def __init__(self, ttl_seconds, max_entries, max_bytes):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """ Whether this cache holds onto anything at all. """
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key):
+        """
+        Returns the value cached for `key`, or None if it's missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, _, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Caches `value` for `key`, evicting the least recently used entries if
+        this cache has grown too large. Values larger than the cache are skipped.
+        """
+        if not self.enabled:
+            return
+        size_bytes = estimate_size_bytes(value)
+        if size_bytes > self.max_bytes:
+            logger.debug("Not caching %s; it is %d bytes", key, size_bytes)
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size_bytes, time.monotonic() + self.ttl_seconds)
+            self.size_bytes += size_bytes
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, matches):
+        """
+        Removes every entry whose key `matches` returns True for.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if matches(key)]:
+                self._remove(key)
+
+    def clear(self):
+        """ Removes everything from this cache. """
+        self.invalidate(lambda _key: True)
+
+    def stats(self):
+        """ Returns counters for this cache. """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+            }
+
+    def _remove(self, key):
+        _, size_bytes, _ = self._entries.pop(key)
+        self.size_bytes -= size_bytes
+
+
+def get_trip_cache():
+    """
+    Returns the cache of resolved trips, keyed by access key, creating it on
+    first use.
+
+    It is configured with TRIPIT_TRIP_CACHE_TTL_SECONDS (off by default),
+    TRIPIT_TRIP_CACHE_MAX_ENTRIES and TRIPIT_TRIP_CACHE_MAX_BYTES.
+    """
+    global _TRIP_CACHE  # pylint: disable=global-statement
+    with _TRIP_CACHE_LOCK:
+        if _TRIP_CACHE is None:
+            _TRIP_CACHE = TTLCache(
+                ttl_seconds=_get_int_from_env(
+                    "TRIPIT_TRIP_CACHE_TTL_SECONDS", DEFAULT_TRIP_CACHE_TTL_SECONDS
+                ),
+                max_entries=_get_int_from_env(
+                    "TRIPIT_TRIP_CACHE_MAX_ENTRIES", DEFAULT_TRIP_CACHE_MAX_ENTRIES
+                ),
+                max_bytes=_get_int_from_env(
+                    "TRIPIT_TRIP_CACHE_MAX_BYTES", DEFAULT_TRIP_CACHE_MAX_BYTES
+                ),
+            )
+        return _TRIP_CACHE
+
+
+def reset_trip_cache():
+    """
+    Throws away the cache of resolved trips. The next call to `get_trip_cache`
+    will create a new one from the environment.
+    """
+    global _TRIP_CACHE  # pylint: disable=global-statement
+    with _TRIP_CACHE_LOCK:
+        _TRIP_CACHE = None
+
+
+def get_current_trip_cache():
+    """
+    Returns the cache of current trips, keyed by access key, creating it on
+    first use.
+
+    /current_trip only fetches the trips that might be happening right now, so
+    what it finds is kept here rather than in the trip cache, which holds every
+    trip. It is configured like the trip cache is.
+    """
+    global _CURRENT_TRIP_CACHE  # pylint: disable=global-statement
+    with _CURRENT_TRIP_CACHE_LOCK:
+        if _CURRENT_TRIP_CACHE is None:
+            _CURRENT_TRIP_CACHE = TTLCache(
+                ttl_seconds=_get_int_from_env(
+                    "TRIPIT_TRIP_CACHE_TTL_SECONDS", DEFAULT_TRIP_CACHE_TTL_SECONDS
+                ),
+                max_entries=_get_int_from_env(
+                    "TRIPIT_TRIP_CACHE_MAX_ENTRIES", DEFAULT_TRIP_CACHE_MAX_ENTRIES
+                ),
+                max_bytes=_get_int_from_env(
+                    "TRIPIT_TRIP_CACHE_MAX_BYTES", DEFAULT_TRIP_CACHE_MAX_BYTES
+                ),
+            )
+        return _CURRENT_TRIP_CACHE
+
+
+def reset_current_trip_cache():
+    """
+    Throws away the cache of current trips. The next call to
+    `get_current_trip_cache` will create a new one from the environment.
+    """
+    global _CURRENT_TRIP_CACHE  # pylint: disable=global-statement
+    with _CURRENT_TRIP_CACHE_LOCK:
+        _CURRENT_TRIP_CACHE = None
+
+
+def invalidate_trips_for_access_key(access_key):
+    """
+    Removes the cached trips, and current trip, for an access key.
+    """
+    get_trip_cache().invalidate(lambda key: key == access_key)
+    get_current_trip_cache().invalidate(lambda key: key == access_key)
+
+
+def get_token_cache():
+    """
+    Returns the cache of access tokens and their secrets, keyed by access key,
+    creating it on first use.
+
+    It saves a trip to DynamoDB for every call made with an access key that
+    we've seen recently. Only tokens that were found are cached, so access keys
+    that were authorized in another container aren't turned away. It is
+    configured with TRIPIT_TOKEN_CACHE_TTL_SECONDS (off by default),
+    TRIPIT_TOKEN_CACHE_MAX_ENTRIES and TRIPIT_TOKEN_CACHE_MAX_BYTES.
+    """
+    global _TOKEN_CACHE  # pylint: disable=global-statement
+    with _TOKEN_CACHE_LOCK:
+        if _TOKEN_CACHE is None:
+            _TOKEN_CACHE = TTLCache(
+                ttl_seconds=_get_int_from_env(
+                    "TRIPIT_TOKEN_CACHE_TTL_SECONDS", DEFAULT_TOKEN_CACHE_TTL_SECONDS
+                ),
+                max_entries=_get_int_from_env(
+                    "TRIPIT_TOKEN_CACHE_MAX_ENTRIES", DEFAULT_TOKEN_CACHE_MAX_ENTRIES
+                ),
+                max_bytes=_get_int_from_env(
+                    "TRIPIT_TOKEN_CACHE_MAX_BYTES", DEFAULT_TOKEN_CACHE_MAX_BYTES
+                ),
+            )
+        return _TOKEN_CACHE
+
+
+def reset_token_cache():
+    """
+    Throws away the cache of access tokens. The next call to `get_token_cache`
+    will create a new one from the environment.
+    """
+    global _TOKEN_CACHE  # pylint: disable=global-statement
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE = None
+
+
+def invalidate_token_for_access_key(access_key):
+    """
+    Removes the cached access token for an access key.
+    """
+    get_token_cache().invalidate(lambda key: key == access_key)
+
+
+def get_snapshot_cache():
+    """
+    Returns the cache of trip snapshots used for incremental syncing, keyed by
+    access key, creating it on first use.
+
+    Snapshots are meant to live for as long as the container does, but they
+    hold every resolved trip for an account, so the least recently synced ones
+    are dropped once there are too many of them or they take up too much room.
+    It is configured with TRIPIT_SNAPSHOT_TTL_SECONDS (a day by default),
+    TRIPIT_SNAPSHOT_MAX_ENTRIES and TRIPIT_SNAPSHOT_MAX_BYTES.
+    """
+    global _SNAPSHOT_CACHE  # pylint: disable=global-statement
+    with _SNAPSHOT_CACHE_LOCK:
+        if _SNAPSHOT_CACHE is None:
+            _SNAPSHOT_CACHE = TTLCache(
+                ttl_seconds=_get_int_from_env(
+                    "TRIPIT_SNAPSHOT_TTL_SECONDS", DEFAULT_SNAPSHOT_TTL_SECONDS
+                ),
+                max_entries=_get_int_from_env(
+                    "TRIPIT_SNAPSHOT_MAX_ENTRIES", DEFAULT_SNAPSHOT_MAX_ENTRIES
+                ),
+                max_bytes=_get_int_from_env(
+                    "TRIPIT_SNAPSHOT_MAX_BYTES", DEFAULT_SNAPSHOT_MAX_BYTES
+                ),
+            )
+        return _SNAPSHOT_CACHE
+
+
+def reset_snapshot_cache():
+    """
+    Throws away every trip snapshot. The next call to `get_snapshot_cache`
+    will create a new cache from the environment.
+    """
+    global _SNAPSHOT_CACHE  # pylint: disable=global-statement
+    with _SNAPSHOT_CACHE_LOCK:
+        _SNAPSHOT_CACHE = None
+
+
+def estimate_size_bytes(value):
+    """
+    Estimates how large `value` is. Lists of resolved trips, and objects with an
+    `estimated_size_bytes` method, are estimated from how many trips and flight
+    segments they have. Anything else is measured as its length when serialized
+    to JSON, with objects that have a `to_dict` method measured as that dict.
+    """
+    if hasattr(value, "estimated_size_bytes"):
+        return value.estimated_size_bytes()
+    if isinstance(value, (list, tuple)) and all(hasattr(item, "flights") for item in value):
+        return estimate_trips_size_bytes(value)
+    return len(json.dumps(value, default=_to_dict))
+
+
+def estimate_trips_size_bytes(trips):
+    """
+    Estimates how large resolved trips are from how many trips and flight
+    segments there are.
+    """
+    return sum(
+        ESTIMATED_TRIP_BYTES + len(trip.flights) * ESTIMATED_FLIGHT_SEGMENT_BYTES
+        for trip in trips
+    )
+
+
+def _get_int_from_env(name, default):
+    if os.getenv(name):
+        return int(os.getenv(name))
+    return default
+
+
+def _to_dict(value):
+    return value.to_dict()
@@ -4,6 +4,7 @@ the AWS API gateway a little easier.
 """
 import json
 from tripit.logging import logger
+from tripit.timing import current_timer
 
 
 def get_host(event):
@@ -126,10 +127,28 @@ def return_404(message=None):
     return make_api_gateway_response(code=404, payload=payload)
 
 
-def make_api_gateway_response(code, payload):
+def return_503(message=None):
+    """
+    Returns 503, asking clients to try again in a second.
+    """
+    payload = {"status": "error", "message": message}
+    return make_api_gateway_response(code=503, payload=payload, headers={"Retry-After": "1"})
+
+
+def make_api_gateway_response(code, payload, headers=None):
     """
     Crafts a HTTP response suitable for API gateway.
+
+    Responses made while a handler is being timed say where its time went in a
+    `Server-Timing` header; see `tripit.timing`.
     """
     if not isinstance(payload, dict):
         raise TypeError("Payload must be a hash")
-    return {"statusCode": code, "body": json.dumps(payload)}
+    response = {"statusCode": code, "body": json.dumps(payload)}
+    headers = dict(headers or {})
+    timer = current_timer()
+    if timer is not None:
+        headers["Server-Timing"] = timer.server_timing()
+    if headers:
+        response["headers"] = headers
+    return response
@@ -4,27 +4,53 @@ All of the API things we do with TripIt live here.
 
 import os
 import re
-import requests
+from tripit.core.v1 import session
 from tripit.logging import logger
 from tripit.core.v1.oauth import generate_authenticated_headers_for_request
+from tripit.metrics import increment, measure_latency
+from tripit.timing import timed
 
 
-def get_from_tripit_v1(endpoint, token, token_secret, params=None):
-    """GET against authenticated TripIt endpoints."""
+def get_from_tripit_v1(endpoint, token, token_secret, params=None, stream=False):
+    """
+    GET against authenticated TripIt endpoints.
+
+    With `stream`, the body is left unread so that it can be parsed as it
+    arrives; see `tripit.core.v1.json_stream`.
+    """
+    uri, headers = _prepare_request(endpoint, token, token_secret, params)
+    logger.debug("Sending GET to TripIt at: %s", uri)
+    with timed("tripit"), measure_latency("TripItLatency"):
+        response = session.get(uri, headers=headers, stream=stream)
+    _count_response(response)
+    return response
+
+
+def _prepare_request(endpoint, token, token_secret, params):
+    """
+    Returns the URI for a TripIt endpoint and the headers that authenticate it.
+    """
     params_string = _join_params_by_slash(params)
     endpoint = _strip_leading_slash_from_endpoint(endpoint)
     clean_endpoint = f"{endpoint}/{params_string}format/json"
-    uri = f"https://api.tripit.com/v1/{clean_endpoint}"
-    headers = generate_authenticated_headers_for_request(
-        "GET",
-        uri,
-        os.getenv("TRIPIT_APP_CLIENT_ID"),
-        os.getenv("TRIPIT_APP_CLIENT_SECRET"),
-        token,
-        token_secret,
-    )
-    logger.debug("Sending GET to TripIt at: %s", uri)
-    return requests.get(uri, headers={"Authorization": headers})
+    uri = f"{session.get_api_base_url()}/v1/{clean_endpoint}"
+    with timed("sign"):
+        headers = generate_authenticated_headers_for_request(
+            "GET",
+            uri,
+            os.getenv("TRIPIT_APP_CLIENT_ID"),
+            os.getenv("TRIPIT_APP_CLIENT_SECRET"),
+            token,
+            token_secret,
+        )
+    return uri, {"Authorization": headers}
+
+
+def _count_response(response):
+    """
+    Counts responses from TripIt by their class of status code, like `TripItStatus2xx`.
+    """
+    increment(f"TripItStatus{response.status_code // 100}xx")
 
 
 def _join_params_by_slash(params):
@@ -0,0 +1,184 @@
+"""
+Incremental parsing of TripIt's JSON responses.
+
+TripIt's responses are a single object whose keys are object types, like
+`Trip` or `AirObject`, and whose values are either one of those objects or an
+array of them. Rather than holding the whole body in memory and decoding all of
+it, we read it a chunk at a time, decode the objects that we want one by one
+and skip past the ones that we don't without building them.
+"""
+
+import codecs
+import json
+import re
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRUCTURAL_CHARACTER = re.compile(r'["\[\]{}]')
+# What can still follow the part of a number that's been decoded so far.
+_REST_OF_NUMBER = re.compile(r"[0-9+\-.eE]*")
+# Everything after an opening quote up to and including its closing quote.
+_REST_OF_STRING = re.compile(r'(?:[^"\\]++|\\.)*+"', re.DOTALL)
+
+
+class _CharacterStream:
+    """
+    A window over a stream of UTF-8 bytes that only holds onto what hasn't been
+    parsed yet.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._exhausted = False
+        self.buffer = ""
+        self.pos = 0
+
+    def fill(self):
+        """
+        Reads the next chunk into the buffer, dropping what's been parsed.
+        Returns False once there's nothing left to read.
+        """
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            text = self._decoder.decode(b"", final=True)
+        elif isinstance(chunk, str):
+            text = chunk
+        else:
+            text = self._decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos :] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Returns the next character that isn't whitespace without consuming it,
+        or None at the end of the stream.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, character):
+        """ Consumes `character`, failing if it isn't next. """
+        found = self.peek()
+        if found != character:
+            raise ValueError(f"Expected {character!r} at {self.pos} but found {found!r}")
+        self.pos += 1
+
+    def decode_value(self):
+        """ Decodes the next JSON value, reading more of the stream as needed. """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Numbers can be cut off at the end of a chunk and still decode, like
+            # "1." decoding as 1, so they're only done once something that
+            # can't be part of them follows, or the stream ends.
+            if self._might_continue(value, end) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def _might_continue(self, value, end):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return _REST_OF_NUMBER.match(self.buffer, end).end() == len(self.buffer)
+
+    def skip_value(self):
+        """ Consumes the next JSON value without decoding it. """
+        if self.peek() not in ("[", "{"):
+            self.decode_value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURAL_CHARACTER.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                self._fill_or_fail()
+                continue
+            character = match.group()
+            if character == '"':
+                string = _REST_OF_STRING.match(self.buffer, match.end())
+                if string is None:
+                    self.pos = match.start()
+                    self._fill_or_fail()
+                    continue
+                self.pos = string.end()
+                continue
+            self.pos = match.end()
+            depth += 1 if character in "[{" else -1
+            if depth == 0:
+                return
+
+    def _fill_or_fail(self):
+        if not self.fill():
+            raise ValueError("Unexpected end of JSON")
+
+
+def iter_objects(chunks, object_types):
+    """
+    Yields `(key, value)` for every top-level key in a TripIt response.
+
+    Objects of the given `object_types` are yielded one at a time, whether they
+    were in an array or not. Other objects and arrays are skipped. Scalars, like
+    `timestamp` or `max_page`, are yielded as they are.
+    """
+    stream = _CharacterStream(chunks)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.decode_value()
+        stream.expect(":")
+        next_character = stream.peek()
+        if key in object_types and next_character == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.expect("]")
+            else:
+                while True:
+                    yield key, stream.decode_value()
+                    if stream.peek() != ",":
+                        break
+                    stream.expect(",")
+                stream.expect("]")
+        elif key in object_types or next_character not in ("[", "{"):
+            yield key, stream.decode_value()
+        else:
+            stream.skip_value()
+        if stream.peek() != ",":
+            break
+        stream.expect(",")
+    stream.expect("}")
+
+
+def read_objects(response, object_types, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reads a streamed `requests` response into a dict that only has the objects
+    of the given `object_types`, always in arrays, and any scalars.
+
+    The raw body is never held in memory in full.
+    """
+    payload = {}
+    try:
+        for key, value in iter_objects(response.iter_content(chunk_size), object_types):
+            if key in object_types:
+                payload.setdefault(key, []).append(value)
+            else:
+                payload[key] = value
+    finally:
+        response.close()
+    return payload
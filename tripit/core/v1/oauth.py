@@ -5,11 +5,12 @@ from datetime import datetime
 import urllib.parse
 from hashlib import sha1
 import base64
+import functools
 import os
 import hmac
 import logging
 import secrets
-import requests
+from tripit.core.v1 import session
 from tripit.environment import EnvironmentCheck
 from tripit.logging import logger
 from tripit.helpers import sort_dict
@@ -37,29 +38,17 @@ def fetch_token(token=None, token_secret=None):
         secret, then that means we already went through the first step
         of the OAuth process and are now trying to get access tokens. """
     if token_secret is not None:
-        request_uri = "https://api.tripit.com/oauth/access_token"
+        request_uri = f"{session.get_api_base_url()}/oauth/access_token"
     else:
-        request_uri = "https://api.tripit.com/oauth/request_token"
-    logger.debug("Token: %s, token_secret: %s, URI: %s", token, token_secret, request_uri)
-    common_arguments = {
-        "uri": request_uri,
-        "consumer_key": client_id,
-        "nonce": nonce,
-        "timestamp": timestamp,
-    }
-    access_token_arguments = {}
+        request_uri = f"{session.get_api_base_url()}/oauth/request_token"
+    logger.debug("Token: %s, URI: %s", token, request_uri)
     if token_secret is not None:
-        access_token_arguments["token"] = token
-        access_token_arguments["token_secret"] = token_secret
-
-    oauth_sig = generate_signature(
-        method="GET", consumer_secret=client_secret, **common_arguments, **access_token_arguments
-    )
-    auth_header = generate_sha1_auth_header(
-        signature=oauth_sig, **common_arguments, **access_token_arguments
-    )
-    logger.debug("Auth header: %s", auth_header)
-    response = requests.get(request_uri, headers={"Authorization": auth_header})
+        signer = get_signer(client_id, client_secret, token, token_secret)
+    else:
+        signer = get_signer(client_id, client_secret)
+    auth_header = signer.authorization_header("GET", request_uri, nonce, timestamp)
+    # Tokens are only handed out once for each nonce, so these aren't retried.
+    response = session.get(request_uri, retried=False, headers={"Authorization": auth_header})
     if response.status_code != 200:
         logging.error("Failed to get token data: %s)", response.text)
         return None
@@ -86,12 +75,89 @@ def generate_authenticated_headers_for_request(
     method, uri, consumer_key, consumer_secret, token, token_secret
 ):
     """ Generates heades for authenticated API calls. """
-    nonce = secrets.token_hex()
-    timestamp = datetime.now().timestamp()
-    signature = generate_signature(
-        method, uri, consumer_key, consumer_secret, nonce, timestamp, token, token_secret
-    )
-    return generate_sha1_auth_header(uri, signature, consumer_key, nonce, timestamp, token)
+    signer = get_signer(consumer_key, consumer_secret, token, token_secret)
+    return signer.authorization_header(method, uri)
+
+
+@functools.lru_cache(maxsize=128)
+def get_signer(consumer_key, consumer_secret, token=None, token_secret=None):
+    """
+    Returns an `OAuthSigner` for these credentials. Signers are kept around so
+    that warm containers don't have to set them up again for every request.
+    """
+    return OAuthSigner(consumer_key, consumer_secret, token, token_secret)
+
+
+class OAuthSigner:
+    """
+    Signs requests to TripIt with OAuth v1 HMAC-SHA1 for a consumer and,
+    optionally, a token.
+
+    Only the method, URI, nonce and timestamp change between requests, so the
+    HMAC key and the rest of the OAuth parameters are encoded once, up front.
+    Signatures match `generate_signature` and headers match
+    `generate_sha1_auth_header`.
+    """
+
+    def __init__(self, consumer_key, consumer_secret, token=None, token_secret=None):
+        self._hmac_key = "&".join([consumer_secret, token_secret or ""]).encode("utf8")
+        token_param = f"&oauth_token={token}" if token else ""
+        # Parameters are signed in alphabetical order; the nonce and timestamp go
+        # between these. Percent-encoding works character by character, so each
+        # piece can be encoded on its own.
+        self._params_before_nonce = urllib.parse.quote_plus(
+            f"oauth_consumer_key={consumer_key}&oauth_nonce="
+        )
+        self._params_before_timestamp = urllib.parse.quote_plus(
+            "&oauth_signature_method=HMAC-SHA1&oauth_timestamp="
+        )
+        self._params_after_timestamp = urllib.parse.quote_plus(
+            f"{token_param}&oauth_version=1.0"
+        )
+        header_token = f'oauth_token="{token}",' if token is not None else ""
+        self._header_before_nonce = f'oauth_consumer_key="{consumer_key}",oauth_nonce="'
+        self._header_before_timestamp = '",oauth_signature_method="HMAC-SHA1",oauth_timestamp="'
+        self._header_after_timestamp = f'",{header_token}oauth_version="1.0"'
+
+    def sign(self, method, uri, nonce, timestamp):
+        """ Returns the base64-encoded signature for a request. """
+        base_string = "".join(
+            [
+                method,
+                "&",
+                urllib.parse.quote_plus(uri),
+                "&",
+                self._params_before_nonce,
+                urllib.parse.quote_plus(nonce),
+                self._params_before_timestamp,
+                str(int(timestamp)),
+                self._params_after_timestamp,
+            ]
+        )
+        digest = hmac.new(self._hmac_key, base_string.encode("utf8"), sha1).digest()
+        return base64.b64encode(digest)
+
+    def authorization_header(self, method, uri, nonce=None, timestamp=None):
+        """
+        Returns the `Authorization` header for a request, signing it with a new
+        nonce and the current time unless they're given.
+        """
+        if nonce is None:
+            nonce = secrets.token_hex()
+        if timestamp is None:
+            timestamp = datetime.now().timestamp()
+        signature = self.sign(method, uri, nonce, timestamp)
+        return "".join(
+            [
+                f'OAuth realm="{uri}",',
+                self._header_before_nonce,
+                nonce,
+                self._header_before_timestamp,
+                str(int(timestamp)),
+                self._header_after_timestamp,
+                f',oauth_signature="{urllib.parse.quote_plus(signature)}"',
+            ]
+        )
 
 
 # pylint: disable=too-many-arguments
@@ -131,28 +197,6 @@ def generate_signature(
     "too-many-arguments" error. Otherwise, we'll need to resort to using
     **kwargs, which is too unsafe for my liking.
     """
-    params = {
-        "oauth_consumer_key": consumer_key,
-        "oauth_nonce": nonce,
-        "oauth_signature_method": "HMAC-SHA1",
-        "oauth_timestamp": int(timestamp),
-        "oauth_version": "1.0",
-    }
-    if token:
-        params["oauth_token"] = token
-
-    encrypt_key = "&".join([consumer_secret, (token_secret if token_secret is not None else "")])
-    param_parts = "&".join([f"{key}={params[key]}" for key, value in sort_dict(params).items()])
-    base_string_for_signature = "&".join(
-        [method, urllib.parse.quote_plus(uri), urllib.parse.quote_plus(param_parts)]
+    return OAuthSigner(consumer_key, consumer_secret, token, token_secret).sign(
+        method, uri, nonce, timestamp
     )
-    signature = hmac.new(bytes(encrypt_key, "utf8"), bytes(base_string_for_signature, "utf8"), sha1)
-
-    # Trying to figure out why access tokens have bad sigs
-    for param in params.keys():
-        logger.debug("%s: %s", param, params[param])
-    logger.debug("Encryption key, if any: %s", encrypt_key)
-    logger.debug("Signature base: %s", base_string_for_signature)
-    logger.debug("Signature: %s", base64.b64encode(signature.digest()))
-    logger.debug("Method: %s, URI: %s", method, uri)
-    return base64.b64encode(signature.digest())
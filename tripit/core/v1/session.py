@@ -0,0 +1,139 @@
+"""
+The HTTP session that every call to TripIt goes through.
+
+Creating a new connection to api.tripit.com means a DNS lookup and TCP and TLS
+handshakes. Sharing one pooled, keep-alive session across calls lets warm
+containers skip all of that after the first request.
+
+requests is only imported once the session is created, since handlers that
+never call TripIt shouldn't have to import it.
+
+API Gateway gives up on us after 29 seconds. The default timeouts only keep a
+single GET under that, retries and all: (1 + retries) * (connect + read) +
+backoff. Nothing bounds a request that makes several GETs, like /trips
+fetching page after page or /current_trip fetching each trip that might be
+happening now, so those can still run past it when TripIt is slow.
+"""
+
+import os
+import threading
+
+DEFAULT_API_BASE_URL = "https://api.tripit.com"
+DEFAULT_POOL_SIZE = 16
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 3.05
+DEFAULT_READ_TIMEOUT_SECONDS = 6
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_SECONDS = 0.25
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+
+_SESSIONS = {}
+_SESSION_LOCK = threading.Lock()
+
+
+def get(uri, retried=True, **kwargs):
+    """
+    GETs `uri` with a shared session, timing out as configured unless a
+    `timeout` is given. GETs that aren't safe to send twice, like asking for
+    OAuth tokens, should set `retried` to False.
+    """
+    kwargs.setdefault("timeout", get_timeouts())
+    return get_session(retried=retried).get(uri, **kwargs)
+
+
+def get_session(retried=True):
+    """
+    Returns a shared session, creating it on first use.
+
+    Its pool holds TRIPIT_HTTP_POOL_SIZE connections per host. Unless `retried`
+    is False, GETs are retried TRIPIT_HTTP_RETRIES times on connection errors and
+    5xx responses, backing off exponentially from TRIPIT_HTTP_RETRY_BACKOFF_SECONDS.
+    """
+    with _SESSION_LOCK:
+        if retried not in _SESSIONS:
+            _SESSIONS[retried] = create_session(
+                pool_size=get_pool_size(),
+                retries=get_retries() if retried else 0,
+                backoff_seconds=get_retry_backoff_seconds(),
+            )
+        return _SESSIONS[retried]
+
+
+def create_session(pool_size, retries, backoff_seconds):
+    """
+    Creates a session whose HTTPS connections are pooled and whose GETs are retried.
+    """
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_seconds,
+        allowed_methods=frozenset(["GET"]),
+        status_forcelist=RETRYABLE_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_api_base_url():
+    """
+    Returns where TripIt lives. TRIPIT_API_BASE_URL can point this somewhere
+    else, like a local fake of TripIt.
+    """
+    return os.getenv("TRIPIT_API_BASE_URL", DEFAULT_API_BASE_URL).rstrip("/")
+
+
+def get_pool_size():
+    """ Returns the number of connections kept open to TripIt. """
+    return _get_from_env("TRIPIT_HTTP_POOL_SIZE", DEFAULT_POOL_SIZE, int)
+
+
+def get_retries():
+    """ Returns the number of times that a GET to TripIt is retried. """
+    return _get_from_env("TRIPIT_HTTP_RETRIES", DEFAULT_RETRIES, int)
+
+
+def get_retry_backoff_seconds():
+    """ Returns the backoff factor between retries to TripIt. """
+    return _get_from_env(
+        "TRIPIT_HTTP_RETRY_BACKOFF_SECONDS", DEFAULT_RETRY_BACKOFF_SECONDS, float
+    )
+
+
+def get_timeouts():
+    """
+    Returns the connect and read timeouts for calls to TripIt, set with
+    TRIPIT_HTTP_CONNECT_TIMEOUT_SECONDS and TRIPIT_HTTP_READ_TIMEOUT_SECONDS.
+    """
+    return (
+        _get_from_env(
+            "TRIPIT_HTTP_CONNECT_TIMEOUT_SECONDS", DEFAULT_CONNECT_TIMEOUT_SECONDS, float
+        ),
+        _get_from_env("TRIPIT_HTTP_READ_TIMEOUT_SECONDS", DEFAULT_READ_TIMEOUT_SECONDS, float),
+    )
+
+
+def close_session():
+    """
+    Closes the shared sessions and their connections. The next call to
+    `get_session` will create a new one from the environment.
+    """
+    with _SESSION_LOCK:
+        for shared_session in _SESSIONS.values():
+            shared_session.close()
+        _SESSIONS.clear()
+
+
+def _get_from_env(name, default, cast):
+    if os.getenv(name):
+        return cast(os.getenv(name))
+    return default
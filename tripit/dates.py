@@ -0,0 +1,74 @@
+"""
+Parsing for the dates, times and UTC offsets that TripIt gives us.
+
+TripIt always uses `YYYY-MM-DD` for dates, `HH:MM:SS` for times and `±HH:MM`
+for offsets, so we read these directly instead of going through `strptime`.
+Dates and offsets repeat a lot within an account, so they're memoized.
+"""
+
+import datetime
+import functools
+import time
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+SECONDS_PER_DAY = 86400
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(date):
+    """
+    Returns the year, month and day in a `YYYY-MM-DD` date.
+    """
+    year, month, day = date.split("-")
+    parsed_date = datetime.date(int(year), int(month), int(day))
+    return parsed_date.year, parsed_date.month, parsed_date.day
+
+
+@functools.lru_cache(maxsize=4096)
+def days_since_epoch(date):
+    """
+    Returns the number of days between the UNIX epoch and a `YYYY-MM-DD` date.
+    """
+    return datetime.date(*parse_date(date)).toordinal() - EPOCH_ORDINAL
+
+
+def parse_time(time_of_day):
+    """
+    Returns the number of seconds since midnight in a `HH:MM:SS` time.
+    """
+    hours, minutes, seconds = time_of_day.split(":")
+    hours, minutes, seconds = int(hours), int(minutes), int(seconds)
+    if not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60):
+        raise ValueError(f"Invalid time: {time_of_day}")
+    return hours * 3600 + minutes * 60 + seconds
+
+
+@functools.lru_cache(maxsize=256)
+def parse_utc_offset(utc_offset):
+    """
+    Returns the number of seconds that a `±HH:MM` UTC offset is ahead of UTC.
+    """
+    sign = -1 if utc_offset.startswith("-") else 1
+    hours, _, minutes = utc_offset.lstrip("+-").partition(":")
+    return sign * (int(hours) * 3600 + int(minutes or 0) * 60)
+
+
+def local_time_to_unix(date, time_of_day, utc_offset):
+    """
+    Returns the UNIX time of a date and time in the given UTC offset.
+    """
+    return (
+        days_since_epoch(date) * SECONDS_PER_DAY
+        + parse_time(time_of_day)
+        - parse_utc_offset(utc_offset)
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def date_to_unix(date):
+    """
+    Returns the UNIX time of midnight on a `YYYY-MM-DD` date in this machine's
+    time zone.
+    """
+    year, month, day = parse_date(date)
+    return int(time.mktime((year, month, day, 0, 0, 0, 0, 1, -1)))
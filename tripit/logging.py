@@ -1,9 +1,26 @@
 """
 Logging module for TripIt APIs.
+
+Records are handed off to a queue and formatted and written to stdout by a
+background thread so that request threads never wait on stdout. That thread is
+only started once something is logged, so handlers that never log don't pay
+for it. Call `flush_logs` before a Lambda invocation returns so that nothing is
+left in the queue while it's frozen.
+
+Payloads, like the bodies of responses from TripIt, should be logged with
+`log_payload` so that they're only rendered when they'll actually be written.
 """
+import functools
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
+import threading
+
+DEFAULT_PAYLOAD_MAX_CHARS = 1024
+DEFAULT_PAYLOAD_SAMPLE_RATE = 0.0
 
 
 # pylint: disable=too-few-public-methods
@@ -16,6 +33,8 @@ class Log:
         """
         Creates or retrieves a logger, set its log level and configures it
         to write to stdout.
+
+        Writes happen on a background thread unless TRIPIT_LOG_ASYNC is "false".
         """
         log_level = os.getenv("LOG_LEVEL").upper() if os.getenv("LOG_LEVEL") else "INFO"
         log = logging.getLogger(__name__)
@@ -26,8 +45,142 @@ class Log:
         handler = logging.StreamHandler(sys.stdout)
         handler.setFormatter(formatter)
         handler.setLevel(log_level)
+        self.queue = None
+        if os.getenv("TRIPIT_LOG_ASYNC", "true").lower() != "false":
+            self.queue = queue.Queue()
+            listener = logging.handlers.QueueListener(
+                self.queue, handler, respect_handler_level=True
+            )
+            handler = DeferredQueueHandler(self.queue, listener)
+            handler.setLevel(log_level)
         log.addHandler(handler)
         self.logger = log
 
+    def flush(self):
+        """ Waits for every record queued so far to be written. """
+        if self.queue is not None:
+            self.queue.join()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records for `listener`, starting it with the first one.
+
+    Records are queued as they are, leaving formatting them, `Lazy` values and
+    all, to the listener's thread. Arguments are rendered whenever that thread
+    gets to them, so don't log anything that's about to be changed.
+    """
+
+    def __init__(self, log_queue, listener):
+        super().__init__(log_queue)
+        self.listener = listener
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def emit(self, record):
+        if not self._started:
+            self._start_listener()
+        super().emit(record)
+
+    def prepare(self, record):
+        return record
+
+    def close(self):
+        # logging closes every handler at exit, which writes what's left.
+        with self._start_lock:
+            if self._started:
+                self.listener.stop()
+                self._started = False
+        super().close()
+
+    def _start_listener(self):
+        with self._start_lock:
+            if not self._started:
+                self.listener.start()
+                self._started = True
+
+
+class Lazy:
+    """
+    Renders `function(*args)` into a log message, but only if the message is
+    actually written. Use it with `%s`.
+    """
+
+    __slots__ = ("function", "args")
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def __str__(self):
+        return str(self.function(*self.args))
+
+
+def log_payload(message, render_payload, *args):
+    """
+    Logs `message`, formatted with `args`, followed by the payload that
+    `render_payload` returns.
+
+    At DEBUG, every payload is logged in full. Otherwise, a sample of them,
+    TRIPIT_LOG_PAYLOAD_SAMPLE_RATE (none by default), is logged at INFO and
+    truncated to TRIPIT_LOG_PAYLOAD_MAX_CHARS. Payloads that aren't logged
+    are never rendered.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"{message} %s", *args, Lazy(render_payload), stacklevel=2)
+        return
+    sample_rate = get_payload_sample_rate()
+    if sample_rate > 0 and random.random() < sample_rate:
+        logger.info(
+            f"{message} %s",
+            *args,
+            Lazy(_truncate, render_payload, get_payload_max_chars()),
+            stacklevel=2,
+        )
+
+
+def get_payload_sample_rate():
+    """ Returns the fraction of payloads logged when we're not at DEBUG. """
+    if os.getenv("TRIPIT_LOG_PAYLOAD_SAMPLE_RATE"):
+        return float(os.getenv("TRIPIT_LOG_PAYLOAD_SAMPLE_RATE"))
+    return DEFAULT_PAYLOAD_SAMPLE_RATE
+
+
+def get_payload_max_chars():
+    """ Returns how much of a sampled payload is logged. """
+    if os.getenv("TRIPIT_LOG_PAYLOAD_MAX_CHARS"):
+        return int(os.getenv("TRIPIT_LOG_PAYLOAD_MAX_CHARS"))
+    return DEFAULT_PAYLOAD_MAX_CHARS
+
+
+def flush_logs():
+    """
+    Waits for every log record so far to be written to stdout.
+    """
+    _LOG.flush()
+
+
+def flushes_logs(handler):
+    """
+    Flushes logs once a Lambda handler returns; see `flush_logs`.
+    """
+
+    @functools.wraps(handler)
+    def _handler(event, context=None):
+        try:
+            return handler(event, context)
+        finally:
+            flush_logs()
+
+    return _handler
+
+
+def _truncate(render_payload, max_chars):
+    payload = str(render_payload())
+    if len(payload) <= max_chars:
+        return payload
+    return f"{payload[:max_chars]}... ({len(payload) - max_chars} more characters)"
+
 
-logger = Log().logger
+_LOG = Log()
+logger = _LOG.logger
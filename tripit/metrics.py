@@ -0,0 +1,171 @@
+"""
+Metrics for our handlers in CloudWatch's embedded metric format (EMF).
+
+Counters and latencies recorded while a handler runs are written to stdout as
+EMF JSON once it returns. CloudWatch Logs turns these lines into metrics on its
+own, so recording them doesn't cost us any calls to CloudWatch.
+
+Like `tripit.timing`, recording is a no-op outside of a handler wrapped with
+`emits_metrics`, and metrics are on unless TRIPIT_METRICS is "false".
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import time
+
+DEFAULT_NAMESPACE = "TripItAPIs"
+# CloudWatch won't take more values than this for a metric in one line.
+MAX_VALUES_PER_METRIC = 100
+
+_CURRENT_METRICS = contextvars.ContextVar("tripit_metrics", default=None)
+_NOT_MEASURED = contextlib.nullcontext()
+
+
+class Metrics:
+    """
+    The counters and latencies recorded during a call to `handler_name`.
+    """
+
+    def __init__(self, handler_name):
+        self.handler_name = handler_name
+        self.counters = {}
+        self.observations = {}
+
+    def increment(self, name, value=1, unit="Count"):
+        """ Adds `value` to the counter `name`. """
+        total, _ = self.counters.get(name, (0, unit))
+        self.counters[name] = (total + value, unit)
+
+    def observe(self, name, value, unit="Milliseconds"):
+        """ Records one value of `name`, like a single request's latency. """
+        self.observations.setdefault(name, ([], unit))[0].append(value)
+
+    def to_emf(self, namespace, timestamp_ms):
+        """
+        Returns every metric as EMF documents. Counters are in the first; metrics
+        with more than `MAX_VALUES_PER_METRIC` values are spread across more.
+        """
+        longest = max((len(values) for values, _ in self.observations.values()), default=0)
+        documents = []
+        for start in range(0, max(1, longest), MAX_VALUES_PER_METRIC):
+            metrics = {}
+            if start == 0:
+                metrics.update(self.counters)
+            for name, (values, unit) in self.observations.items():
+                if values[start : start + MAX_VALUES_PER_METRIC]:
+                    metrics[name] = (values[start : start + MAX_VALUES_PER_METRIC], unit)
+            if not metrics:
+                continue
+            document = {
+                "_aws": {
+                    "Timestamp": timestamp_ms,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": namespace,
+                            "Dimensions": [["Handler"]],
+                            "Metrics": [
+                                {"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()
+                            ],
+                        }
+                    ],
+                },
+                "Handler": self.handler_name,
+            }
+            document.update({name: value for name, (value, _) in metrics.items()})
+            documents.append(document)
+        return documents
+
+
+def metrics_enabled():
+    """
+    Metrics are on unless TRIPIT_METRICS is "false".
+    """
+    return os.getenv("TRIPIT_METRICS", "true").lower() != "false"
+
+
+def get_namespace():
+    """
+    Returns the CloudWatch namespace that our metrics go into, set with
+    TRIPIT_METRICS_NAMESPACE.
+    """
+    return os.getenv("TRIPIT_METRICS_NAMESPACE", DEFAULT_NAMESPACE)
+
+
+def recording_metrics():
+    """
+    Returns whether we're in a handler whose metrics are being recorded. Use
+    this to skip working out metrics that are costly to count.
+    """
+    return _CURRENT_METRICS.get() is not None
+
+
+def increment(name, value=1, unit="Count"):
+    """
+    Adds `value` to a counter for the handler that we're in, if any.
+    """
+    metrics = _CURRENT_METRICS.get()
+    if metrics is not None:
+        metrics.increment(name, value, unit)
+
+
+def observe(name, value, unit="Milliseconds"):
+    """
+    Records a value of `name` for the handler that we're in, if any.
+    """
+    metrics = _CURRENT_METRICS.get()
+    if metrics is not None:
+        metrics.observe(name, value, unit)
+
+
+def measure_latency(name):
+    """
+    Records how long a block takes, in milliseconds, as a value of `name`.
+    """
+    metrics = _CURRENT_METRICS.get()
+    if metrics is None:
+        return _NOT_MEASURED
+    return _measure_latency(metrics, name)
+
+
+def emits_metrics(handler):
+    """
+    Collects metrics while a Lambda handler runs and writes them to stdout as
+    EMF once it returns.
+    """
+
+    @functools.wraps(handler)
+    def _handler_with_metrics(event, context=None):
+        if not metrics_enabled():
+            return handler(event, context)
+        metrics = Metrics(handler.__name__)
+        reset_token = _CURRENT_METRICS.set(metrics)
+        try:
+            return handler(event, context)
+        finally:
+            _CURRENT_METRICS.reset(reset_token)
+            write_metrics(metrics)
+
+    return _handler_with_metrics
+
+
+def write_metrics(metrics):
+    """
+    Writes `metrics` to stdout as EMF, one document per line.
+    """
+    documents = metrics.to_emf(get_namespace(), int(time.time() * 1000))
+    lines = "".join(json.dumps(document) + "\n" for document in documents)
+    sys.stdout.write(lines)
+    sys.stdout.flush()
+
+
+@contextlib.contextmanager
+def _measure_latency(metrics, name):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(name, (time.perf_counter() - started_at) * 1000)
@@ -0,0 +1,92 @@
+"""
+Compact representations of resolved trips and flight segments.
+
+Accounts can have tens of thousands of segments, so these use `__slots__`
+instead of dicts and intern the strings that repeat across them, like airport
+and airline codes. They're turned into dicts with `to_dict` when responding.
+"""
+
+import sys
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+class FlightSegment:
+    """
+    A single leg of a flight. Times are in UNIX time.
+    """
+
+    __slots__ = ("flight_number", "origin", "destination", "offset", "depart_time", "arrive_time")
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, flight_number, origin, destination, offset, depart_time, arrive_time):
+        self.flight_number = _intern(flight_number)
+        self.origin = _intern(origin)
+        self.destination = _intern(destination)
+        self.offset = _intern(offset)
+        self.depart_time = depart_time
+        self.arrive_time = arrive_time
+
+    def to_dict(self):
+        """ Returns this segment as it appears in API responses. """
+        return {
+            "flight_number": self.flight_number,
+            "origin": self.origin,
+            "destination": self.destination,
+            "offset": self.offset,
+            "depart_time": self.depart_time,
+            "arrive_time": self.arrive_time,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, FlightSegment):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return f"FlightSegment({self.to_dict()!r})"
+
+
+# pylint: disable=too-many-instance-attributes
+class Trip:
+    """
+    A trip with its flight segments, sorted by departure. Times are in UNIX time.
+    """
+
+    __slots__ = ("id", "name", "city", "ends_on", "ended", "link", "starts_on", "flights")
+
+    # pylint: disable=too-many-arguments,invalid-name,redefined-builtin
+    def __init__(self, id, name, city, ends_on, ended, link, starts_on, flights):
+        self.id = id
+        self.name = name
+        self.city = _intern(city)
+        self.ends_on = ends_on
+        self.ended = ended
+        self.link = link
+        self.starts_on = starts_on
+        self.flights = tuple(flights)
+
+    def to_dict(self):
+        """ Returns this trip as it appears in API responses. """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "city": self.city,
+            "ends_on": self.ends_on,
+            "ended": self.ended,
+            "link": self.link,
+            "starts_on": self.starts_on,
+            "flights": [flight.to_dict() for flight in self.flights],
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Trip):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return f"Trip({self.to_dict()!r})"
@@ -0,0 +1,44 @@
+"""
+Renders resolved trips for API responses.
+
+Trips are resolved with their times in UNIX time. They're only converted into
+human-readable times here, right before they're sent back.
+"""
+
+import datetime
+
+TRIP_TIME_KEYS = ["starts_on", "ends_on"]
+FLIGHT_TIME_KEYS = ["depart_time", "arrive_time"]
+
+
+def present_trips(trips, human_times=False):
+    """
+    Returns resolved trips as they should appear in a response, with human
+    times if asked for.
+    """
+    if trips is None:
+        return None
+    return [present_trip(trip, human_times=human_times) for trip in trips]
+
+
+def present_trip(trip, human_times=False):
+    """
+    Returns a resolved trip, and its flights, as a dict with their times made
+    human-readable if asked for.
+    """
+    presented_trip = trip.to_dict()
+    if not human_times:
+        return presented_trip
+    for key in TRIP_TIME_KEYS:
+        presented_trip[key] = convert_to_human_dt(presented_trip[key])
+    for flight in presented_trip["flights"]:
+        for key in FLIGHT_TIME_KEYS:
+            flight[key] = convert_to_human_dt(flight[key])
+    return presented_trip
+
+
+def convert_to_human_dt(timestamp):
+    """
+    Converts a timestamp to human time.
+    """
+    return datetime.datetime.utcfromtimestamp(timestamp).strftime("%a %b %d %H:%M:%S %Y %z UTC")
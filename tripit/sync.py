@@ -0,0 +1,262 @@
+"""
+Incremental trip syncing and caching.
+
+Rather than downloading and resolving an account's entire trip list on every
+call, we keep a snapshot of resolved trips per access key and only ask TripIt
+for what changed since we last synced. Trips can also be cached outright for
+a short time so that repeated calls don't reach TripIt at all.
+
+Snapshots are kept in a bounded cache; see `tripit.cache.get_snapshot_cache`.
+
+Finding out about deleted trips means listing every trip that TripIt has, a
+request per page of the account however little changed. That's only done
+every TRIPIT_SYNC_LISTING_INTERVAL syncs, so deleted trips can linger in a
+snapshot until the next listing.
+"""
+
+import datetime
+import os
+from tripit.cache import (
+    estimate_trips_size_bytes,
+    get_current_trip_cache,
+    get_snapshot_cache,
+    get_trip_cache,
+    invalidate_trips_for_access_key,
+)
+from tripit.logging import Lazy, logger
+from tripit.metrics import increment
+from tripit.trips import (
+    TripFetchError,
+    fetch_and_resolve_trip,
+    fetch_trip_pages,
+    fetch_all_trips,
+    get_current_trip,
+    normalize_trip_objects,
+    resolve_trip_pages,
+)
+
+DEFAULT_SYNC_LISTING_INTERVAL = 5
+
+
+class TripSnapshot:
+    """
+    The resolved trips for an access key, in the order that TripIt lists them,
+    the TripIt time at which they were last synced and how many syncs ago every
+    trip was last listed.
+    """
+
+    def __init__(self, trips, synced_at, syncs_since_listing=0):
+        self.trips = {trip.id: trip for trip in trips}
+        self.synced_at = synced_at
+        self.syncs_since_listing = syncs_since_listing
+
+    def estimated_size_bytes(self):
+        """ Estimates how large this snapshot is, for the snapshot cache. """
+        return estimate_trips_size_bytes(self.trips.values())
+
+
+def incremental_sync_enabled():
+    """
+    Incremental syncing is opt-in; set TRIPIT_INCREMENTAL_SYNC to "true" to use it.
+    """
+    return os.getenv("TRIPIT_INCREMENTAL_SYNC", "false").lower() == "true"
+
+
+def get_sync_listing_interval():
+    """
+    Returns how many syncs go by between listing every trip to find deleted ones.
+    """
+    if os.getenv("TRIPIT_SYNC_LISTING_INTERVAL"):
+        return max(1, int(os.getenv("TRIPIT_SYNC_LISTING_INTERVAL")))
+    return DEFAULT_SYNC_LISTING_INTERVAL
+
+
+def get_cached_trips(access_key):
+    """
+    Returns every trip for an access key from the trip cache, or None if it
+    isn't there.
+    """
+    trip_cache = get_trip_cache()
+    trips = trip_cache.get(access_key)
+    if trips is not None:
+        increment("TripCacheHits")
+        logger.debug("Trip cache hit for %s: %s", access_key, Lazy(trip_cache.stats))
+        return trips
+    increment("TripCacheMisses")
+    logger.debug("Trip cache miss for %s: %s", access_key, Lazy(trip_cache.stats))
+    return None
+
+
+def get_trips_for_access_key(access_key, token, token_secret):
+    """
+    Returns every trip for an access key from the trip cache, if it's there.
+    Otherwise, trips are synced or fetched in full and cached.
+    """
+    trips = get_cached_trips(access_key)
+    if trips is not None:
+        return trips
+    trip_cache = get_trip_cache()
+    if incremental_sync_enabled():
+        trips = sync_trips(access_key, token, token_secret)
+    else:
+        trips = fetch_all_trips(token, token_secret)
+    if trips is not None:
+        trip_cache.put(access_key, trips)
+    return trips
+
+
+def get_current_trip_for_access_key(access_key, token, token_secret):
+    """
+    Returns the current trip for an access key, without syncing. Every trip in
+    the trip cache is used if it has them; otherwise, the trip that we found
+    the last time we were asked is used until it expires, and only the trips
+    that might be current are fetched once it has.
+    """
+    trips = get_cached_trips(access_key)
+    if trips is not None:
+        return get_current_trip(token=token, token_secret=token_secret, trips=trips)
+    current_trip_cache = get_current_trip_cache()
+    # There might not be a current trip, which is worth caching too, so it's
+    # kept in a tuple to tell it apart from a miss.
+    cached = current_trip_cache.get(access_key)
+    if cached is not None:
+        increment("CurrentTripCacheHits")
+        return cached[0]
+    increment("CurrentTripCacheMisses")
+    current_trip = get_current_trip(token=token, token_secret=token_secret)
+    current_trip_cache.put(access_key, (current_trip,))
+    return current_trip
+
+
+def forget_trips_for_access_key(access_key):
+    """
+    Drops every cached trip and snapshot held for an access key.
+    """
+    invalidate_trips_for_access_key(access_key)
+    forget_snapshot(access_key)
+
+
+def sync_trips(access_key, token, token_secret):
+    """
+    Returns every trip for an access key, only fetching and resolving what changed
+    since the last time this was called for it.
+
+    Trips that were modified, or that had objects within them modified, are
+    fetched in full and resolved again. Every TRIPIT_SYNC_LISTING_INTERVAL
+    syncs, every trip is listed and those that TripIt no longer has are removed
+    from the snapshot. New trips are added to the end of the snapshot until then.
+    """
+    snapshot_cache = get_snapshot_cache()
+    snapshot = snapshot_cache.get(access_key)
+    try:
+        if snapshot is None:
+            snapshot = _take_full_snapshot(token, token_secret)
+        else:
+            snapshot = _apply_changes_to_snapshot(snapshot, token, token_secret)
+    except TripFetchError:
+        return None
+    snapshot_cache.put(access_key, snapshot)
+    return [_refresh_ended(trip) for trip in snapshot.trips.values()]
+
+
+def forget_snapshot(access_key):
+    """
+    Drops the snapshot held for an access key, forcing a full sync next time.
+    """
+    get_snapshot_cache().invalidate(lambda key: key == access_key)
+
+
+def _take_full_snapshot(token, token_secret):
+    logger.debug("No snapshot found; syncing all trips.")
+    timestamps = []
+    pages = _record_timestamps(fetch_trip_pages(token, token_secret), timestamps)
+    trips = list(resolve_trip_pages(pages))
+    return TripSnapshot(trips, timestamps[0])
+
+
+def _apply_changes_to_snapshot(snapshot, token, token_secret):
+    timestamps = []
+    changed_trip_ids = set()
+    modified_trip_ids = []
+    pages = fetch_trip_pages(token, token_secret, modified_since=snapshot.synced_at)
+    for page in _record_timestamps(pages, timestamps):
+        modified_trip_ids.extend(
+            trip["id"] for trip in normalize_trip_objects(page.get("Trip", []))
+        )
+        changed_trip_ids.update(modified_trip_ids)
+        for object_type in ["AirObject", "NoteObject"]:
+            changed_trip_ids.update(
+                trip_object["trip_id"]
+                for trip_object in normalize_trip_objects(page.get(object_type, []))
+                if isinstance(trip_object, dict) and "trip_id" in trip_object
+            )
+    listed_trip_ids, syncs_since_listing = _list_or_carry_trip_ids(
+        snapshot, modified_trip_ids, token, token_secret
+    )
+    logger.debug(
+        "%d trips changed and %d trips removed since %s",
+        len(changed_trip_ids),
+        len({str(trip_id) for trip_id in snapshot.trips} - set(listed_trip_ids)),
+        snapshot.synced_at,
+    )
+
+    resolved_trips = {
+        trip_id: trip
+        for trip_id, trip in snapshot.trips.items()
+        if str(trip_id) not in changed_trip_ids
+    }
+    for trip_id in changed_trip_ids.intersection(listed_trip_ids):
+        for trip in fetch_and_resolve_trip(trip_id, token, token_secret):
+            resolved_trips[trip.id] = trip
+    merged_trips = [
+        resolved_trips[int(trip_id)]
+        for trip_id in listed_trip_ids
+        if int(trip_id) in resolved_trips
+    ]
+    return TripSnapshot(merged_trips, timestamps[0], syncs_since_listing)
+
+
+def _list_or_carry_trip_ids(snapshot, modified_trip_ids, token, token_secret):
+    """
+    Returns the IDs of every trip that TripIt has, and how many syncs ago they
+    were listed. They're only listed every TRIPIT_SYNC_LISTING_INTERVAL syncs;
+    until then, the snapshot's trips are carried over with modified trips added.
+    """
+    syncs_since_listing = snapshot.syncs_since_listing + 1
+    if syncs_since_listing >= get_sync_listing_interval():
+        return _list_trip_ids(token, token_secret), 0
+    carried_trip_ids = [str(trip_id) for trip_id in snapshot.trips]
+    return list(dict.fromkeys(carried_trip_ids + modified_trip_ids)), syncs_since_listing
+
+
+def _list_trip_ids(token, token_secret):
+    """
+    Lists the IDs of every trip that TripIt currently has, without their objects.
+    This is how we find out about deleted trips.
+    """
+    trip_ids = []
+    for page in fetch_trip_pages(token, token_secret, include_objects=False):
+        trip_ids.extend(trip["id"] for trip in normalize_trip_objects(page.get("Trip", [])))
+    return list(dict.fromkeys(trip_ids))
+
+
+def _record_timestamps(pages, timestamps):
+    """
+    Snapshots are timestamped with TripIt's clock, not ours, so that
+    `modified_since` doesn't miss changes if the two drift apart. Our clock,
+    read before the first request, is used if TripIt doesn't tell us the time.
+    """
+    timestamps.append(int(datetime.datetime.now().timestamp()))
+    for page in pages:
+        if len(timestamps) == 1 and "timestamp" in page:
+            timestamps.insert(0, int(page["timestamp"]))
+        yield page
+
+
+def _refresh_ended(trip):
+    """
+    Trips that hadn't ended when they were resolved might have ended since.
+    """
+    if not trip.ended:
+        trip.ended = int(datetime.datetime.now().timestamp()) > trip.ends_on
+    return trip
@@ -0,0 +1,119 @@
+"""
+Per-phase timers for our handlers.
+
+When a call is slow, these tell us where the time went: looking up tokens
+(`token`), signing requests (`sign`), waiting on TripIt (`tripit`), decoding
+what it sent back (`decode`) or resolving trips (`join`). When responses are
+streamed, `tripit` stops once TripIt's headers arrive and reading the rest of
+the body counts towards `decode`.
+
+Phases are reported in a `Server-Timing` header on every response made while a
+handler is being timed and in a log line once it's done. Timing is on unless
+TRIPIT_PHASE_TIMING is "false", in which case `timed` does next to nothing.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import time
+from tripit.logging import Lazy, flushes_logs, logger
+
+_CURRENT_TIMER = contextvars.ContextVar("tripit_phase_timer", default=None)
+_NOT_TIMED = contextlib.nullcontext()
+
+
+class PhaseTimer:
+    """
+    Adds up the time spent in each phase of a call to `name`. Phases that
+    happen more than once, like fetching pages of trips, or at the same time,
+    like fetching trips on an event loop, are summed.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.perf_counter()
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """ Times everything within this block as `name`. """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started_at)
+
+    def add(self, name, seconds):
+        """ Adds `seconds` to the time spent in `name`. """
+        total_seconds, count = self.phases.get(name, (0, 0))
+        self.phases[name] = (total_seconds + seconds, count + 1)
+
+    def elapsed_seconds(self):
+        """ Returns the time since this timer was started. """
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self):
+        """ Returns every phase, and the total so far, as a `Server-Timing` header. """
+        metrics = [
+            f"{name};dur={seconds * 1000:.1f}" for name, (seconds, _) in self.phases.items()
+        ]
+        metrics.append(f"total;dur={self.elapsed_seconds() * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def to_dict(self):
+        """ Returns every phase, in milliseconds, for logging. """
+        return {
+            "handler": self.name,
+            "total_ms": round(self.elapsed_seconds() * 1000, 1),
+            "phases": {
+                name: {"ms": round(seconds * 1000, 1), "count": count}
+                for name, (seconds, count) in self.phases.items()
+            },
+        }
+
+
+def phase_timing_enabled():
+    """
+    Phase timing is on unless TRIPIT_PHASE_TIMING is "false".
+    """
+    return os.getenv("TRIPIT_PHASE_TIMING", "true").lower() != "false"
+
+
+def current_timer():
+    """
+    Returns the timer for the handler that we're in, or None if it isn't being timed.
+    """
+    return _CURRENT_TIMER.get()
+
+
+def timed(phase):
+    """
+    Times a block as `phase` of the handler that we're in, if it's being timed.
+    """
+    timer = _CURRENT_TIMER.get()
+    if timer is None:
+        return _NOT_TIMED
+    return timer.phase(phase)
+
+
+def time_phases(handler):
+    """
+    Times the phases of a Lambda handler and logs them once it returns. Logs
+    are flushed afterwards whether or not this is on.
+    """
+
+    @functools.wraps(handler)
+    def _timed_handler(event, context=None):
+        if not phase_timing_enabled():
+            return handler(event, context)
+        timer = PhaseTimer(handler.__name__)
+        reset_token = _CURRENT_TIMER.set(timer)
+        try:
+            return handler(event, context)
+        finally:
+            _CURRENT_TIMER.reset(reset_token)
+            logger.info("Phase timings: %s", Lazy(lambda: json.dumps(timer.to_dict())))
+
+    return flushes_logs(_timed_handler)
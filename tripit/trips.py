@@ -2,18 +2,40 @@
 TripIt operations.
 """
 
-import concurrent.futures
 import datetime
 import os
-import time
+import threading
 from tripit.core.v1.api import get_from_tripit_v1
-from tripit.logging import logger
+from tripit.core.v1.json_stream import read_objects
+from tripit.dates import date_to_unix, local_time_to_unix
+from tripit.logging import Lazy, log_payload, logger
+from tripit.metrics import increment, recording_metrics
+from tripit.models import FlightSegment, Trip
+from tripit.presentation import present_trips
+from tripit.timing import timed
 
+DEFAULT_TRIP_RESOLVER_WORKERS = 8
+DEFAULT_TRIP_PAGE_SIZE = 25
+DEFAULT_CURRENT_TRIP_SLACK_HOURS = 24
+TRIP_OBJECT_TYPES = ("Trip", "AirObject", "NoteObject")
 
-def get_current_trip(token, token_secret):
+_TRIP_RESOLVER_EXECUTOR = None
+_TRIP_RESOLVER_EXECUTOR_LOCK = threading.Lock()
+
+
+class TripFetchError(Exception):
+    """
+    Raised when TripIt doesn't give us the trips that we asked for.
+    """
+
+
+def get_current_trip(token, token_secret, trips=None):
     """
     Retrieves the trip that we're currently on, with flights, if any.
 
+    Unless already-resolved `trips` are given, only trips that might be happening
+    right now are fetched from TripIt in full; see `iter_current_trip_candidates`.
+
     Note that we only currently support being on one trip at a time and will
     only return the first trip found.
 
@@ -24,28 +46,111 @@ def get_current_trip(token, token_secret):
 
     This fix may get added in a future release.
     """
-    trips = get_all_trips(token, token_secret)
     now = int(datetime.datetime.now().timestamp())
-    current_trip = [trip for trip in trips if trip["starts_on"] <= now <= trip["ends_on"]]
-    if not current_trip:
+    if trips is None:
+        trips = iter_current_trip_candidates(token, token_secret, now)
+    return find_current_trip(trips, now)
+
+
+async def get_current_trip_async(token, token_secret, trips=None):
+    """
+    Like `get_current_trip`, but on an event loop. Every trip that might be
+    happening right now is fetched from TripIt at the same time.
+    """
+    now = int(datetime.datetime.now().timestamp())
+    if trips is None:
+        try:
+            trips = await fetch_current_trip_candidates_async(token, token_secret, now)
+        except TripFetchError:
+            return None
+    return find_current_trip(trips, now)
+
+
+def find_current_trip(trips, now):
+    """
+    Summarizes the first of `trips` that's happening at `now`, and the flight
+    that we're on, if any.
+
+    Returns an empty dict if we're not on a trip, or None if TripIt couldn't
+    give us our trips.
+    """
+    try:
+        current_trips = (trip for trip in trips if trip.starts_on <= now <= trip.ends_on)
+        first_current_trip = next(current_trips, None)
+    except TripFetchError:
+        return None
+    if not first_current_trip:
         return {}
-    first_current_trip = current_trip[0]
     current_flights = [
         flight
-        for flight in first_current_trip["flights"]
-        if flight["depart_time"] <= now <= flight["arrive_time"]
+        for flight in first_current_trip.flights
+        if flight.depart_time <= now <= flight.arrive_time
     ]
     if not current_flights:
         current_flight = {}
     else:
-        current_flight = current_flights[0]
+        current_flight = current_flights[0].to_dict()
     return {
-        "trip_name": first_current_trip["name"],
-        "current_city": first_current_trip["city"],
+        "trip_name": first_current_trip.name,
+        "current_city": first_current_trip.city,
         "todays_flight": current_flight,
     }
 
 
+def iter_current_trip_candidates(token, token_secret, now):
+    """
+    Yields resolved trips that might be happening at `now`.
+
+    Trips are first listed without their objects. Only those whose start and
+    end dates, widened by TRIPIT_CURRENT_TRIP_SLACK_HOURS to account for redeyes
+    and ingress time, contain `now` are fetched with their objects and resolved.
+    This keeps /current_trip from getting slower as an account's history grows.
+    """
+    slack_seconds = get_current_trip_slack_hours() * 3600
+    for page in fetch_trip_pages(token, token_secret, past=False, include_objects=False):
+        for trip_object in normalize_trip_objects(page.get("Trip", [])):
+            if trip_might_be_current(trip_object, now, slack_seconds):
+                yield from fetch_and_resolve_trip(trip_object["id"], token, token_secret)
+
+
+async def fetch_current_trip_candidates_async(token, token_secret, now):
+    """
+    Returns resolved trips that might be happening at `now`, fetching them from
+    TripIt at the same time; see `iter_current_trip_candidates`.
+    """
+    slack_seconds = get_current_trip_slack_hours() * 3600
+    pages = await fetch_trip_pages_async(token, token_secret, past=False, include_objects=False)
+    candidate_ids = [
+        trip_object["id"]
+        for page in pages
+        for trip_object in normalize_trip_objects(page.get("Trip", []))
+        if trip_might_be_current(trip_object, now, slack_seconds)
+    ]
+    resolved_trips = await _gather(
+        _run_in_thread(fetch_and_resolve_trip, trip_id, token, token_secret)
+        for trip_id in candidate_ids
+    )
+    return [trip for trips in resolved_trips for trip in trips]
+
+
+def trip_might_be_current(trip, now, slack_seconds):
+    """
+    Determines if `now` falls within a trip's dates, give or take `slack_seconds`.
+    """
+    starts_on = retrieve_trip_time_as_unix(trip.get("start_date", "1970-01-01"))
+    ends_on = retrieve_trip_time_as_unix(trip.get("end_date", "1970-01-01")) + 86400
+    return starts_on - slack_seconds <= now <= ends_on + slack_seconds
+
+
+def get_current_trip_slack_hours():
+    """
+    Returns how far outside of a trip's dates we'll look for flights.
+    """
+    if os.getenv("TRIPIT_CURRENT_TRIP_SLACK_HOURS"):
+        return max(0, int(os.getenv("TRIPIT_CURRENT_TRIP_SLACK_HOURS")))
+    return DEFAULT_CURRENT_TRIP_SLACK_HOURS
+
+
 def get_all_trips(token, token_secret, human_times=False):
     """
     Retrieves all trips from TripIt and parses it in a way that's friendly to
@@ -53,94 +158,417 @@ def get_all_trips(token, token_secret, human_times=False):
 
     We only care about flights and notes. Every other TripIt object is stripped out.
     """
+    return present_trips(fetch_all_trips(token, token_secret), human_times=human_times)
+
+
+async def get_all_trips_async(token, token_secret, human_times=False):
+    """
+    Like `get_all_trips`, but on an event loop. After the first page of trips,
+    every other page is fetched from TripIt at the same time.
+    """
+    trips = await fetch_all_trips_async(token, token_secret)
+    return present_trips(trips, human_times=human_times)
+
+
+async def fetch_all_trips_async(token, token_secret):
+    """
+    Retrieves and resolves all trips from TripIt as `tripit.models.Trip`s on an
+    event loop, or None if TripIt couldn't give them to us.
+    """
+    try:
+        pages = await fetch_trip_pages_async(token, token_secret)
+    except TripFetchError:
+        return None
+    return await _run_in_thread(lambda: list(resolve_trip_pages(pages)))
+
+
+def fetch_all_trips(token, token_secret):
+    """
+    Retrieves and resolves all trips from TripIt as `tripit.models.Trip`s, or
+    None if TripIt couldn't give them to us.
+    """
+    try:
+        return list(iter_trips(token, token_secret))
+    except TripFetchError:
+        return None
+
+
+def iter_trips(token, token_secret, past=None, page_size=None):
+    """
+    Yields resolved trips from TripIt one page at a time. Their times are in
+    UNIX time; see `tripit.presentation` for rendering them for people.
+
+    Only one page of the `/list/trip` payload is held at a time, so memory and
+    time-to-first-trip don't grow with the size of an account's history. The
+    next page isn't fetched until every trip in the current one has been consumed.
+    """
+    pages = fetch_trip_pages(token, token_secret, past=past, page_size=page_size)
+    return resolve_trip_pages(pages)
+
+
+# pylint: disable=too-many-arguments
+def fetch_trip_pages(
+    token, token_secret, past=None, page_size=None, include_objects=True, modified_since=None
+):
+    """
+    Yields pages of `/list/trip` from TripIt until the last page has been
+    retrieved.
+
+    `past` is passed through to TripIt if given; it otherwise decides which
+    trips to return. `modified_since` limits the page to trips and objects that
+    changed after that UNIX time. The page size can be set with TRIPIT_TRIP_PAGE_SIZE.
+    """
+    if page_size is None:
+        page_size = get_trip_page_size()
+    page_num = 1
+    while True:
+        trips_json = fetch_trip_page(
+            token, token_secret, page_num, page_size, past, include_objects, modified_since
+        )
+        yield trips_json
+        if page_num >= int(trips_json.get("max_page", page_num)):
+            return
+        page_num += 1
+
+
+# pylint: disable=too-many-arguments
+def fetch_trip_page(
+    token, token_secret, page_num, page_size, past, include_objects, modified_since
+):
+    """
+    Fetches a page of `/list/trip` from TripIt; see `fetch_trip_pages`.
+    """
     trip_data = get_from_tripit_v1(
         endpoint="/list/trip",
         token=token,
         token_secret=token_secret,
-        params={"include_objects": "true"},
+        params=get_trip_page_params(page_num, page_size, past, include_objects, modified_since),
+        stream=stream_trip_responses(),
+    )
+    return read_trip_page_response(trip_data, page_num)
+
+
+# pylint: disable=too-many-arguments
+async def fetch_trip_pages_async(
+    token, token_secret, past=None, page_size=None, include_objects=True, modified_since=None
+):
+    """
+    Returns every page of `/list/trip` from TripIt; see `fetch_trip_pages`.
+
+    The first page tells us how many pages there are, so every page after it
+    is fetched at the same time. Each page is fetched on a thread with the
+    shared session from `tripit.core.v1.session`, so they're timed out and
+    retried like any other call to TripIt.
+    """
+    if page_size is None:
+        page_size = get_trip_page_size()
+
+    def _fetch_page(page_num):
+        return _run_in_thread(
+            fetch_trip_page,
+            token,
+            token_secret,
+            page_num,
+            page_size,
+            past,
+            include_objects,
+            modified_since,
+        )
+
+    first_page = await _fetch_page(1)
+    max_page = int(first_page.get("max_page", 1))
+    return [first_page] + await _gather(
+        _fetch_page(page_num) for page_num in range(2, max_page + 1)
     )
-    logger.debug("Response: %d, Text: %s", trip_data.status_code, trip_data.text)
+
+
+# pylint: disable=too-many-arguments
+def get_trip_page_params(page_num, page_size, past, include_objects, modified_since):
+    """
+    Returns the parameters for a page of `/list/trip`.
+    """
+    params = {
+        "include_objects": "true" if include_objects else "false",
+        "page_num": page_num,
+        "page_size": page_size,
+    }
+    if past is not None:
+        params["past"] = "true" if past else "false"
+    if modified_since is not None:
+        params["modified_since"] = int(modified_since)
+    return params
+
+
+def read_trip_page_response(trip_data, page_num):
+    """
+    Returns a page of `/list/trip`, or raises `TripFetchError` if TripIt
+    couldn't give it to us.
+    """
     if trip_data.status_code != 200:
         logger.error("Failed to get trips: %s", trip_data.status_code)
-        return None
-    trips_json = trip_data.json()
-    if "Trip" not in trips_json:
+        trip_data.close()
+        raise TripFetchError(f"Failed to get page {page_num} of trips")
+    return read_trip_response(trip_data)
+
+
+def resolve_trip_pages(pages):
+    """
+    Indexes and resolves each page of `/list/trip`, yielding trips as they're
+    resolved.
+    """
+    found_trips = False
+    for trips_json in pages:
+        if "Trip" not in trips_json:
+            continue
+        found_trips = True
+        trips, flights_by_trip_id, notes_by_trip_id = index_trip_payload(trips_json)
+        yield from join_trips(trips, flights=flights_by_trip_id, notes=notes_by_trip_id)
+    if not found_trips:
         logger.info("No trips found.")
-        return []
-    return join_trips(
-        normalize_trip_objects(trips_json["Trip"]),
-        flights=trips_json.get("AirObject", []),
-        notes=trips_json.get("NoteObject", []),
+
+
+def fetch_and_resolve_trip(trip_id, token, token_secret):
+    """
+    Fetches a single trip, with its objects, from TripIt and resolves it.
+    """
+    trip_data = get_from_tripit_v1(
+        endpoint="/get/trip",
         token=token,
         token_secret=token_secret,
-        human_times=human_times,
+        params={"id": trip_id, "include_objects": "true"},
+        stream=stream_trip_responses(),
+    )
+    return resolve_trip_response(trip_data, trip_id)
+
+
+def resolve_trip_response(trip_data, trip_id):
+    """
+    Resolves the trip in a response from `/get/trip`, raising `TripFetchError`
+    if TripIt couldn't give it to us.
+    """
+    if trip_data.status_code != 200:
+        logger.error("Failed to get trip %s: %s", trip_id, trip_data.status_code)
+        trip_data.close()
+        raise TripFetchError(f"Failed to get trip {trip_id}")
+    trip_json = read_trip_response(trip_data)
+    if "Trip" not in trip_json:
+        return []
+    trips, flights_by_trip_id, notes_by_trip_id = index_trip_payload(trip_json)
+    return join_trips(trips, flights=flights_by_trip_id, notes=notes_by_trip_id)
+
+
+def read_trip_response(trip_data):
+    """
+    Returns the trips, flights and notes in a response from TripIt.
+
+    When responses are streamed, the body is parsed as it arrives and every
+    object that we don't use, like `LodgingObject`s and `Profile`s, is skipped
+    without being decoded. Otherwise, the whole body is decoded and logged.
+    """
+    if stream_trip_responses():
+        with timed("decode"):
+            trip_json = read_objects(trip_data, TRIP_OBJECT_TYPES)
+        logger.debug(
+            "Response: %d, Objects: %s", trip_data.status_code, Lazy(_count_trip_objects, trip_json)
+        )
+        return trip_json
+    log_payload("Response: %d, Text:", lambda: trip_data.text, trip_data.status_code)
+    with timed("decode"):
+        return trip_data.json()
+
+
+def _count_trip_objects(trip_json):
+    return {key: len(value) for key, value in trip_json.items() if key in TRIP_OBJECT_TYPES}
+
+
+def stream_trip_responses():
+    """
+    Returns whether responses from TripIt are parsed as they're streamed in.
+    This is on unless TRIPIT_STREAM_TRIP_RESPONSES is "false".
+    """
+    return os.getenv("TRIPIT_STREAM_TRIP_RESPONSES", "true").lower() != "false"
+
+
+async def _gather(coroutines):
+    """
+    Runs `coroutines` at the same time and returns their results in order.
+    Unlike a bare `asyncio.gather`, nothing is left running if one of them fails.
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def _run_in_thread(function, *args):
+    """
+    Runs `function` on one of the event loop's threads and waits for it.
+    Calls to TripIt block, and resolving trips waits on the trip resolver
+    pool, either of which would otherwise hold up every other coroutine on the
+    loop until it was done.
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    # to_thread carries our context over, so timings and metrics still land
+    # on this invocation.
+    return await asyncio.to_thread(function, *args)
+
+
+def get_trip_page_size():
+    """
+    Returns the number of trips that we'll ask TripIt for at a time.
+    """
+    if os.getenv("TRIPIT_TRIP_PAGE_SIZE"):
+        return max(1, int(os.getenv("TRIPIT_TRIP_PAGE_SIZE")))
+    return DEFAULT_TRIP_PAGE_SIZE
+
+
+def index_trip_payload(trips_json):
+    """
+    Walks a `/list/trip` payload once and returns its trips alongside
+    `AirObject`s and `NoteObject`s indexed by the trip that they belong to.
+
+    This saves `resolve_trip` from scanning every object in the account for
+    every trip.
+    """
+    return (
+        normalize_trip_objects(trips_json["Trip"]),
+        index_objects_by_trip_id(trips_json.get("AirObject", [])),
+        index_objects_by_trip_id(trips_json.get("NoteObject", [])),
     )
 
 
-def join_trips(trips, flights, notes, token, token_secret, human_times):
+def index_objects_by_trip_id(trip_objects):
+    """
+    Groups TripIt objects by their `trip_id`, preserving the order in which
+    they were found.
+
+    Like the other objects in a TripIt payload, these can be a single object
+    instead of an array; this is accounted for.
     """
-    Since we need to make API calls to resolve flights in each trip,
-    this function delegates these jobs into threads and joins them.
+    objects_by_trip_id = {}
+    for trip_object in normalize_trip_objects(trip_objects):
+        if not isinstance(trip_object, dict) or "trip_id" not in trip_object:
+            continue
+        objects_by_trip_id.setdefault(trip_object["trip_id"], []).append(trip_object)
+    return objects_by_trip_id
+
+
+def join_trips(trips, flights, notes, executor=None):
     """
-    parsed_trip_futures = []
-    for trip_obj in trips:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            parsed_trip_futures.append(
-                executor.submit(
-                    resolve_trip, trip_obj, flights, notes, token, token_secret, human_times
-                )
+    Resolves each trip in a thread and joins them. Everything that a trip needs
+    is already in the payload that it came from, so nothing is fetched here.
+
+    `flights` and `notes` are `AirObject`s and `NoteObject`s indexed by trip ID;
+    see `index_trip_payload`.
+
+    Every trip is submitted to the same pool before we wait on any of them, and
+    results are collected in the order that the trips were provided. The
+    container-wide pool from `get_trip_resolver_executor` is used unless
+    another executor is provided.
+    """
+    if executor is None:
+        executor = get_trip_resolver_executor()
+    with timed("join"):
+        parsed_trip_futures = [
+            executor.submit(resolve_trip, trip_obj, flights, notes)
+            for trip_obj in trips
+        ]
+
+        parsed_trips = [future.result() for future in parsed_trip_futures]
+    resolved_trips = [trip for trip in parsed_trips if trip]
+    if recording_metrics():
+        increment("TripsResolved", len(resolved_trips))
+        increment("SegmentsParsed", sum(len(trip.flights) for trip in resolved_trips))
+    return resolved_trips
+
+
+def get_trip_resolver_executor():
+    """
+    Returns the thread pool used to resolve trips, creating it on first use.
+
+    The pool lives for as long as this container does so that warm Lambda
+    invocations don't pay for spinning up threads again. Its size can be set with
+    TRIPIT_TRIP_RESOLVER_WORKERS.
+    """
+    import concurrent.futures  # pylint: disable=import-outside-toplevel
+
+    global _TRIP_RESOLVER_EXECUTOR  # pylint: disable=global-statement
+    with _TRIP_RESOLVER_EXECUTOR_LOCK:
+        if _TRIP_RESOLVER_EXECUTOR is None:
+            _TRIP_RESOLVER_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=get_trip_resolver_worker_count(),
+                thread_name_prefix="trip-resolver",
             )
+        return _TRIP_RESOLVER_EXECUTOR
+
 
-    parsed_trips = [future.result() for future in parsed_trip_futures]
-    return [trip for trip in parsed_trips if trip]
+def get_trip_resolver_worker_count():
+    """
+    Returns the number of threads that we'll use to resolve trips.
+    """
+    if os.getenv("TRIPIT_TRIP_RESOLVER_WORKERS"):
+        return max(1, int(os.getenv("TRIPIT_TRIP_RESOLVER_WORKERS")))
+    return DEFAULT_TRIP_RESOLVER_WORKERS
 
 
-def resolve_trip(trip_object, flights, notes, token, token_secret, human_times):
+def shutdown_trip_resolver_executor():
+    """
+    Shuts down the shared trip resolver pool, if one was created.
+
+    The next call to `get_trip_resolver_executor` will create a new one, which
+    is useful for picking up a new worker count.
+    """
+    global _TRIP_RESOLVER_EXECUTOR  # pylint: disable=global-statement
+    with _TRIP_RESOLVER_EXECUTOR_LOCK:
+        if _TRIP_RESOLVER_EXECUTOR is not None:
+            _TRIP_RESOLVER_EXECUTOR.shutdown(wait=True)
+            _TRIP_RESOLVER_EXECUTOR = None
+
+
+def resolve_trip(trip_object, flights, notes):
     """
     Generates a summarized version of a trip with expanded flight
-    information.
+    information, or None if the trip is empty.
+
+    `flights` and `notes` are indexed by trip ID; see `index_trip_payload`.
     """
-    logger.debug("Fetching trip %s", trip_object["id"])
+    logger.debug("Resolving trip %s", trip_object["id"])
     if trip_is_empty(trip_object):
-        logger.warn("Trip %s is empty", trip_object["id"])
-        return {}
+        logger.warning("Trip %s is empty", trip_object["id"])
+        return None
 
-    flight_objects = [
-        obj for obj in flights if isinstance(obj, dict) and obj["trip_id"] == trip_object["id"]
-    ]
+    flight_objects = flights.get(trip_object["id"], [])
     if len(flight_objects) == 0:
-        logger.warn("Trip %s has no flight objects", trip_object["id"])
-    note_objects = [obj for obj in notes if obj["trip_id"] == trip_object["id"]]
+        logger.warning("Trip %s has no flight objects", trip_object["id"])
+    note_objects = notes.get(trip_object["id"], [])
     if len(note_objects) == 0:
-        logger.warn("Trip %s has no notes attached to it", trip_object["id"])
-    flights = resolve_flights(flight_objects, human_times)
-    trip_start_time = resolve_start_time(trip_object, flights, human_times)
-    trip_end_time = resolve_end_time(trip_object, flights, human_times)
+        logger.warning("Trip %s has no notes attached to it", trip_object["id"])
+    flights = resolve_flights(flight_objects)
+    trip_start_time = resolve_start_time(trip_object, flights)
+    trip_end_time = resolve_end_time(trip_object, flights)
     primary_location = resolve_primary_location(trip_object)
 
-    summarized_trip = {
-        "id": int(trip_object["id"]),
-        "name": trip_object["display_name"],
-        "city": primary_location,
-        "ends_on": trip_end_time,
-        "ended": determine_if_trip_ended(trip_end_time, note_objects),
-        "link": "https://www.tripit.com" + trip_object["relative_url"],
-        "starts_on": trip_start_time,
-        "flights": flights,
-    }
-    if human_times:
-        for key in ["starts_on", "ends_on"]:
-            summarized_trip[key] = convert_to_human_dt(summarized_trip[key])
-    return summarized_trip
+    return Trip(
+        id=int(trip_object["id"]),
+        name=trip_object["display_name"],
+        city=primary_location,
+        ends_on=trip_end_time,
+        ended=determine_if_trip_ended(trip_end_time, note_objects),
+        link="https://www.tripit.com" + trip_object["relative_url"],
+        starts_on=trip_start_time,
+        flights=flights,
+    )
 
 
-def resolve_flights(trip_object, human_times):
+def resolve_flights(trip_object):
     """
-    Fetches flights for a given trip object, if any `AirObject`'s exist,
-    sorted by their departure date and time.
-
-    This involves a nested API call to the resource of the `Trip` and
-    might be time-expensive!
+    Summarizes the segments of a trip's `AirObject`s, if any exist, sorted by
+    their departure date and time.
 
     Note that a flight is a collection of segments, or "flight legs."
     """
@@ -158,34 +586,16 @@ def resolve_flights(trip_object, human_times):
             flight_number = "".join(
                 [segment["marketing_airline_code"], segment["marketing_flight_number"]]
             )
-            summarized_segment = {
-                "flight_number": flight_number,
-                "origin": segment["start_airport_code"],
-                "destination": segment["end_airport_code"],
-                "offset": segment["StartDateTime"]["utc_offset"],
-                "depart_time": normalize_flight_time_to_tz(segment["StartDateTime"]),
-                "arrive_time": normalize_flight_time_to_tz(segment["EndDateTime"]),
-            }
-            if human_times:
-                for key in ["depart_time", "arrive_time"]:
-                    summarized_segment[key] = convert_to_human_dt(summarized_segment[key])
-
+            summarized_segment = FlightSegment(
+                flight_number=flight_number,
+                origin=segment["start_airport_code"],
+                destination=segment["end_airport_code"],
+                offset=segment["StartDateTime"]["utc_offset"],
+                depart_time=normalize_flight_time_to_tz(segment["StartDateTime"]),
+                arrive_time=normalize_flight_time_to_tz(segment["EndDateTime"]),
+            )
             summarized_segments.append(summarized_segment)
-    return sorted(summarized_segments, key=lambda segment: segment["depart_time"])
-
-
-def convert_to_human_dt(timestamp):
-    """
-    Converts a timestamp to human time.
-    """
-    return datetime.datetime.utcfromtimestamp(timestamp).strftime("%a %b %d %H:%M:%S %Y %z UTC")
-
-
-def convert_human_dt_to_ts(date_str):
-    """
-    Converts a human time to a timestamp.
-    """
-    return int(datetime.datetime.strptime(date_str, "%a %b %d %H:%M:%S %Y UTC").timestamp())
+    return sorted(summarized_segments, key=lambda segment: segment.depart_time)
 
 
 def normalize_segments_from_flight(flight):
@@ -198,7 +608,7 @@ def normalize_segments_from_flight(flight):
     return [segment]
 
 
-def resolve_start_time(trip, flights, human_times):
+def resolve_start_time(trip, flights):
     """
     Resolves the correct start time for a trip based on its flights.
 
@@ -207,12 +617,10 @@ def resolve_start_time(trip, flights, human_times):
     """
     if not flights:
         if "start_date" not in trip.keys():
-            logger.warn("Trip %s doesn't have a start time!", trip["id"])
+            logger.warning("Trip %s doesn't have a start time!", trip["id"])
         return retrieve_trip_time_as_unix(trip.get("start_date", "1970-01-01"))
 
-    first_flight_segment_start_time = flights[0]["depart_time"]
-    if human_times:
-        first_flight_segment_start_time = convert_human_dt_to_ts(first_flight_segment_start_time)
+    first_flight_segment_start_time = flights[0].depart_time
 
     if os.getenv("TRIPIT_INGRESS_TIME_MINUTES"):
         trip_ingress_seconds = int(os.getenv("TRIPIT_INGRESS_TIME_MINUTES")) * 60
@@ -227,24 +635,22 @@ def resolve_primary_location(trip):
     Retrieves the primary location of this trip, if one is present.
     """
     if "primary_location" not in trip.keys():
-        logger.warn("Trip %s does not have a primary location! Object: %s", trip["id"], str(trip))
+        logger.warning("Trip %s does not have a primary location! Object: %s", trip["id"], trip)
         return "Anywhere, Earth"
     return trip["primary_location"]
 
 
-def resolve_end_time(trip, flights, human_times):
+def resolve_end_time(trip, flights):
     """
     Resolves the correct end time for a trip based on its flights.
     """
     if "end_date" not in trip:
-        logger.warn("Trip %s doesn't have an end date!", trip["id"])
+        logger.warning("Trip %s doesn't have an end date!", trip["id"])
     trip_end_time = retrieve_trip_time_as_unix(trip.get("end_date", "1970-01-01"))
     if not flights:
         return trip_end_time
 
-    last_flight_segment_end_time = flights[-1]["arrive_time"]
-    if human_times:
-        last_flight_segment_end_time = convert_human_dt_to_ts(last_flight_segment_end_time)
+    last_flight_segment_end_time = flights[-1].arrive_time
 
     return last_flight_segment_end_time
 
@@ -253,11 +659,7 @@ def normalize_flight_time_to_tz(time_object):
     """
     Returns the time of a flight with its offset accounted for.
     """
-    datetime_str = " ".join(
-        [time_object["date"], time_object["time"], time_object["utc_offset"].replace(":", "")]
-    )
-    datetime_unix = datetime.datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S %z").timestamp()
-    return int(datetime_unix)
+    return local_time_to_unix(time_object["date"], time_object["time"], time_object["utc_offset"])
 
 
 def normalize_trip_objects(trip):
@@ -295,7 +697,7 @@ def retrieve_trip_time_as_unix(time_to_retrieve):
     """
     Returns a trip's time in UNIX time format.
     """
-    return int(time.mktime(time.strptime(time_to_retrieve, "%Y-%m-%d")))
+    return date_to_unix(time_to_retrieve)
 
 
 def trip_is_empty(trip):